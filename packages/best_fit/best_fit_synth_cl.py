@@ -2,7 +2,8 @@
 import numpy as np
 import pickle
 from . import max_mag_cut, obs_clust_prepare, ptemcee_algor
-from ..synth_clust import add_errors, imf, extin_coefs, synth_clust_gen
+from ..synth_clust import add_errors, imf, extin_coefs, move_isochrone,\
+    synth_clust_gen
 from .mcmc_convergence import convergenceVals
 from .bf_common import r2Dist, modeKDE, fillParams  # thinChain
 
@@ -17,6 +18,10 @@ def main(npd, pd, clp):
     if pd['best_fit_algor'] != 'n':
         cl_max_mag, max_mag_syn, obs_clust, ext_coefs, st_dist_mass, N_fc,\
             err_pars = dataPrep(pd, clp)
+        if pd['save_state_flag']:
+            fitStateSave(
+                npd['state_file_out'], pd, clp, obs_clust, max_mag_syn,
+                ext_coefs, st_dist_mass, N_fc, err_pars)
     else:
         # Pass dummy data used by data output and some plot functions.
         cl_max_mag, max_mag_syn, ext_coefs, st_dist_mass, N_fc, err_pars =\
@@ -32,7 +37,8 @@ def main(npd, pd, clp):
         # Calculate the best fitting parameters.
         isoch_fit_params = ptemcee_algor.main(
             clp['completeness'], max_mag_syn, obs_clust, ext_coefs,
-            st_dist_mass, N_fc, err_pars, **pd)
+            st_dist_mass, N_fc, err_pars, npd['chain_file_out'],
+            npd['checkpoint_file_out'], **pd)
 
         # TODO DEPRECATED May 2020
         # elif pd['best_fit_algor'] == 'emcee':
@@ -112,7 +118,10 @@ def dataPrep(pd, clp):
     # Processed observed cluster.
     obs_clust = obs_clust_prepare.main(
         cl_max_mag, pd['lkl_method'], pd['lkl_binning'],
-        pd['lkl_manual_bins'])
+        pd['lkl_manual_bins'], pd['lkl_tol'], pd['lkl_max_pairs'])
+
+    # Store the number of defined filters and colors.
+    N_fc = [len(pd['filters']), len(pd['colors'])]
 
     # Obtain extinction coefficients.
     # This parameter determines the total number of sub-arrays for each
@@ -120,35 +129,49 @@ def dataPrep(pd, clp):
     ext_shape = len(pd['theor_tracks'][0][0])
     ext_coefs = extin_coefs.main(
         pd['cmd_systs'], pd['filters'], pd['colors'], ext_shape)
+    # Distance and extinction coefficients for each sub-array, used to move
+    # the isochrones.
+    ext_coefs = move_isochrone.extinVecs(
+        ext_coefs, pd['R_V'], N_fc, pd['binar_flag'], ext_shape)
 
     # Obtain mass distribution using the selected IMF. We run it once
     # because the array only depends on the IMF selected.
-    st_dist_mass = imf.main(pd['IMF_name'], pd['fundam_params'][4])
-
-    # Store the number of defined filters and colors.
-    N_fc = [len(pd['filters']), len(pd['colors'])]
+    st_dist_mass = imf.main(
+        pd['IMF_name'], pd['fundam_params'][4], pd['N_IMF'])
 
-    err_rand = add_errors.randIdxs(pd['lkl_method'])
-    err_pars = clp['err_lst'], clp['em_float'], err_rand
-
-    # # TEMPORARY
-    # # Use for saving the necessary input for the 'perf_test.py' file.
-    # import pickle
-    # with open('perf_test.pickle', 'wb') as f:
-    #     pickle.dump([
-    #         obs_clust, cl_max_mag, pd['fundam_params'], pd['theor_tracks'],
-    #         pd['lkl_method'], pd['R_V'], clp['completeness'],
-    #         max_mag_syn, st_dist_mass, ext_coefs, N_fc, pd['m_ini_idx'],
-    #         pd['binar_flag'], err_pars], f)
-    # print("finished")
-    # import sys
-    # sys.exit()
-    # # TEMPORARY
+    # Error curves tabulated for the synthetic clusters' magnitude range.
+    err_tab = add_errors.errTable(clp['err_lst'], clp['em_float'], max_mag_syn)
+    # Noise for the photometric errors, one row per dimension.
+    err_rand = add_errors.noisePool(
+        pd['lkl_method'], sum(N_fc), st_dist_mass[0].shape[1],
+        pd['noise_rot'])
+    err_pars = err_tab, err_rand
 
     return cl_max_mag, max_mag_syn, obs_clust, ext_coefs, st_dist_mass, N_fc,\
         err_pars
 
 
+def fitStateSave(
+    state_file_out, pd, clp, obs_clust, max_mag_syn, ext_coefs, st_dist_mass,
+        N_fc, err_pars):
+    """
+    Save the data required to evaluate the likelihood of a model, used by
+    the 'perf_test.py' profiling script.
+    """
+    state = {
+        'obs_clust': obs_clust, 'fundam_params': pd['fundam_params'],
+        'theor_tracks': np.asarray(pd['theor_tracks']),
+        'lkl_method': pd['lkl_method'], 'R_V': pd['R_V'],
+        'completeness': clp['completeness'], 'max_mag_syn': max_mag_syn,
+        'st_dist_mass': st_dist_mass, 'ext_coefs': ext_coefs, 'N_fc': N_fc,
+        'err_pars': err_pars, 'm_ini_idx': pd['m_ini_idx'],
+        'binar_flag': pd['binar_flag']}
+    with open(state_file_out, 'wb') as f:
+        pickle.dump(state, f)
+
+    print("Fit state saved to file")
+
+
 def convergenceParams(isoch_fit_params, fundam_params, nburn_mcee, **kwargs):
     """
     """
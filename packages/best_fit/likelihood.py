@@ -78,15 +78,12 @@ def tremmel(synth_clust, obs_clust):
     """
 
     # Observed cluster's data.
-    bin_edges, cl_histo_f_z, cl_z_idx = obs_clust
+    bin_edges, cl_histo_f_z, bin_idx = obs_clust
 
     # Histogram of the synthetic cluster, using the bin edges calculated
-    # with the observed cluster.
-    syn_histo = np.histogramdd(synth_clust, bins=bin_edges)[0]
-    # Flatten N-dimensional histogram.
-    syn_histo_f = syn_histo.ravel()
-    # Remove all bins where n_i = 0 (no observed stars).
-    syn_histo_f_z = syn_histo_f[cl_z_idx]
+    # with the observed cluster. Only the bins where n_i != 0 (observed
+    # stars) are obtained.
+    syn_histo_f_z = histoBins(synth_clust, bin_idx, True)
 
     SumLogGamma = np.sum(
         loggamma(cl_histo_f_z + syn_histo_f_z + .5) -
@@ -118,15 +115,12 @@ def dolphin(synth_clust, obs_clust):
     """
 
     # Observed cluster's data.
-    bin_edges, fill_factor, cl_histo_f_z, dolphin_cst, cl_z_idx = obs_clust
+    bin_edges, fill_factor, cl_histo_f_z, dolphin_cst, bin_idx = obs_clust
 
     # Histogram of the synthetic cluster, using the bin edges calculated
-    # with the observed cluster.
-    syn_histo = np.histogramdd(synth_clust, bins=bin_edges)[0]
-    # Flatten N-dimensional histogram.
-    syn_histo_f = syn_histo.ravel()
-    # Remove all bins where n_i = 0 (no observed stars).
-    syn_histo_f_z = syn_histo_f[cl_z_idx]
+    # with the observed cluster. Only the bins where n_i != 0 (observed
+    # stars) are obtained.
+    syn_histo_f_z = histoBins(synth_clust, bin_idx, True)
 
     # Assign small value to the m_i = 0 elements in 'syn_histo_f_z'.
     # The value equals 1 star divided among all empty bins.
@@ -162,13 +156,11 @@ def mighell(synth_clust, obs_clust):
 
     # Observed cluster's bin edges for each dimension, flattened histogram,
     # and n_i constant.
-    bin_edges, cl_histo_f, ni_cnst = obs_clust
+    bin_edges, cl_histo_f, ni_cnst, bin_idx = obs_clust
 
-    # Histogram of the synthetic cluster, using the bin edges calculated
-    # with the observed cluster.
-    syn_histo = np.histogramdd(synth_clust, bins=bin_edges)[0]
-    # Flatten N-dimensional histogram.
-    syn_histo_f = syn_histo.ravel()
+    # Flattened histogram of the synthetic cluster, using the bin edges
+    # calculated with the observed cluster.
+    syn_histo_f = histoBins(synth_clust, bin_idx)
 
     # Final chi.
     mig_chi = np.sum(
@@ -177,6 +169,30 @@ def mighell(synth_clust, obs_clust):
     return mig_chi
 
 
+def histoBins(synth_clust, bin_idx, z_only=False):
+    """
+    Flattened histogram of the synthetic cluster. Equivalent to:
+
+    np.histogramdd(synth_clust, bins=bin_edges)[0].ravel()
+
+    (or its elements in 'cl_z_idx', if 'z_only' is True) using the
+    pre-processed bin edges in 'bin_idx' (see
+    'obs_clust_prepare.binIndexer()').
+    """
+    edges, N_pad, z_pos, N_z, z_pos_all, N_all = bin_idx
+    if not z_only:
+        z_pos, N_z = z_pos_all, N_all
+
+    # Index of each star in the flattened padded grid.
+    flat = np.searchsorted(edges[0], synth_clust[:, 0], side='right')
+    for i in range(1, len(edges)):
+        flat = flat * N_pad[i] + np.searchsorted(
+            edges[i], synth_clust[:, i], side='right')
+
+    flat = z_pos[flat]
+    return np.bincount(flat[flat >= 0], minlength=N_z).astype(float)
+
+
 def tolstoy(synth_clust, obs_clust):
     """
     Weighted (log) likelihood.
@@ -259,15 +275,18 @@ def tolstoy(synth_clust, obs_clust):
     # lkl = old(obs_st, N, log_mem_probs, synth_phot, synth_errors)
 
     # Observed cluster's photometry and membership probabilities.
-    obs_photom, sigma, sigma_prod, N, log_mem_probs = obs_clust
+    obs_photom, sigma, sigma_prod, N, log_mem_probs, lkl_tol, max_pairs =\
+        obs_clust
 
-    # Sum for all photometric dimensions.
-    Dsum = (np.square(
-        obs_photom - synth_clust[None, :, :]) / sigma).sum(axis=-1)
+    # (Log) Sum over the synthetic stars, for each observed star.
+    if lkl_tol is None:
+        sum_M = tolstoyDense(
+            obs_photom, sigma, sigma_prod, synth_clust, max_pairs)
+    else:
+        sum_M = tolstoyPruned(
+            obs_photom, sigma, sigma_prod, synth_clust, lkl_tol, max_pairs)
 
-    sum_N = (
-        logsumexp(-.5 * Dsum, b=1. / sigma_prod, axis=1) +
-        log_mem_probs).sum()
+    sum_N = (sum_M + log_mem_probs).sum()
 
     # Final negative logarithmic likelihood
     tlst_lkl = N * np.log(synth_clust.shape[0]) - sum_N
@@ -275,6 +294,129 @@ def tolstoy(synth_clust, obs_clust):
     return tlst_lkl
 
 
+def tolstoyDense(obs_photom, sigma, sigma_prod, synth_clust, max_pairs):
+    """
+    Sum over all the synthetic stars for each observed star. The observed
+    stars are processed in chunks of (at most) 'max_pairs' pairs of stars.
+    """
+    N = obs_photom.shape[0]
+    step = max(1, int(max_pairs // synth_clust.shape[0]))
+
+    sum_M = np.empty(N)
+    for i in range(0, N, step):
+        # Sum for all photometric dimensions.
+        Dsum = (np.square(
+            obs_photom[i:i + step] - synth_clust[None, :, :]) /
+            sigma[i:i + step]).sum(axis=-1)
+        sum_M[i:i + step] = logsumexp(
+            -.5 * Dsum, b=1. / sigma_prod[i:i + step], axis=1)
+
+    return sum_M
+
+
+def tolstoyPruned(
+        obs_photom, sigma, sigma_prod, synth_clust, lkl_tol, max_pairs):
+    """
+    Sum only over the synthetic stars located close to each observed star.
+
+    The synthetic stars are sorted by their main magnitude, and for each
+    observed star only those within a magnitude window of half-width
+    'sqrt(R2 * sigma_mag)' are used. Every synthetic star left out has
+    Dsum > R2, hence each one contributes less than exp(-R2 / 2) / sigma_prod
+    to the sum. With R2 = 2 * ln(M / lkl_tol) the M stars left out add up
+    to less than 'lkl_tol / sigma_prod'.
+
+    If the sum S of the stars used is such that S * sigma_prod < 1 (i.e.: no
+    synthetic star is very close) the above bound is not enough to
+    guarantee a relative error smaller than 'lkl_tol'. Those observed stars
+    are re-processed with a window of R2_i = R2 - 2 * ln(S * sigma_prod),
+    which makes the error smaller than 'lkl_tol * S'. Observed stars with no
+    synthetic stars in their window are processed with 'tolstoyDense()'.
+
+    The error in the (log) sum of each observed star is thus smaller than
+    'lkl_tol', and the error in the final likelihood is smaller than
+    'N * lkl_tol'.
+    """
+    N, M = obs_photom.shape[0], synth_clust.shape[0]
+
+    # Sort synthetic stars by their main magnitude.
+    syn_sort = synth_clust[np.argsort(synth_clust[:, 0], kind='mergesort')]
+
+    obs_mag, sigma_mag = obs_photom[:, 0, 0], sigma[:, 0, 0]
+    log_sp = np.log(sigma_prod[:, 0])
+
+    R2 = np.full(N, 2. * np.log(M / lkl_tol))
+    sum_M = windowSums(
+        obs_photom, sigma, log_sp, syn_sort, obs_mag, sigma_mag, R2,
+        np.arange(N), max_pairs)
+
+    # Re-process stars with no synthetic star close enough.
+    with np.errstate(invalid='ignore'):
+        redo = np.nonzero(sum_M + log_sp < 0.)[0]
+    if redo.size > 0:
+        R2_redo = R2[redo] - 2. * (sum_M[redo] + log_sp[redo])
+        finite = np.isfinite(R2_redo)
+        idx = redo[finite]
+        sum_M[idx] = windowSums(
+            obs_photom, sigma, log_sp, syn_sort, obs_mag, sigma_mag,
+            R2_redo[finite], idx, max_pairs)
+
+        # Empty windows
+        idx = redo[~finite]
+        if idx.size > 0:
+            sum_M[idx] = tolstoyDense(
+                obs_photom[idx], sigma[idx], sigma_prod[idx], synth_clust,
+                max_pairs)
+
+    return sum_M
+
+
+def windowSums(
+    obs_photom, sigma, log_sp, syn_sort, obs_mag, sigma_mag, R2, idx,
+        max_pairs):
+    """
+    (Log) Sum over the synthetic stars in the magnitude window of each of the
+    'idx' observed stars. Returns -inf for empty windows.
+    """
+    half_w = np.sqrt(R2 * sigma_mag[idx])
+    lo = np.searchsorted(syn_sort[:, 0], obs_mag[idx] - half_w, side='left')
+    hi = np.searchsorted(syn_sort[:, 0], obs_mag[idx] + half_w, side='right')
+    cnt = hi - lo
+
+    sum_M = np.full(idx.size, -np.inf)
+
+    # Chunks of observed stars with (at most) 'max_pairs' pairs, except for
+    # single stars with larger windows.
+    c_cnt = np.cumsum(cnt)
+    i = 0
+    while i < idx.size:
+        j = max(i + 1, np.searchsorted(
+            c_cnt, c_cnt[i] - cnt[i] + max_pairs, side='right'))
+        c, o_idx = cnt[i:j], idx[i:j]
+        msk = c > 0
+        if msk.any():
+            c, o_idx, c_lo = c[msk], o_idx[msk], lo[i:j][msk]
+            # Indexes of the (observed, synthetic) pairs.
+            start = np.cumsum(c) - c
+            obs_i = np.repeat(o_idx, c)
+            syn_j = np.arange(c.sum()) - np.repeat(start - c_lo, c)
+
+            Dsum = (np.square(obs_photom[obs_i, 0] - syn_sort[syn_j]) /
+                    sigma[obs_i, 0]).sum(axis=-1)
+
+            # logsumexp() for each observed star.
+            x = -.5 * Dsum
+            x_max = np.maximum.reduceat(x, start)
+            lse = x_max + np.log(np.add.reduceat(
+                np.exp(x - np.repeat(x_max, c)), start))
+
+            pos = np.arange(i, j)[msk]
+            sum_M[pos] = lse - log_sp[o_idx]
+        i = j
+
+    return sum_M
+
+
 def isochfit(synth_clust, obs_clust):
     """
     In place for #358
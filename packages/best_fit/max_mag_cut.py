@@ -1,6 +1,5 @@
 
 import numpy as np
-import copy
 
 
 def main(cl_reg_fit, max_mag):
@@ -9,18 +8,14 @@ def main(cl_reg_fit, max_mag):
     """
 
     # Maximum observed (main) magnitude.
-    max_mag_obs = np.max(list(zip(*list(zip(*cl_reg_fit))[1:][2]))[0])
+    max_mag_obs = np.max(cl_reg_fit.mags[:, 0])
 
     if max_mag == 'max':
         # No magnitude cut applied.
-        cl_max_mag, max_mag_syn = copy.deepcopy(cl_reg_fit), max_mag_obs
+        cl_max_mag, max_mag_syn = cl_reg_fit[:], max_mag_obs
     else:
-        star_lst = []
-        for star in cl_reg_fit:
-            # Check main magnitude value.
-            if star[3][0] <= max_mag:
-                # Keep stars brighter that the magnitude limit.
-                star_lst.append(star)
+        # Keep stars brighter that the magnitude limit.
+        star_lst = cl_reg_fit[cl_reg_fit.mags[:, 0] <= max_mag]
 
         # Check number of stars left.
         if len(star_lst) > 10:
@@ -32,7 +27,7 @@ def main(cl_reg_fit, max_mag):
             print("Maximum magnitude cut applied ({:.1f} mag)".format(
                 max_mag_syn))
         else:
-            cl_max_mag, max_mag_syn = copy.deepcopy(cl_reg_fit), max_mag_obs
+            cl_max_mag, max_mag_syn = cl_reg_fit[:], max_mag_obs
             print("  WARNING: less than 10 stars left after removing\n"
                   "  stars by magnitude limit. No removal applied.")
 
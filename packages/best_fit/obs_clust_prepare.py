@@ -9,19 +9,58 @@ def dataProcess(cl_max_mag):
     Extract photometric data, and membership probabilities. Remove ID's to
     make entire array of floats.
     """
-    mags_cols_cl = [[], []]
-    for mag in list(zip(*list(zip(*cl_max_mag))[1:][2])):
-        mags_cols_cl[0].append(mag)
-    for col in list(zip(*list(zip(*cl_max_mag))[1:][4])):
-        mags_cols_cl[1].append(col)
+    mags_cols_cl = [list(cl_max_mag.mags.T), list(cl_max_mag.cols.T)]
 
     # Store membership probabilities here.
-    memb_probs = np.array(list(zip(*cl_max_mag))[1:][8])
+    memb_probs = cl_max_mag.mps
 
     return mags_cols_cl, memb_probs
 
 
-def main(cl_max_mag, lkl_method, lkl_binning, lkl_manual_bins):
+def binIndexer(bin_edges, cl_z_idx):
+    """
+    Pre-process the bin edges so that the histogram of a synthetic cluster
+    can be obtained with a single 'np.bincount()' call (see
+    'likelihood.histoBins()').
+
+    The bin index of a star in each dimension is given by 'np.searchsorted()'
+    over its edges, where 0 and N_edges stand for the under/overflow bins.
+    The last edge is moved to the next float so that stars located exactly
+    on it fall in the last bin, as in 'np.histogramdd()'. The 'z_pos' array
+    maps each bin of this padded grid to its position in the flattened
+    histogram ('cl_z_idx' bins only, or all the bins), or -1 for the
+    under/overflow bins and the (optional) empty observed bins.
+
+    Returns
+    -------
+    list
+      [edges, N_pad, z_pos, N_z, z_pos_all, N_all]
+    """
+    edges = []
+    for be in bin_edges:
+        be = np.array(be, dtype=float)
+        be[-1] = np.nextafter(be[-1], np.inf)
+        edges.append(be)
+    N_pad = [len(_) + 1 for _ in edges]
+
+    # Position of each padded bin in the flattened (not padded) histogram.
+    inner = np.full(N_pad, -1)
+    inner[tuple(slice(1, -1) for _ in edges)] = np.arange(
+        cl_z_idx.size).reshape([len(_) - 1 for _ in edges])
+    z_pos_all = inner.ravel()
+
+    # Same, for the bins with observed stars only.
+    z_loc = np.full(cl_z_idx.size, -1)
+    z_loc[cl_z_idx] = np.arange(cl_z_idx.sum())
+    z_pos = np.where(z_pos_all >= 0, z_loc[z_pos_all], -1)
+
+    return [edges, N_pad, z_pos, int(cl_z_idx.sum()), z_pos_all,
+            cl_z_idx.size]
+
+
+def main(
+    cl_max_mag, lkl_method, lkl_binning, lkl_manual_bins, lkl_tol=None,
+        lkl_max_pairs=1000000):
     '''
     Prepare observed cluster array here to save time before the algorithm to
     find the best synthetic cluster fit is used.
@@ -84,23 +123,24 @@ def main(cl_max_mag, lkl_method, lkl_binning, lkl_manual_bins):
         # prevent this.
         fill_factor = min(.9, cl_histo_f.sum() / 1e4)
 
+        # Pre-processed bin edges, used to obtain the synthetic clusters'
+        # histograms.
+        bin_idx = binIndexer(bin_edges, cl_z_idx)
+
         if lkl_method == 'tremmel':
-            obs_clust = [bin_edges, cl_histo_f_z, cl_z_idx]
+            obs_clust = [bin_edges, cl_histo_f_z, bin_idx]
         elif lkl_method == 'dolphin':
             obs_clust = [bin_edges, fill_factor, cl_histo_f_z, dolphin_cst,
-                         cl_z_idx]
+                         bin_idx]
         elif lkl_method == 'mighell':
-            obs_clust = [bin_edges, cl_histo_f, mighell_ni_cnst]
+            obs_clust = [bin_edges, cl_histo_f, mighell_ni_cnst, bin_idx]
 
     elif lkl_method == 'tolstoy':
 
         # Square errors here to not repeat the same calculations each time a
         # new synthetic cluster is matched.
-        e_mags_cols = []
-        for e_m in list(zip(*list(zip(*cl_max_mag))[1:][3])):
-            e_mags_cols.append(np.square(e_m))
-        for e_c in list(zip(*list(zip(*cl_max_mag))[1:][5])):
-            e_mags_cols.append(np.square(e_c))
+        e_mags_cols = list(np.square(cl_max_mag.em.T)) +\
+            list(np.square(cl_max_mag.ec.T))
 
         # DEPRECATED 18/01/20. The new method does not use errors in the
         # synthetic clusters.
@@ -135,7 +175,9 @@ def main(cl_max_mag, lkl_method, lkl_binning, lkl_manual_bins):
         memb_probs = np.clip(memb_probs, a_min=.001, a_max=None)
 
         N = obs_photom.shape[0]
-        obs_clust = [obs_photom, sigma, sigma_prod, N, np.log(memb_probs)]
+        obs_clust = [
+            obs_photom, sigma, sigma_prod, N, np.log(memb_probs), lkl_tol,
+            lkl_max_pairs]
 
     elif lkl_method == 'isochfit':
 
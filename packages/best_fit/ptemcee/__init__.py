@@ -4,6 +4,7 @@
 from __future__ import (division, print_function, absolute_import, unicode_literals)
 
 from .sampler import *
+from .storage import *
 # from .interruptible_pool import InterruptiblePool
 # from .mpi_pool import MPIPool
 from . import util
@@ -9,6 +9,7 @@ __all__ = ["Sampler", "default_beta_ladder"]
 import numpy as np
 import multiprocessing as multi
 from . import util
+from .storage import ChainStorage
 
 
 def default_beta_ladder(ndim, ntemps=None, Tmax=None):
@@ -150,6 +151,27 @@ class LikePriorEvaluator(object):
 
         return ll, lp
 
+    def batch(self, xs):
+        """
+        Evaluate all the positions in the (N, dim) array 'xs' with a single
+        call to logl and logp. Both must accept the full array and return
+        one value per row (logp may also return a scalar).
+        """
+        lp = np.broadcast_to(np.asarray(
+            self.logp(xs, *self.logpargs, **self.logpkwargs), dtype=float),
+            (xs.shape[0],))
+        if np.isnan(lp).any():
+            raise ValueError('Prior function returned NaN.')
+
+        ll = np.asarray(
+            self.logl(xs, *self.loglargs, **self.loglkwargs), dtype=float)
+        if np.isnan(ll).any():
+            raise ValueError('Log likelihood function returned NaN.')
+        # Can't return -inf, since this messes with beta=0 behaviour.
+        ll = np.where(lp == float('-inf'), 0., ll)
+
+        return ll, lp
+
 
 class Sampler(object):
     """
@@ -205,9 +227,21 @@ class Sampler(object):
     :param adaptation_lag: (optional)
         Time lag for temperature dynamics decay. Default: 10000.
 
+    :param vectorize: (optional)
+        If ``True``, ``logl`` and ``logp`` are called once per step with
+        all the positions (an array of shape ``(N, dim)``) and must return
+        an array of ``N`` values. ``threads`` and ``pool`` are ignored.
+        Default: ``False``.
+
     :param adaptation_time: (optional)
         Time-scale for temperature dynamics.  Default: 100.
 
+    :param storage: (optional)
+        A :class:`ChainStorage` instance where the chain, log-posterior and
+        log-likelihood values are stored (for example, on disk with
+        :class:`MemmapChainStorage`). Default: in-memory storage for all the
+        temperatures.
+
     """
     def __init__(self, nwalkers, dim, logl, logp,
                  ntemps=None, Tmax=None, betas=None,
@@ -215,7 +249,7 @@ class Sampler(object):
                  loglargs=[], logpargs=[],
                  loglkwargs={}, logpkwargs={},
                  adaptation_lag=10000, adaptation_time=100,
-                 random=None):
+                 random=None, vectorize=False, storage=None):
         if random is None:
             self._random = np.random.mtrand.RandomState()
         else:
@@ -229,6 +263,7 @@ class Sampler(object):
         self.dim = dim
         self.adaptation_time = adaptation_time
         self.adaptation_lag = adaptation_lag
+        self.vectorize = vectorize
 
         # Set temperature ladder.  Append beta=0 to generated ladder.
         if betas is not None:
@@ -251,6 +286,10 @@ class Sampler(object):
         if threads > 1 and pool is None:
             self.pool = multi.Pool(threads)
 
+        if storage is None:
+            storage = ChainStorage(self.ntemps, self.nwalkers, self.dim)
+        self._storage = storage
+
         self.reset()
 
     def reset(self, random=None, betas=None, time=None):
@@ -262,10 +301,8 @@ class Sampler(object):
         """
 
         # Reset chain.
-        self._chain = None
-        self._logposterior = None
-        self._loglikelihood = None
-        self._beta_history = None
+        self._storage.reset()
+        self._nsaved = 0
 
         # Reset sampler state.
         self._time = 0
@@ -398,18 +435,69 @@ class Sampler(object):
 
             if (self._time + 1) % thin == 0:
                 if storechain:
-                    self._chain[:, :, isave, :] = p
-                    self._logposterior[:, :, isave] = logpost
-                    self._loglikelihood[:, :, isave] = logl
-                    self._beta_history[:, isave] = self._betas
+                    self._storage.save(isave, p, logpost, logl, self._betas)
                     isave += 1
+                    self._nsaved = isave
 
             self._time += 1
+            # Current state, used to resume sampling.
+            self._p0, self._logposterior0, self._loglikelihood0 =\
+                p, logpost, logl
             if swap_ratios:
                 yield p, logpost, logl, ratios
             else:
                 yield p, logpost, logl
 
+    def get_state(self):
+        """
+        Returns a dictionary with the current state of the sampler: walker
+        positions, posterior and likelihood values, temperature ladder,
+        random number generator state, acceptance counters and number of
+        stored samples. Used to checkpoint a run, see ``set_state``.
+
+        The stored samples are checkpointed by the storage: the disk storage
+        flushes its files (which are opened again by ``set_state``), the
+        in-memory storage adds a copy of its arrays.
+
+        """
+        return {
+            'p': np.array(self._p0), 'logpost': np.array(self._logposterior0),
+            'logl': np.array(self._loglikelihood0),
+            'betas': self._betas.copy(), 'time': self._time,
+            'random': self._random.get_state(),
+            'nswap': self.nswap.copy(),
+            'nswap_accepted': self.nswap_accepted.copy(),
+            'nprop': self.nprop.copy(),
+            'nprop_accepted': self.nprop_accepted.copy(),
+            'nsaved': self._nsaved,
+            'storage': self._storage.checkpoint(self._nsaved)}
+
+    def set_state(self, state):
+        """
+        Restore the state returned by ``get_state``. Calling ``sample``
+        without initial positions afterwards continues the run.
+
+        """
+        if state['p'].shape != (self.ntemps, self.nwalkers, self.dim):
+            raise ValueError('The stored walkers have shape {}, expected '
+                             '{}.'.format(state['p'].shape, (
+                                 self.ntemps, self.nwalkers, self.dim)))
+
+        self.reset()
+        self._p0 = state['p'].copy()
+        self._logposterior0 = state['logpost'].copy()
+        self._loglikelihood0 = state['logl'].copy()
+        self._betas = state['betas'].copy()
+        self._time = state['time']
+        self._random.set_state(state['random'])
+        self.nswap = state['nswap'].copy()
+        self.nswap_accepted = state['nswap_accepted'].copy()
+        self.nprop = state['nprop'].copy()
+        self.nprop_accepted = state['nprop_accepted'].copy()
+
+        self._storage.restore(state['storage'], state['nsaved'])
+        self._nsaved = state['nsaved']
+
     def _stretch(self, p, logpost, logl):
         """
         Perform the stretch-move proposal on each ensemble.
@@ -460,6 +548,11 @@ class Sampler(object):
             self.nprop_accepted[:, jupdate::2] += accepts
 
     def _evaluate(self, ps):
+        if self.vectorize:
+            logl, logp = self._likeprior.batch(ps.reshape((-1, self.dim)))
+            return logl.reshape((self.ntemps, -1)), logp.reshape(
+                (self.ntemps, -1))
+
         mapf = map if self.pool is None else self.pool.map
         results = list(mapf(self._likeprior, ps.reshape((-1, self.dim))))
 
@@ -564,9 +657,7 @@ class Sampler(object):
 
     def _expand_chain(self, nsave):
         """
-        Expand ``self._chain``, ``self._logposterior``,
-        ``self._loglikelihood``, and ``self._beta_history``
-        ahead of run to make room for new samples.
+        Expand the chain storage ahead of run to make room for new samples.
 
         :param nsave:
             The number of additional iterations for which to make room.
@@ -576,37 +667,7 @@ class Sampler(object):
 
         """
 
-        if self._chain is None:
-            isave = 0
-            self._chain = np.zeros((self.ntemps, self.nwalkers, nsave,
-                                    self.dim))
-            self._logposterior = np.zeros((self.ntemps, self.nwalkers, nsave))
-            self._loglikelihood = np.zeros((self.ntemps, self.nwalkers,
-                                            nsave))
-            self._beta_history = np.zeros((self.ntemps, nsave))
-        else:
-            isave = self._chain.shape[2]
-            self._chain = np.concatenate((self._chain,
-                                          np.zeros((self.ntemps,
-                                                    self.nwalkers,
-                                                    nsave, self.dim))),
-                                         axis=2)
-            self._logposterior = np.concatenate((self._logposterior,
-                                                 np.zeros((self.ntemps,
-                                                           self.nwalkers,
-                                                           nsave))),
-                                                axis=2)
-            self._loglikelihood = np.concatenate((self._loglikelihood,
-                                                  np.zeros((self.ntemps,
-                                                           self.nwalkers,
-                                                           nsave))),
-                                                 axis=2)
-            self._beta_history = np.concatenate((self._beta_history,
-                                                 np.zeros((self.ntemps,
-                                                           nsave))),
-                                                axis=1)
-
-        return isave
+        return self._storage.expand(nsave)
 
     def log_evidence_estimate(self, logls=None, fburnin=0.1):
         """
@@ -631,6 +692,9 @@ class Sampler(object):
         """
 
         if logls is None:
+            if self._storage.cold_only:
+                raise ValueError('Only the cold chain log likelihoods are '
+                                 'stored.')
             if self.loglikelihood is not None:
                 logls = self.loglikelihood
             else:
@@ -671,10 +735,11 @@ class Sampler(object):
     def chain(self):
         """
         Returns the stored chain of samples; shape ``(Ntemps,
-        Nwalkers, Nsteps, Ndim)``.
+        Nwalkers, Nsteps, Ndim)``. If only the cold chain is stored,
+        ``Ntemps=1``.
 
         """
-        return self._chain
+        return self._storage.chain
 
     @property
     def flatchain(self):
@@ -685,7 +750,7 @@ class Sampler(object):
 
         s = self.chain.shape
 
-        return self._chain.reshape((s[0], -1, s[3]))
+        return self.chain.reshape((s[0], -1, s[3]))
 
     @property
     def logprobability(self):
@@ -693,7 +758,7 @@ class Sampler(object):
         Matrix of logprobability values; shape ``(Ntemps, Nwalkers, Nsteps)``.
 
         """
-        return self._logposterior
+        return self._storage.logposterior
 
     @property
     def loglikelihood(self):
@@ -701,7 +766,7 @@ class Sampler(object):
         Matrix of log-likelihood values; shape ``(Ntemps, Nwalkers, Nsteps)``.
 
         """
-        return self._loglikelihood
+        return self._storage.loglikelihood
 
     @property
     def beta_history(self):
@@ -709,7 +774,7 @@ class Sampler(object):
         Matrix of inverse temperatures; shape ``(Ntemps, Nsteps)``.
 
         """
-        return self._beta_history
+        return self._storage.beta_history
 
     @property
     def tswap_acceptance_fraction(self):
@@ -756,9 +821,10 @@ class Sampler(object):
             maximum number of lags to use. (default: 50)
 
         """
-        acors = np.zeros((self.ntemps, self.dim))
+        chain = self.chain
+        acors = np.zeros((chain.shape[0], self.dim))
 
-        for i in range(self.ntemps):
-            x = np.mean(self._chain[i, :, :, :], axis=0)
+        for i in range(chain.shape[0]):
+            x = np.mean(chain[i, :, :, :], axis=0)
             acors[i, :] = util.autocorr_integrated_time(x, window=window)
         return acors
@@ -0,0 +1,334 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from __future__ import (division, print_function, absolute_import,
+                        unicode_literals)
+
+__all__ = ["ChainStorage", "MemmapChainStorage"]
+
+import os
+import numpy as np
+
+
+class ChainStorage(object):
+    """
+    In-memory storage for the chain, log-posterior, log-likelihood and
+    inverse temperature values of a :class:`Sampler`.
+
+    :param ntemps:
+        The number of temperatures.
+
+    :param nwalkers:
+        The number of walkers at each temperature.
+
+    :param dim:
+        The dimension of parameter space.
+
+    :param cold_only: (optional)
+        If ``True`` only the samples of the cold (``beta=1``) chain are
+        stored, and the stored arrays have a single temperature.
+        Default: ``False``.
+
+    """
+    def __init__(self, ntemps, nwalkers, dim, cold_only=False):
+        self.ntemps = 1 if cold_only else ntemps
+        # The inverse temperatures are always stored for all the chains.
+        self.nbetas = ntemps
+        self.nwalkers = nwalkers
+        self.dim = dim
+        self.cold_only = cold_only
+        self.reset()
+
+    def reset(self):
+        """
+        Remove all the stored samples.
+
+        """
+        self._chain = None
+        self._logposterior = None
+        self._loglikelihood = None
+        self._beta_history = None
+
+    @property
+    def nsave(self):
+        """
+        The number of iterations for which there is room.
+
+        """
+        return 0 if self._chain is None else self._chain.shape[2]
+
+    def expand(self, nsave):
+        """
+        Make room for ``nsave`` additional iterations.
+
+        :return ``isave``:
+            Returns the index at which to begin inserting new entries.
+
+        """
+        isave = self.nsave
+        shape = (self.ntemps, self.nwalkers, nsave)
+        if self._chain is None:
+            self._chain = np.zeros(shape + (self.dim,))
+            self._logposterior = np.zeros(shape)
+            self._loglikelihood = np.zeros(shape)
+            self._beta_history = np.zeros((self.nbetas, nsave))
+        else:
+            self._chain = np.concatenate(
+                (self._chain, np.zeros(shape + (self.dim,))), axis=2)
+            self._logposterior = np.concatenate(
+                (self._logposterior, np.zeros(shape)), axis=2)
+            self._loglikelihood = np.concatenate(
+                (self._loglikelihood, np.zeros(shape)), axis=2)
+            self._beta_history = np.concatenate(
+                (self._beta_history, np.zeros((self.nbetas, nsave))), axis=1)
+
+        return isave
+
+    def save(self, isave, p, logpost, logl, betas):
+        """
+        Store the positions, log-posterior and log-likelihood values of all
+        the walkers, and the inverse temperatures, for the iteration
+        ``isave``.
+
+        """
+        nt = self.ntemps
+        self._chain[:, :, isave, :] = p[:nt]
+        self._logposterior[:, :, isave] = logpost[:nt]
+        self._loglikelihood[:, :, isave] = logl[:nt]
+        self._beta_history[:, isave] = betas
+
+    def checkpoint(self, nsave):
+        """
+        Data required by ``restore`` to recover the first ``nsave`` stored
+        iterations in a new storage. The in-memory storage has to return
+        copies of all the stored values.
+
+        """
+        if nsave == 0:
+            return None
+        return [np.array(self._chain[:, :, :nsave]),
+                np.array(self._logposterior[:, :, :nsave]),
+                np.array(self._loglikelihood[:, :, :nsave]),
+                np.array(self._beta_history[:, :nsave])]
+
+    def restore(self, data, nsave):
+        """
+        Recover the ``nsave`` iterations stored by ``checkpoint``.
+
+        """
+        self.reset()
+        if nsave == 0:
+            return
+        if data[0].shape[:2] != (self.ntemps, self.nwalkers):
+            raise ValueError('The stored chain has shape {}, expected '
+                             '{}.'.format(data[0].shape[:2], (
+                                 self.ntemps, self.nwalkers)))
+        self._chain, self._logposterior, self._loglikelihood,\
+            self._beta_history = [np.array(_) for _ in data]
+
+    @property
+    def chain(self):
+        """
+        Stored samples; shape ``(Ntemps, Nwalkers, Nsteps, Ndim)``.
+
+        """
+        return self._chain
+
+    @property
+    def logposterior(self):
+        """
+        Stored log-posterior values; shape ``(Ntemps, Nwalkers, Nsteps)``.
+
+        """
+        return self._logposterior
+
+    @property
+    def loglikelihood(self):
+        """
+        Stored log-likelihood values; shape ``(Ntemps, Nwalkers, Nsteps)``.
+
+        """
+        return self._loglikelihood
+
+    @property
+    def beta_history(self):
+        """
+        Stored inverse temperatures; shape ``(Ntemps, Nsteps)``.
+
+        """
+        return self._beta_history
+
+    def close(self):
+        """
+        Release the storage. Nothing to do for the in-memory storage.
+
+        """
+        pass
+
+
+class MemmapChainStorage(ChainStorage):
+    """
+    Storage for the chain, log-posterior, log-likelihood and inverse
+    temperature values written to memory-mapped ``.npy`` files, so that only
+    the pages in use are kept in memory.
+
+    The files store the iterations along their first axis (ie: the chain is
+    stored with shape ``(Nsteps, Ntemps, Nwalkers, Ndim)``), so every
+    iteration is written as a contiguous block. The ``chain``,
+    ``logposterior``, ``loglikelihood`` and ``beta_history`` properties
+    return views with the same shapes as the in-memory storage.
+
+    A checkpoint only flushes the files, which are opened again by
+    ``restore`` (the storage must use the same ``file_path``).
+
+    :param file_path:
+        Path (without extension) used to generate the names of the files:
+        ``file_path + '_chain.npy'``, ``'_logpost.npy'``, ``'_logl.npy'``
+        and ``'_betas.npy'``.
+
+    :param remove: (optional)
+        If ``True`` the files are removed when the storage is closed.
+        Default: ``False``.
+
+    """
+    def __init__(self, file_path, ntemps, nwalkers, dim, cold_only=False,
+                 remove=False):
+        self.file_path = file_path
+        self.remove = remove
+        super(MemmapChainStorage, self).__init__(
+            ntemps, nwalkers, dim, cold_only)
+
+    def files(self):
+        """
+        Names of the files used by the storage.
+
+        """
+        return [self.file_path + _ for _ in (
+            '_chain.npy', '_logpost.npy', '_logl.npy', '_betas.npy')]
+
+    @property
+    def nsave(self):
+        return 0 if self._chain is None else self._chain.shape[0]
+
+    def shapes(self, nsave):
+        """
+        Shapes of the arrays stored in the files, for ``nsave`` iterations.
+
+        """
+        shape = (nsave, self.ntemps, self.nwalkers)
+        return shape + (self.dim,), shape, shape, (nsave, self.nbetas)
+
+    def expand(self, nsave):
+        isave = self.nsave
+        old = (self._chain, self._logposterior, self._loglikelihood,
+               self._beta_history)
+
+        arrs = []
+        for i, (f_path, shp) in enumerate(zip(
+                self.files(), self.shapes(isave + nsave))):
+            if old[i] is None:
+                arr = np.lib.format.open_memmap(
+                    f_path, mode='w+', dtype=float, shape=shp)
+            else:
+                # The shape of a '.npy' file can not be changed, write the
+                # stored iterations into a new (larger) file.
+                tmp_path = f_path[:-4] + '.tmp.npy'
+                arr = np.lib.format.open_memmap(
+                    tmp_path, mode='w+', dtype=float, shape=shp)
+                arr[:isave] = old[i]
+                arr.flush()
+                del arr
+                os.replace(tmp_path, f_path)
+                arr = np.load(f_path, mmap_mode='r+')
+            arrs.append(arr)
+        self._chain, self._logposterior, self._loglikelihood,\
+            self._beta_history = arrs
+
+        return isave
+
+    def save(self, isave, p, logpost, logl, betas):
+        nt = self.ntemps
+        self._chain[isave] = p[:nt]
+        self._logposterior[isave] = logpost[:nt]
+        self._loglikelihood[isave] = logl[:nt]
+        self._beta_history[isave] = betas
+
+    def checkpoint(self, nsave):
+        """
+        Write the stored iterations to disk. Nothing else is required to
+        restore them.
+
+        """
+        self.flush()
+        return None
+
+    def restore(self, data, nsave):
+        """
+        Open the files written by a previous run, keeping their first
+        ``nsave`` iterations.
+
+        """
+        self.reset()
+        if nsave == 0:
+            return
+        arrs = []
+        for f_path, shp in zip(self.files(), self.shapes(nsave)):
+            try:
+                arr = np.load(f_path, mmap_mode='r+')
+            except (OSError, ValueError):
+                raise ValueError('The chain file {} could not be '
+                                 'read.'.format(f_path))
+            if arr.shape[1:] != shp[1:] or arr.shape[0] < nsave:
+                raise ValueError('The chain file {} has shape {}, expected '
+                                 '{}.'.format(f_path, arr.shape, shp))
+            arrs.append(arr[:nsave])
+        self._chain, self._logposterior, self._loglikelihood,\
+            self._beta_history = arrs
+
+    def flush(self):
+        """
+        Write the stored iterations to disk.
+
+        """
+        for arr in (self._chain, self._logposterior, self._loglikelihood,
+                    self._beta_history):
+            if arr is not None:
+                arr.flush()
+
+    @property
+    def chain(self):
+        if self._chain is None:
+            return None
+        return np.moveaxis(self._chain, 0, 2)
+
+    @property
+    def logposterior(self):
+        if self._logposterior is None:
+            return None
+        return np.moveaxis(self._logposterior, 0, 2)
+
+    @property
+    def loglikelihood(self):
+        if self._loglikelihood is None:
+            return None
+        return np.moveaxis(self._loglikelihood, 0, 2)
+
+    @property
+    def beta_history(self):
+        if self._beta_history is None:
+            return None
+        return self._beta_history.T
+
+    def close(self):
+        """
+        Flush the files and, if ``remove`` is ``True``, remove them.
+
+        """
+        self.flush()
+        self.reset()
+        if self.remove:
+            for f_path in self.files():
+                try:
+                    os.remove(f_path)
+                except OSError:
+                    pass
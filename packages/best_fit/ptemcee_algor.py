@@ -1,18 +1,28 @@
 
+import os
+import pickle
 import numpy as np
+import multiprocessing as mp
+import signal
 import warnings
 import time as t
 from ..synth_clust import synth_cluster
+from ..synth_clust import isoch_cache
+from ..inp import tracks_store
 from . import likelihood
 from .bf_common import initPop, varPars, rangeCheck, fillParams
-from .ptemcee import sampler
+from .ptemcee import sampler, util
+from .ptemcee.storage import ChainStorage, MemmapChainStorage
 
 
 def main(
     completeness, max_mag_syn, obs_clust, ext_coefs, st_dist_mass, N_fc,
-    err_pars, m_ini_idx, binar_flag, lkl_method, fundam_params, theor_tracks,
-    R_V, pt_ntemps, pt_adapt, pt_tmax, priors_mcee, nsteps_mcee,
-        nwalkers_mcee, mins_max, **kwargs):
+    err_pars, chain_file_out, checkpoint_file_out, m_ini_idx, binar_flag,
+    lkl_method, fundam_params, theor_tracks, R_V, pt_ntemps, pt_adapt,
+    pt_tmax, pt_nprocs, priors_mcee, nsteps_mcee, nwalkers_mcee, nburn_mcee,
+    mins_max, cache_mb, cache_steps, pt_storage,
+    pt_cold_only, full_trace_flag, pt_checkpoint, pt_resume, pt_ess_min,
+        pt_tau_stable, pt_batch, **kwargs):
     """
     """
 
@@ -37,86 +47,185 @@ def main(
     max_secs = mins_max * 60.
     available_secs = max(30, max_secs)
 
-    # Define Parallel tempered sampler
-    ptsampler = sampler.Sampler(
-        nwalkers_mcee, ndim, loglkl, logp,
-        loglargs=[fundam_params, synthcl_args, lkl_method, obs_clust, ranges,
-                  varIdxs, priors_mcee], Tmax=Tmax, ntemps=pt_ntemps)
-
-    ntemps = ptsampler.ntemps
-    # Initial population.
-    pos0 = initPop(
-        ranges, varIdxs, lkl_method, obs_clust, fundam_params, synthcl_args,
-        ntemps, nwalkers_mcee, 'random', None, None)
-
-    # Track how the acceptance fractions, and temperature swaps acceptance
-    # fractions.
-    afs, tswaps = [], []
-    # Store for Lkl values for plotting.
-    prob_mean, map_lkl, map_sol_old = [], [], [[], -np.inf]
-
-    with warnings.catch_warnings():
-        warnings.simplefilter("ignore")
-
-        N_steps_store, runs = 50, 0
-
-        elapsed, start = 0., t.time()
-        milestones = list(range(10, 101, 10))
-        for i, (pos, lnprob, lnlike) in enumerate(ptsampler.sample(
-                pos0, iterations=nsteps_mcee, adapt=pt_adapt)):
-
-            # Only check convergence every 'N_steps_store' steps
-            if (i + 1) % N_steps_store:
-                continue
-            runs += 1
-
-            # Temperature swap acceptance fractions.
-            tswaps.append(ptsampler.tswap_acceptance_fraction)
-            # Mean acceptance fractions for all temperatures.
-            afs.append(np.mean(ptsampler.acceptance_fraction, axis=1))
-
-            # # Autocorrelation time for the non-tempered chain. Mean across
-            # # chains.
-            # # ptsampler.chain.shape: (ntemps, nwalkers, nsteps, ndim)
-            # # x.shape: (nsteps, ndim)
-            # x = np.mean(ptsampler.chain[0, :, :i, :], axis=0)
-            # # x = np.mean(ptsampler.chain[0], axis=0)
-            # # tau.shape: ndim
-            # tau = util.autocorr_integrated_time(x)
-            # # Autocorrelation time. Mean across dimensions.
-            # tau_autocorr.append(np.mean(tau))
-
-            maf = np.mean(ptsampler.acceptance_fraction[0])
-            # Store MAP solution in this iteration.
-            prob_mean.append(np.mean(lnprob[0]))
-            idx_best = np.argmax(lnprob[0])
-            # Update if a new optimal solution was found.
-            if lnprob[0][idx_best] > map_sol_old[1]:
-                map_sol_old = [
-                    fillParams(fundam_params, varIdxs, pos[0][idx_best]),
-                    lnprob[0][idx_best]]
-            map_lkl.append(map_sol_old[1])
-
-            # Time used to check how fast the sampler is advancing.
-            elapsed += t.time() - start
-            start = t.time()
-            # Print progress.
-            percentage_complete = (100. * (i + 1) / nsteps_mcee)
-            if len(milestones) > 0 and percentage_complete >= milestones[0]:
-                map_sol, logprob = map_sol_old
-                m, s = divmod(nsteps_mcee / (i / elapsed) - elapsed, 60)
-                h, m = divmod(m, 60)
-                print("{:>3}% ({:.3f}) LP={:.1f} ({:.5f}, {:.3f}, {:.3f}, "
-                      "{:.2f}, {:.0f}, {:.2f})".format(
-                          milestones[0], maf, logprob, *map_sol) +
-                      " [{:.0f} m/s | {:.0f}h{:.0f}m]".format(
-                          (ntemps * nwalkers_mcee * i) / elapsed, h, m))
-                milestones = milestones[1:]
-
-            # Stop when available time is consumed.
-            if elapsed >= available_secs:
-                print("  Time consumed")
-                break
+    # Cache of averaged and moved isochrones.
+    isoch_cache.setup(cache_mb, cache_steps)
+
+    loglargs = [fundam_params, synthcl_args, lkl_method, obs_clust, ranges,
+                varIdxs, priors_mcee]
+    pool, lkl_func, vectorize = None, loglkl, False
+    if pt_nprocs > 1:
+        # The workers receive the (large) arguments of the likelihood only
+        # once, when they are started.
+        pool, shm = workersPool(
+            pt_nprocs, loglargs, [cache_mb, cache_steps])
+        lkl_func, loglargs, vectorize = loglklPool,\
+            [pool, pt_nprocs, pt_batch], True
+
+    try:
+        # Temperature ladder.
+        betas = sampler.default_beta_ladder(ndim, ntemps=pt_ntemps, Tmax=Tmax)
+        ntemps = len(betas)
+
+        # Storage for the chains.
+        if pt_storage == 'disk':
+            # Keep the files only if the trace is saved.
+            storage = MemmapChainStorage(
+                chain_file_out, ntemps, nwalkers_mcee, ndim, pt_cold_only,
+                remove=not full_trace_flag)
+        else:
+            storage = ChainStorage(ntemps, nwalkers_mcee, ndim, pt_cold_only)
+
+        # Define Parallel tempered sampler
+        ptsampler = sampler.Sampler(
+            nwalkers_mcee, ndim, lkl_func, logp, loglargs=loglargs,
+            betas=betas, vectorize=vectorize, storage=storage)
+
+        # Track how the acceptance fractions, and temperature swaps acceptance
+        # fractions.
+        afs, tswaps = [], []
+        # Store for Lkl values for plotting.
+        prob_mean, map_lkl, map_sol_old = [], [], [[], -np.inf]
+        runs, elapsed = 0, 0.
+
+        chkp = None
+        if pt_resume:
+            chkp = checkpointLoad(checkpoint_file_out)
+        if chkp is not None:
+            # Continue from the last checkpoint.
+            ptsampler.set_state(chkp['sampler'])
+            afs, tswaps, prob_mean, map_lkl, map_sol_old, runs, elapsed =\
+                chkp['diagnostics']
+            pos0 = None
+            print("Resuming from checkpoint (step {})".format(ptsampler.time))
+        else:
+            # Initial population.
+            pos0 = initPop(
+                ranges, varIdxs, lkl_method, obs_clust, fundam_params,
+                synthcl_args, ntemps, nwalkers_mcee, 'random', None, None)
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+
+            N_steps_store = 50
+
+            # Steps (and time) already done if the run was resumed.
+            i0 = ptsampler.time
+
+            # Mean across walkers of the cold chain, stored in blocks of
+            # 'N_steps_store' steps for the convergence monitor, so that the
+            # (possibly on disk) chain is read only once.
+            x_mean, old_tau, completed = [], np.inf, False
+            if pt_ess_min > 0. and i0 > 0:
+                x_mean.append(np.mean(ptsampler.chain[0, :, :i0], axis=0))
+
+            i = max(i0 - 1, 0)
+            elapsed0, start = elapsed, t.time()
+            chkp_start = start
+            milestones = [
+                _ for _ in range(10, 101, 10) if _ > 100. * i0 / nsteps_mcee]
+            for i, (pos, lnprob, lnlike) in enumerate(ptsampler.sample(
+                    pos0, iterations=nsteps_mcee - i0, adapt=pt_adapt), i0):
+
+                # Only check convergence every 'N_steps_store' steps
+                if (i + 1) % N_steps_store:
+                    continue
+                runs += 1
+
+                # Temperature swap acceptance fractions.
+                tswaps.append(ptsampler.tswap_acceptance_fraction)
+                # Mean acceptance fractions for all temperatures.
+                afs.append(np.mean(ptsampler.acceptance_fraction, axis=1))
+
+                maf = np.mean(ptsampler.acceptance_fraction[0])
+                # Store MAP solution in this iteration.
+                prob_mean.append(np.mean(lnprob[0]))
+                idx_best = np.argmax(lnprob[0])
+                # Update if a new optimal solution was found.
+                if lnprob[0][idx_best] > map_sol_old[1]:
+                    map_sol_old = [
+                        fillParams(fundam_params, varIdxs, pos[0][idx_best]),
+                        lnprob[0][idx_best]]
+                map_lkl.append(map_sol_old[1])
+
+                # Time used to check how fast the sampler is advancing.
+                elapsed += t.time() - start
+                start = t.time()
+                # Print progress.
+                percentage_complete = (100. * (i + 1) / nsteps_mcee)
+                if len(milestones) > 0 and\
+                        percentage_complete >= milestones[0]:
+                    map_sol, logprob = map_sol_old
+                    m, s = divmod(nsteps_mcee / (i / elapsed) - elapsed, 60)
+                    h, m = divmod(m, 60)
+                    print("{:>3}% ({:.3f}) LP={:.1f} ({:.5f}, {:.3f}, {:.3f}, "
+                          "{:.2f}, {:.0f}, {:.2f})".format(
+                              milestones[0], maf, logprob, *map_sol) +
+                          " [{:.0f} m/s | {:.0f}h{:.0f}m]".format(
+                              (ntemps * nwalkers_mcee * i) / elapsed, h, m))
+                    milestones = milestones[1:]
+
+                diagnostics = [
+                    afs, tswaps, prob_mean, map_lkl, map_sol_old, runs,
+                    elapsed]
+
+                # Stop when the chain has converged.
+                if pt_ess_min > 0.:
+                    x_mean.append(np.mean(ptsampler.chain[
+                        0, :, i + 1 - N_steps_store:i + 1], axis=0))
+                    tau, ess = convergenceMonitor(
+                        x_mean, nburn_mcee, nwalkers_mcee)
+                    if ess >= pt_ess_min and\
+                            np.abs(old_tau - tau) / tau < pt_tau_stable:
+                        print("  Convergence reached at step {} (tau={:.1f}, "
+                              "ESS={:.0f})".format(i + 1, tau, ess))
+                        completed = True
+                        break
+                    old_tau = tau
+
+                # Stop when available time is consumed.
+                if elapsed - elapsed0 >= available_secs:
+                    print("  Time consumed")
+                    if pt_checkpoint > 0. and i + 1 < nsteps_mcee:
+                        checkpointSave(
+                            checkpoint_file_out, ptsampler, diagnostics)
+                    break
+
+                # Store the state of the sampler periodically.
+                if pt_checkpoint > 0. and\
+                        t.time() - chkp_start >= pt_checkpoint * 60.:
+                    checkpointSave(checkpoint_file_out, ptsampler, diagnostics)
+                    chkp_start = t.time()
+            else:
+                completed = True
+    except BaseException:
+        # Stop the workers at once, 'close()' would wait for the pending
+        # tasks.
+        if pool is not None:
+            pool.terminate()
+        raise
+    else:
+        if pool is not None:
+            pool.close()
+    finally:
+        if pool is not None:
+            pool.join()
+            tracks_store.shareRelease(shm)
+
+    if os.path.isfile(checkpoint_file_out):
+        if completed:
+            # The run is complete, the checkpoint is no longer needed.
+            os.remove(checkpoint_file_out)
+        elif pt_storage == 'disk':
+            # The checkpoint resumes from the stored chain files.
+            storage.remove = False
+
+    if pool is not None:
+        cache_stats = isoch_cache.statsMerge(_pool_stats.values())
+        _pool_stats.clear()
+    else:
+        cache_stats = isoch_cache.stats()
+    if isoch_cache.enabled():
+        isoch_cache.statsPrint(cache_stats)
 
     # Total number of steps
     N_steps = N_steps_store * np.arange(1, runs + 1)
@@ -126,7 +235,8 @@ def main(
     # Temperature swaps acceptance fractions.
     tswaps_afs = np.asarray(tswaps).T
     # Betas history
-    betas_pt = ptsampler.beta_history[:, (N_steps_store - 1)::N_steps_store]
+    betas_pt = np.array(
+        ptsampler.beta_history[:, (N_steps_store - 1)::N_steps_store])
 
     # Final MAP fit.
     map_sol, map_lkl_final = map_sol_old
@@ -140,19 +250,70 @@ def main(
 
     # ptsampler.chain.shape: (ntemps, nchains, nsteps, ndim)
     # cold_chain.shape: (i, nchains, ndim)
-    cold_chain = ptsampler.chain[0, :, :i, :].transpose(1, 0, 2)
+    cold_chain = np.array(ptsampler.chain[0, :, :i, :].transpose(1, 0, 2))
+    storage.close()
 
     isoch_fit_params = {
         'varIdxs': varIdxs, 'ndim': ndim, 'Tmax': str(Tmax),
         'map_sol': map_sol, 'map_lkl': map_lkl, 'map_lkl_final': map_lkl_final,
         'prob_mean': prob_mean, 'bf_elapsed': elapsed, 'maf_allT': maf_allT,
         'tswaps_afs': tswaps_afs, 'betas_pt': betas_pt, 'N_steps': N_steps,
-        'cold_chain': cold_chain
+        'cold_chain': cold_chain, 'cache_stats': cache_stats
     }
 
     return isoch_fit_params
 
 
+def convergenceMonitor(x_mean, nburn_mcee, nwalkers):
+    """
+    Integrated autocorrelation time (mean across dimensions) and effective
+    sample size of the cold chain, after discarding the burn-in. Estimated
+    from the mean across walkers, stored in the 'x_mean' blocks.
+    """
+    # x.shape: (nsteps, ndim)
+    x = np.concatenate(x_mean)
+    x = x[int(nburn_mcee * x.shape[0]):]
+    tau = np.mean(util.autocorr_integrated_time(x))
+    ess = nwalkers * x.shape[0] / tau
+
+    return tau, ess
+
+
+def checkpointSave(checkpoint_file_out, ptsampler, diagnostics):
+    """
+    Store the state of the sampler and the diagnostics accumulated so far,
+    so that the run can be resumed. The file is written atomically so that
+    a run killed while saving keeps the previous checkpoint.
+
+    The stored chain is only written to the checkpoint by the 'memory'
+    storage. The 'disk' storage flushes its files, which are opened again
+    when the run is resumed.
+    """
+    chkp = {
+        'sampler': ptsampler.get_state(), 'diagnostics': diagnostics,
+        'np_random': np.random.get_state()}
+    tmp_file = checkpoint_file_out + '.tmp'
+    with open(tmp_file, 'wb') as f:
+        pickle.dump(chkp, f)
+    os.replace(tmp_file, checkpoint_file_out)
+
+
+def checkpointLoad(checkpoint_file_out):
+    """
+    Load the last checkpoint, if it exists.
+    """
+    try:
+        with open(checkpoint_file_out, 'rb') as f:
+            chkp = pickle.load(f)
+    except OSError:
+        print("  WARNING: no checkpoint file found, starting a new run")
+        return None
+
+    np.random.set_state(chkp['np_random'])
+
+    return chkp
+
+
 def loglkl(
     model, fundam_params, synthcl_args, lkl_method, obs_clust, ranges,
         varIdxs, priors):
@@ -181,6 +342,83 @@ def loglkl(
     return logpost
 
 
+def workersPool(nprocs, loglargs, cache_pars):
+    """
+    Start the pool of processes used to evaluate the likelihood. Each worker
+    stores the likelihood arguments in '_worker_args', and keeps its own
+    isochrones cache limited to 'cache_mb / nprocs' Mb.
+
+    The workers are not seeded: the evaluation of a model draws no random
+    numbers (the IMF masses, binary systems and photometric noise are taken
+    from values generated with the seeded generator before the sampler
+    starts). The results do not depend on which worker evaluates each
+    model.
+
+    The 'theor_tracks' array is not copied into the workers, they access it
+    through its memory-mapped file or a shared memory block (see
+    'tracks_store.shareTracks()').
+    """
+    synthcl_args = loglargs[1]
+    tracks_descr, shm = tracks_store.shareTracks(synthcl_args[0])
+    loglargs = [loglargs[0], [tracks_descr] + synthcl_args[1:]] + loglargs[2:]
+
+    pool = mp.Pool(
+        nprocs, initializer=initWorker,
+        initargs=(loglargs, [cache_pars[0] / nprocs, cache_pars[1]]))
+
+    return pool, shm
+
+
+# Likelihood arguments and shared memory block (if used) stored in each
+# worker process.
+_worker_args, _worker_shm = None, None
+# Isochrones cache statistics of each worker, stored in the main process.
+_pool_stats = {}
+
+
+def initWorker(loglargs, cache_pars):
+    """
+    Initialize a worker process. Ctrl-C is handled by the main process,
+    which stops the workers.
+    """
+    global _worker_args, _worker_shm
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # Replace the descriptor with the shared 'theor_tracks' array.
+    synthcl_args = loglargs[1]
+    theor_tracks, _worker_shm = tracks_store.loadTracks(synthcl_args[0])
+    _worker_args = [loglargs[0], [theor_tracks] + synthcl_args[1:]] +\
+        loglargs[2:]
+
+    isoch_cache.setup(*cache_pars)
+
+
+def workerLkl(models):
+    """
+    Evaluate a chunk of models inside a worker process. The worker's cache
+    statistics are returned along with the results.
+    """
+    logpost = np.array([loglkl(_, *_worker_args) for _ in models])
+    return logpost, os.getpid(), isoch_cache.stats()
+
+
+def loglklPool(models, pool, nprocs, N_batch):
+    """
+    Split the models in chunks of 'N_batch' models (or 'nprocs' chunks if
+    'N_batch' is 0) and evaluate them in parallel.
+    """
+    models = np.asarray(models)
+    if N_batch > 0:
+        chunks = np.array_split(
+            models, range(N_batch, models.shape[0], N_batch))
+    else:
+        chunks = np.array_split(models, nprocs)
+    logpost = []
+    for lp, pid, cache_stats in pool.map(workerLkl, chunks):
+        logpost.append(lp)
+        _pool_stats[pid] = cache_stats
+    return np.concatenate(logpost)
+
+
 def logp(_):
     """
     Just here as a place holder for 'ptemcee'.
@@ -5,8 +5,8 @@ from packages.inp import names_paths
 
 def check(
     cl_files, da_algor, da_algors_accpt, bayesda_runs, bayesda_dflag,
-    fld_rem_methods, bin_methods, fld_clean_mode, fld_clean_bin, colors,
-        **kwargs):
+    bayesda_mb, bayesda_nprocs, bayesda_tol, fld_rem_methods, bin_methods,
+        fld_clean_mode, fld_clean_bin, colors, **kwargs):
     """
     Check parameters related to the decontamination algorithm functions.
     """
@@ -32,6 +32,22 @@ def check(
                 "there are {} 'bayes' DA weights defined, there should "
                 "be {}.".format(len(bayesda_dflag), 5 + len(colors)))
 
+        if bayesda_mb <= 0.:
+            raise ValueError("the memory limit for the Bayesian DA ({}) must\n"
+                             "be larger than 0.".format(bayesda_mb))
+        if bayesda_nprocs < 1:
+            raise ValueError("the minimum number of processes for the "
+                             "Bayesian DA is 1.")
+        if bayesda_tol not in ('n', 'none', 'None'):
+            try:
+                tol = float(bayesda_tol)
+            except ValueError:
+                raise ValueError("Bayesian DA tolerance '{}' is not a valid"
+                                 " float.".format(bayesda_tol))
+            if not 0. < tol < 1.:
+                raise ValueError("Bayesian DA tolerance must be in the range"
+                                 " (0., 1.)")
+
     # 'Read' mode is set.
     if da_algor == 'read':
         # Check if file exists.
@@ -41,6 +41,37 @@ def checkPtemcee(pd):
         if int(float(pd['pt_ntemps'])) < 1:
             raise ValueError("the minimum number of temperatures is 1.")
 
+    if pd['pt_nprocs'] < 1:
+        raise ValueError("the minimum number of processes is 1.")
+
+    if pd['pt_storage'] not in ('memory', 'disk'):
+        raise ValueError("the chain storage must be one of 'memory' or"
+                         " 'disk'.")
+
+    if pd['pt_checkpoint'] < 0.:
+        raise ValueError("the time between checkpoints can not be"
+                         " negative.")
+
+    if pd['pt_ess_min'] < 0.:
+        raise ValueError("the minimum effective sample size can not be"
+                         " negative.")
+    if pd['pt_tau_stable'] <= 0.:
+        raise ValueError("the autocorrelation time stability threshold must"
+                         " be positive.")
+
+    if pd['pt_batch'] < 0:
+        raise ValueError("the number of models per batch can not be"
+                         " negative.")
+
+    if pd['cache_mb'] < 0.:
+        raise ValueError("the isochrones cache size can not be negative.")
+    if len(pd['cache_steps']) != 4:
+        raise ValueError("four quantization steps must be defined for the"
+                         " isochrones cache.")
+    if min(pd['cache_steps']) < 0.:
+        raise ValueError("the isochrones cache quantization steps can not"
+                         " be negative.")
+
     try:
         float(pd['pt_tmax'])
     except ValueError:
@@ -85,6 +116,22 @@ def chechLkl(pd):
     #              "\nfit' function does not match a valid input."
     #              .format(pd['lkl_weight']))
 
+    # Check 'tolstoy' evaluation parameters.
+    if pd['lkl_tol'] in ('n', 'none', 'None'):
+        pd['lkl_tol'] = None
+    else:
+        try:
+            pd['lkl_tol'] = float(pd['lkl_tol'])
+        except ValueError:
+            raise ValueError("likelihood tolerance '{}' is not a valid"
+                             " float.".format(pd['lkl_tol']))
+        if not 0. < pd['lkl_tol'] < 1.:
+            raise ValueError("likelihood tolerance must be in the range"
+                             " (0., 1.)")
+    if pd['lkl_max_pairs'] < 1:
+        raise ValueError("the maximum number of pairs of stars must be"
+                         " positive.")
+
     # Check mass range selected.
     m_range = pd['par_ranges'][4]
     if pd['lkl_method'] == 'tolstoy':
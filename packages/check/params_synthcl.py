@@ -115,6 +115,27 @@ def checkSynthClustParams(pd):
             "Binary mass ratio set ('{}') is out of\nboundaries. Please select"
             " a value in the range [0., 1.]".format(pd['bin_mr']))
 
+    # Check isochrones interpolation parameters.
+    if pd['N_interp'] != 'auto':
+        try:
+            pd['N_interp'] = int(pd['N_interp'])
+        except ValueError:
+            raise ValueError("Number of interpolated points ({}) is not"
+                             " valid.".format(pd['N_interp']))
+        if pd['N_interp'] < 2:
+            raise ValueError("Number of interpolated points ({}) must be"
+                             " larger than 1.".format(pd['N_interp']))
+    if pd['interp_mode'] not in ('uniform', 'mass'):
+        raise ValueError("Isochrones interpolation mode ({}) is not"
+                         " valid.".format(pd['interp_mode']))
+    if pd['grid_cache_mb'] < 0.:
+        raise ValueError("The size of the isochrones grid cache ({}) can"
+                         " not be negative.".format(pd['grid_cache_mb']))
+
+    if pd['N_IMF'] < 1:
+        raise ValueError("The number of IMF realizations ({}) must be"
+                         " larger than 0.".format(pd['N_IMF']))
+
     # Check R_V defined.
     if pd['R_V'] <= 0.:
         raise ValueError(
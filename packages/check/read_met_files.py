@@ -1,8 +1,10 @@
 
+from os.path import join, dirname
 import numpy as np
 from packages.inp import readZA
 from packages.inp import read_isochs
 from packages.inp import interp_isochs
+from packages.inp import tracks_store
 
 
 def check_get(pd):
@@ -29,44 +31,38 @@ def check_get(pd):
         # Store the common grid values for the metallicity and age.
         pd['fundam_params'][:2] = met_vals_all, age_vals_all
 
-        # Get isochrones and their extra parameters (mass, etc.).
-        isoch_list, extra_pars = read_isochs.main(
-            met_files, ages_strs, pd['evol_track'], pd['CMD_extra_pars'],
-            pd['all_syst_filters'])
-
-        # Check equality of the initial mass across photometric systems.
-        miniCheck(extra_pars, met_vals_all, age_vals_all)
-
-        # Once the above check has passed, remove the extra 'M_ini' array
-        # from 'extra_pars'.
-        # TODO this will need the change when/if more extra parameters are
-        # stored beyond 'M_ini'
-        extra_pars2 = [[] for _ in met_vals_all]
-        for i, z in enumerate(extra_pars):
-            ages = [[] for _ in age_vals_all]
-            for j, a in enumerate(z):
-                ages[j].append(a[0])
-            extra_pars2[i] = ages
-        extra_pars = extra_pars2
-
-        # Take the synthetic data from the unique filters read, create the
-        # necessary colors, and position the magnitudes and colors in the
-        # same order as they are read from the cluster's data file.
-        # The mags_cols_theor list contains the magnitudes used to create the
-        # defined colors. This is necessary to properly add binarity to the
-        # synthetic clusters below.
-        mags_theor, cols_theor, mags_cols_theor = arrange_filters(
-            isoch_list, pd['all_syst_filters'], pd['filters'], pd['colors'])
-
-        # Interpolate all the data in the isochrones (including the binarity
-        # data)
-        all_met_vals, all_age_vals, binar_fracs = pd['fundam_params'][0],\
-            pd['fundam_params'][1], pd['fundam_params'][5]
-        pd['theor_tracks'], pd['m_ini_idx'], pd['binar_flag'] =\
-            interp_isochs.main(
-                mags_theor, cols_theor, mags_cols_theor, extra_pars,
-                all_met_vals, all_age_vals, binar_fracs, pd['bin_mr'],
-                pd['synth_rand_seed'])
+        # Look for this grid in the cache. Not used if the random seed is not
+        # fixed, since the binary data would then change on each run.
+        cache_dir = join(dirname(pd['iso_paths'][0]), '.cache')
+        cached, key = None, None
+        if pd['synth_rand_seed'] is not None and pd['grid_cache_mb'] > 0.:
+            # The order of the filters in 'all_syst_filters' is not fixed
+            # (it is generated from a set), but it does not affect the grid.
+            key = tracks_store.cacheKey(
+                met_files, pd['evol_track'],
+                [sorted(_) for _ in pd['all_syst_filters']],
+                pd['filters'], pd['colors'], pd['CMD_extra_pars'],
+                met_vals_all, age_vals_all, ages_strs, pd['fundam_params'][5],
+                pd['bin_mr'], pd['synth_rand_seed'], pd['N_interp'],
+                pd['interp_mode'])
+            cached = tracks_store.cacheLoad(cache_dir, key)
+
+        if cached is not None:
+            pd['theor_tracks'], pd['m_ini_idx'], pd['binar_flag'],\
+                rand_state = cached
+            # Leave the random generator in the same state as if the grid was
+            # processed in this run.
+            np.random.set_state(rand_state)
+            print("Isochrones grid read from cache")
+        else:
+            pd = processTracks(pd, met_files, met_vals_all, age_vals_all,
+                               ages_strs)
+
+            if key is not None:
+                pd['theor_tracks'] = tracks_store.cacheSave(
+                    cache_dir, key, pd['theor_tracks'], pd['m_ini_idx'],
+                    pd['binar_flag'], np.random.get_state(),
+                    pd['grid_cache_mb'])
 
         print("\nGrid values")
         print("z        : {:<5} [{}, {}]".format(
@@ -82,6 +78,53 @@ def check_get(pd):
     return pd
 
 
+def processTracks(pd, met_files, met_vals_all, age_vals_all, ages_strs):
+    """
+    Read all the isochrones, and interpolate their data (including the
+    binarity data).
+    """
+    # Get isochrones and their extra parameters (mass, etc.).
+    isoch_list, extra_pars = read_isochs.main(
+        met_files, ages_strs, pd['evol_track'], pd['CMD_extra_pars'],
+        pd['all_syst_filters'])
+
+    # Check equality of the initial mass across photometric systems.
+    miniCheck(extra_pars, met_vals_all, age_vals_all)
+
+    # Once the above check has passed, remove the extra 'M_ini' array
+    # from 'extra_pars'.
+    # TODO this will need the change when/if more extra parameters are
+    # stored beyond 'M_ini'
+    extra_pars2 = [[] for _ in met_vals_all]
+    for i, z in enumerate(extra_pars):
+        ages = [[] for _ in age_vals_all]
+        for j, a in enumerate(z):
+            ages[j].append(a[0])
+        extra_pars2[i] = ages
+    extra_pars = extra_pars2
+
+    # Take the synthetic data from the unique filters read, create the
+    # necessary colors, and position the magnitudes and colors in the
+    # same order as they are read from the cluster's data file.
+    # The mags_cols_theor list contains the magnitudes used to create the
+    # defined colors. This is necessary to properly add binarity to the
+    # synthetic clusters below.
+    mags_theor, cols_theor, mags_cols_theor = arrange_filters(
+        isoch_list, pd['all_syst_filters'], pd['filters'], pd['colors'])
+
+    # Interpolate all the data in the isochrones (including the binarity
+    # data)
+    all_met_vals, all_age_vals, binar_fracs = pd['fundam_params'][0],\
+        pd['fundam_params'][1], pd['fundam_params'][5]
+    pd['theor_tracks'], pd['m_ini_idx'], pd['binar_flag'] =\
+        interp_isochs.main(
+            mags_theor, cols_theor, mags_cols_theor, extra_pars,
+            all_met_vals, all_age_vals, binar_fracs, pd['bin_mr'],
+            pd['synth_rand_seed'], pd['N_interp'], pd['interp_mode'])
+
+    return pd
+
+
 def miniCheck(extra_pars, met_vals_all, age_vals_all):
     """
     The extra isochrone parameter 'M_ini' is assumed to be equal across
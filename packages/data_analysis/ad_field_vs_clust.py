@@ -100,13 +100,11 @@ def dataExtract(region, idx):
     """
     def photData():
         # Main magnitude. Must have shape (1, N)
-        mags = np.array(list(zip(*list(zip(*region))[3])))
-        e_mag = np.array(list(zip(*list(zip(*region))[4])))
+        mags, e_mag = region.mags.T, region.em.T
         mags = normErr(mags, e_mag)
 
         # One or two colors
-        cols = np.array(list(zip(*list(zip(*region))[5])))
-        e_col = np.array(list(zip(*list(zip(*region))[6])))
+        cols, e_col = region.cols.T, region.ec.T
         c_err = []
         for i, c in enumerate(cols):
             c_err.append(normErr(c, e_col[i]))
@@ -115,8 +113,7 @@ def dataExtract(region, idx):
 
     def kinData():
         # Plx + pm_ra + pm_dec
-        kins = np.array(list(zip(*list(zip(*region))[7])))[:3]
-        e_kin = np.array(list(zip(*list(zip(*region))[8])))[:3]
+        kins, e_kin = region.kine.T[:3], region.ek.T[:3]
         k_err = []
         for i, k in enumerate(kins):
             # Only process if any star contains at least one not 'nan'
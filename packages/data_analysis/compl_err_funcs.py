@@ -17,7 +17,7 @@ def main(clp, cld_i, cld_c):
     """
 
     # (Main) Magnitudes of accepted stars after error rejection.
-    mmag_acpt_c = np.array(list(zip(*(list(zip(*clp['acpt_stars_c']))[3])))[0])
+    mmag_acpt_c = clp['acpt_stars_c'].mags[:, 0]
 
     # Magnitudes in the incomplete set, without nans
     msk = ~np.isnan(cld_i['mags'][0])
@@ -135,8 +135,7 @@ def errRemv(clp, mmag_acpt_c):
         [mmag_acpt_c.min(), mmag_acpt_c.max()], np.ones(1), 0.
     if len(clp['rjct_stars_c']) > 0:
         # (Main) Magnitudes of error rejected stars.
-        mmag_rjct_c = np.array(
-            list(zip(*(list(zip(*clp['rjct_stars_c']))[3])))[0])
+        mmag_rjct_c = clp['rjct_stars_c'].mags[:, 0]
         all_mags = np.concatenate((mmag_acpt_c, mmag_rjct_c))
 
         # Number of stars per bin: 10% of the total number of accepted stars,
@@ -11,7 +11,7 @@ def main(clp, **kwargs):
     """
 
     # (Main) Magnitudes of all stars AFTER error rejection.
-    mmag = np.array(list(zip(*(list(zip(*clp['acpt_stars_c']))[3])))[0])
+    mmag = clp['acpt_stars_c'].mags[:, 0]
 
     # This is the curve for the entire observed frame, normalized to the area
     # of the cluster.
@@ -22,7 +22,7 @@ def main(clp, **kwargs):
         (np.array([0.]), lf_all / clp['frame_norm'], np.array([0.])))
 
     # Obtain histogram for cluster region.
-    mag_cl = list(zip(*list(zip(*clp['cl_region_c']))[3]))[0]
+    mag_cl = clp['cl_region_c'].mags[:, 0]
     lf_clust, lf_edg_c = np.histogram(
         mag_cl, bins=50, range=(np.nanmin(mag_cl), np.nanmax(mag_cl)))
 
@@ -36,9 +36,8 @@ def main(clp, **kwargs):
     if clp['flag_no_fl_regs_c'] is False:
 
         # Extract main magnitudes for all stars in all field regions defined.
-        for freg in clp['field_regions_c']:
-            for star in freg:
-                mag_fl.append(star[3][0])
+        mag_fl = np.concatenate(
+            [freg.mags[:, 0] for freg in clp['field_regions_c']])
 
         # Obtain histogram for field region.
         lf_field, lf_edg_f = np.histogram(
@@ -29,7 +29,7 @@ def main(
     if ('C2' in flag_make_plot) or plx_bayes_flag:
 
         # Extract parallax data.
-        plx = np.array(list(zip(*list(zip(*clp['cl_reg_fit']))[7]))[0])
+        plx = clp['cl_reg_fit'].kine[:, 0]
         # Array with no nan values
         plx_clrg = plx[~np.isnan(plx)]
 
@@ -49,14 +49,10 @@ def main(
                 plx_2s_msk = (plx < max_plx) & (plx > min_plx)
 
             # Prepare masked data.
-            mmag_clp = np.array(
-                list(zip(*list(zip(
-                    *clp['cl_reg_fit']))[3]))[0])[plx_2s_msk]
-            mp_clp = np.array(list(zip(*clp['cl_reg_fit']))[9])[plx_2s_msk]
+            mmag_clp = clp['cl_reg_fit'].mags[:, 0][plx_2s_msk]
+            mp_clp = clp['cl_reg_fit'].mps[plx_2s_msk]
             plx_clp = plx[plx_2s_msk]
-            e_plx_clp = np.array(
-                list(zip(*list(zip(
-                    *clp['cl_reg_fit']))[8]))[0])[plx_2s_msk]
+            e_plx_clp = clp['cl_reg_fit'].ek[:, 0][plx_2s_msk]
             # Take care of possible zero values that can produce issues
             # since errors are in the denominator.
             e_plx_clp[e_plx_clp == 0.] = 10.
@@ -3,6 +3,7 @@ import numpy as np
 from scipy.spatial.distance import cdist
 from scipy import stats
 from astropy.stats import sigma_clipped_stats
+from ..inp.star_table import StarTable
 
 
 def main(
@@ -64,7 +65,7 @@ def checkPMs(clp):
     id=1 --> PMs (RA)
     """
     # Extract cluster region Plx / RA PMs data.
-    data = np.array(list(zip(*list(zip(*clp['cl_reg_fit']))[7]))[1])
+    data = clp['cl_reg_fit'].kine[:, 1]
     # Array with no nan values
     clrg = data[~np.isnan(data)]
     if clrg.any() and np.min(clrg) < np.max(clrg):
@@ -80,14 +81,10 @@ def PMsData(cld_i, clp):
     """
 
     # Cluster region data.
-    pmMP, pmRA, e_pmRA, pmDE, e_pmDE =\
-        np.array(list(zip(*clp['cl_reg_fit']))[9]),\
-        np.array(list(zip(*list(zip(*clp['cl_reg_fit']))[7]))[1]),\
-        np.array(list(zip(*list(zip(*clp['cl_reg_fit']))[8]))[1]),\
-        np.array(list(zip(*list(zip(*clp['cl_reg_fit']))[7]))[2]),\
-        np.array(list(zip(*list(zip(*clp['cl_reg_fit']))[8]))[2])
-    DE_cr = np.array(list(zip(*clp['cl_reg_fit']))[2])
-    mmag_cr = np.array(list(zip(*list(zip(*clp['cl_reg_fit']))[3]))[0])
+    cl_reg = clp['cl_reg_fit']
+    pmMP, pmRA, e_pmRA, pmDE, e_pmDE = cl_reg.mps, cl_reg.kine[:, 1],\
+        cl_reg.ek[:, 1], cl_reg.kine[:, 2], cl_reg.ek[:, 2]
+    DE_cr, mmag_cr = cl_reg.y, cl_reg.mags[:, 0]
     # Remove nan values from cluster region
     msk_cr = ~np.isnan(pmRA) & ~np.isnan(e_pmRA) & ~np.isnan(pmDE) &\
         ~np.isnan(e_pmDE)
@@ -103,19 +100,10 @@ def PMsData(cld_i, clp):
         'pmDE': np.array([]), 'epmDE': np.array([]),
         'DE': np.array([]), 'mmag': np.array([]), 'msk': np.array([])}
     if not clp['flag_no_fl_regs_i']:
-        msk_fr, mmag_fr, pmRA_fr, e_pmRA_fr, pmDE_fr, e_pmDE_fr, DE_fr =\
-            [[] for _ in range(7)]
-        for fl_rg in clp['field_regions_i']:
-            mmag_fr += list(zip(*list(zip(*fl_rg))[3]))[0]
-            pmRA_fr += list(zip(*list(zip(*fl_rg))[7]))[1]
-            e_pmRA_fr += list(zip(*list(zip(*fl_rg))[8]))[1]
-            pmDE_fr += list(zip(*list(zip(*fl_rg))[7]))[2]
-            e_pmDE_fr += list(zip(*list(zip(*fl_rg))[8]))[2]
-            DE_fr += list(list(zip(*fl_rg)))[2]
-        # To arrays
-        mmag_fr, pmRA_fr, e_pmRA_fr, pmDE_fr, e_pmDE_fr, DE_fr,\
-            = [np.asarray(_) for _ in (
-                mmag_fr, pmRA_fr, e_pmRA_fr, pmDE_fr, e_pmDE_fr, DE_fr)]
+        fl_rg = StarTable.concat(clp['field_regions_i'])
+        mmag_fr, pmRA_fr, e_pmRA_fr, pmDE_fr, e_pmDE_fr, DE_fr =\
+            fl_rg.mags[:, 0], fl_rg.kine[:, 1], fl_rg.ek[:, 1],\
+            fl_rg.kine[:, 2], fl_rg.ek[:, 2], fl_rg.y
         # Mask nan values in field region(s)
         msk_fr = ~np.isnan(pmRA_fr) & ~np.isnan(e_pmRA_fr) &\
             ~np.isnan(pmDE_fr) & ~np.isnan(e_pmDE_fr)
@@ -184,17 +172,15 @@ def plx_PMs_data(clp, msk_cr, msk_fr):
     Extract Plx data associated to the values filtered by PMs.
     """
     # Cluster region
-    pm_Plx_cl = np.array(
-        list(zip(*list(zip(*clp['cl_reg_fit']))[7]))[0])[msk_cr]
+    pm_Plx_cl = clp['cl_reg_fit'].kine[:, 0][msk_cr]
     if pm_Plx_cl.any():
         plx_pm_flag = True
 
     # Field regions
     pm_Plx_fr = []
     if not clp['flag_no_fl_regs_i']:
-        for fl_rg in clp['field_regions_i']:
-            pm_Plx_fr += list(zip(*list(zip(*fl_rg))[7]))[0]
-        pm_Plx_fr = np.array(pm_Plx_fr)[msk_fr]
+        pm_Plx_fr = StarTable.concat(
+            clp['field_regions_i']).kine[:, 0][msk_fr]
 
     return plx_pm_flag, pm_Plx_cl, pm_Plx_fr
 
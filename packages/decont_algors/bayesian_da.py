@@ -1,20 +1,42 @@
 
 import numpy as np
+from scipy import spatial
+import multiprocessing as mp
+import signal
 import warnings
 from .. import update_progress
+from ..inp import tracks_store
 
 
 def main(
     colors, plx_col, pmx_col, pmy_col, rv_col, bayesda_runs, bayesda_dflag,
-        cl_region, field_regions):
+        cl_region, field_regions, bayesda_mb=256., bayesda_nprocs=1,
+        bayesda_tol=None):
     '''
     Bayesian field decontamination algorithm.
+
+    The likelihoods are evaluated in blocks of cluster and field stars, using
+    at most (approximately) 'bayesda_mb' Mb of memory.
+
+    If 'bayesda_nprocs' > 1 the likelihoods are evaluated by a pool of
+    processes, each one limited to 'bayesda_mb / bayesda_nprocs' Mb. In this
+    mode the stars removed from the cluster region for each field region
+    are selected with the MPs obtained up to the previous run (instead of
+    those updated after every field region), so that all the field regions
+    in a run can be processed at once.
+
+    If 'bayesda_tol' is not None, the likelihoods are approximated summing
+    only the field stars close to each cluster star (see 'treeSum()'), with
+    a relative error smaller than 'bayesda_tol'. The resulting error in the
+    MPs is smaller than (approximately) 'bayesda_tol / 2'.
     '''
-    print('Applying Bayesian DA ({} runs)'.format(bayesda_runs))
+    print('Applying Bayesian DA ({} runs{})'.format(
+        bayesda_runs, '' if bayesda_nprocs < 2 else ', {} processes'.format(
+            bayesda_nprocs)))
 
-    # cl_region = [[id, x, y, mags, e_mags, cols, e_cols, kine, ek], [], ...]
+    # cl_region : table of stars (see 'StarTable')
     # len(cl_region) = number of stars inside the cluster's radius.
-    # len(cl_region[_][3]) = number of magnitudes defined.
+    # cl_region.mags.shape[1] = number of magnitudes defined.
     # len(field_regions) = number of field regions.
     # len(field_regions[i]) = number of stars inside field region 'i'.
 
@@ -33,91 +55,121 @@ def main(
     # Normalize data.
     cl_reg_prep, N_msk_cl = dataNorm(cl_reg_prep)
 
-    # Likelihoods between all field regions and the cluster region.
-    fl_likelihoods, N_msk_fr = [], 0
+    # Prepare the data for all the field regions.
+    fl_regs_prep, N_msk_fr = [], 0
     for fl_region in field_regions:
-        n_fl = len(fl_region)
-
-        # Obtain likelihood, for each star in the cluster region, of
-        # being a field star.
         mags, cols, kinem, e_mags, e_cols, e_kinem = rmDimensions(
             fl_region, colors, plx_col, pmx_col, pmy_col, rv_col,
             bayesda_dflag)
         fl_reg_prep, w_fl = reg_data(
-            n_fl, mags, cols, kinem, e_mags, e_cols, e_kinem)
+            len(fl_region), mags, cols, kinem, e_mags, e_cols, e_kinem)
         fl_reg_prep, N_msk = dataNorm(fl_reg_prep)
         N_msk_fr += N_msk
-
-        fl_likelihoods.append([n_fl, likelihood(
-            fl_reg_prep, w_fl, cl_reg_prep, w_cl)])
+        fl_regs_prep.append([fl_reg_prep, w_fl])
 
     if N_msk_cl != 0 or N_msk_fr != 0:
         print("Masked data (outliers): N_cl={}, N_frs={}".format(
             N_msk_cl, N_msk_fr))
 
-    # Create copy of the cluster region to be shuffled below.
-    clust_reg_shuffle, w_cl_shuffle = cl_reg_prep[:], w_cl[:]
+    pool, shm = None, []
+    if bayesda_nprocs > 1:
+        pool, shm = workersPool(
+            bayesda_nprocs, cl_reg_prep, w_cl, fl_regs_prep,
+            bayesda_mb / bayesda_nprocs, bayesda_tol)
+
+    try:
+        runs_fields_probs, N_total, lkl_err = runsLkl(
+            bayesda_runs, cl_reg_prep, w_cl, fl_regs_prep, bayesda_mb,
+            bayesda_tol, pool)
+    except BaseException:
+        # Stop the workers at once, 'close()' would wait for the pending
+        # tasks.
+        if pool is not None:
+            pool.terminate()
+        raise
+    else:
+        if pool is not None:
+            pool.close()
+    finally:
+        if pool is not None:
+            pool.join()
+            for _ in shm:
+                tracks_store.shareRelease(_)
+
+    if bayesda_tol is not None:
+        print("Maximum relative error in the likelihoods: {:.1e}".format(
+            lkl_err))
+
+    # Average all Bayesian membership probabilities into a single value for
+    # each star inside 'cl_region'.
+    memb_probs_cl_region = runs_fields_probs / N_total
+
+    return memb_probs_cl_region
+
+
+def runsLkl(
+    bayesda_runs, cl_reg_prep, w_cl, fl_regs_prep, bayesda_mb, bayesda_tol,
+        pool):
+    """
+    Iterate the DA 'bayesda_runs' times, or until the MPs converge. If
+    'pool' is not None, the likelihoods are evaluated by its processes.
+
+    Also returns the maximum relative error bound of all the likelihoods.
+    """
+    N_cl = len(cl_reg_prep)
+
+    # Likelihoods between all field regions and the cluster region. Obtain
+    # likelihood, for each star in the cluster region, of being a field star.
+    if pool is None:
+        fl_lkls = [likelihood(
+            fl_reg_prep, w_fl, cl_reg_prep, w_cl, bayesda_mb, bayesda_tol)
+            for fl_reg_prep, w_fl in fl_regs_prep]
+    else:
+        fl_lkls = pool.map(
+            workerLkl, [('field', i) for i in range(len(fl_regs_prep))])
+    fl_likelihoods = [
+        [len(fl_regs_prep[i][0]), _[0]] for i, _ in enumerate(fl_lkls)]
+    lkl_err = max(_[1] for _ in fl_lkls) if fl_lkls else 0.
 
     # Initial null probabilities for all stars in the cluster region.
-    prob_avrg_old = np.zeros(len(cl_region))
+    prob_avrg_old = np.zeros(N_cl)
     # Probabilities for all stars in the cluster region.
-    runs_fields_probs = np.zeros(len(cl_region))
+    runs_fields_probs = np.zeros(N_cl)
 
     # Run 'bayesda_runs*fl_likelihoods' times.
     N_total = 0
     for run_num in range(bayesda_runs):
-        # Iterate through all the 'field stars' regions that were populated.
-        for n_fl, fl_lkl in fl_likelihoods:
-
-            if n_fl < len(cl_region):
-                # TODO DEPRECATED June 2019
-                # # Randomly shuffle the stars within the cluster region.
-                # p = np.random.permutation(len(clust_reg_shuffle))
-                # clust_reg_shuffle, w_cl_shuffle = clust_reg_shuffle[p],\
-                #     w_cl_shuffle[p]
-                # # Remove n_fl random stars from the cluster region and
-                # # obtain the likelihoods for each star in this "cleaned"
-                # # cluster region.
-                # cl_lkl = likelihood(
-                #     bayesda_weights, clust_reg_shuffle[n_fl:],
-                #     w_cl_shuffle[n_fl:], cl_reg_prep, w_cl)
-
-                # Select stars from the cluster region according to their
-                # associated probabilities.
-                n_memb = len(clust_reg_shuffle) - n_fl
-                if n_memb > 0:
-                    # Identify first run.
-                    if N_total > 0:
-                        # Select stars according to their probabilities so far.
-                        p = np.random.choice(
-                            len(clust_reg_shuffle), n_memb, replace=False,
-                            p=runs_fields_probs / runs_fields_probs.sum())
-                    else:
-                        p = np.random.choice(
-                            len(clust_reg_shuffle), n_memb, replace=False)
-                else:
-                    p = np.arange(len(clust_reg_shuffle))
-                clust_reg_shuffle_nmemb, w_cl_shuffle_nmemb =\
-                    clust_reg_shuffle[p], w_cl_shuffle[p]
-                # cluster region.
-                cl_lkl = likelihood(
-                    clust_reg_shuffle_nmemb, w_cl_shuffle_nmemb, cl_reg_prep,
-                    w_cl)
-            else:
-                # If there are *more* field region stars than the total of
-                # stars within the cluster region (highly contaminated
-                # cluster), assign zero likelihood of being a true member to
-                # all stars within the cluster region.
-                cl_lkl = np.ones(len(cl_region)) * 1e-7
-
-            with warnings.catch_warnings():
-                warnings.simplefilter("ignore")
-                # Bayesian probability for each star within the cluster region.
-                bayes_prob = 1. / (1. + (fl_lkl / cl_lkl))
-            # Replace possible nan values with 0.
-            bayes_prob[np.isnan(bayes_prob)] = 0.
-            N_total += 1
-            runs_fields_probs += bayes_prob
+
+        if pool is None:
+            # Iterate through all the 'field stars' regions that were
+            # populated.
+            for n_fl, fl_lkl in fl_likelihoods:
+                p = membIdx(n_fl, N_cl, N_total, runs_fields_probs)
+                cl_lkl = None
+                if p is not None:
+                    # Likelihood of being a member of the "cleaned" cluster
+                    # region.
+                    cl_lkl, err = likelihood(
+                        cl_reg_prep[p], w_cl[p], cl_reg_prep, w_cl,
+                        bayesda_mb, bayesda_tol)
+                    lkl_err = max(lkl_err, err)
+                runs_fields_probs += bayesProb(N_cl, fl_lkl, cl_lkl)
+                N_total += 1
+
+        else:
+            # The stars for all the field regions are selected with the
+            # probabilities obtained up to the previous run.
+            idxs = [membIdx(n_fl, N_cl, N_total, runs_fields_probs)
+                    for n_fl, _ in fl_likelihoods]
+            cl_lkls = pool.map(
+                workerLkl, [('cluster', p) for p in idxs if p is not None])
+            for (n_fl, fl_lkl), p in zip(fl_likelihoods, idxs):
+                cl_lkl = None
+                if p is not None:
+                    cl_lkl, err = cl_lkls.pop(0)
+                    lkl_err = max(lkl_err, err)
+                runs_fields_probs += bayesProb(N_cl, fl_lkl, cl_lkl)
+                N_total += 1
 
         # Check if probabilities converged. If so, break out.
         prob_avrg_old, break_flag = break_check(
@@ -127,11 +179,134 @@ def main(
             break
         update_progress.updt(bayesda_runs, run_num + 1)
 
-    # Average all Bayesian membership probabilities into a single value for
-    # each star inside 'cl_region'.
-    memb_probs_cl_region = runs_fields_probs / N_total
+    return runs_fields_probs, N_total, lkl_err
 
-    return memb_probs_cl_region
+
+def membIdx(n_fl, N_cl, N_total, runs_fields_probs):
+    """
+    Indexes of the stars kept in the cluster region after removing 'n_fl'
+    stars, selected according to their probabilities so far. Returns None if
+    there are *more* field region stars than the total of stars within the
+    cluster region.
+    """
+    if n_fl >= N_cl:
+        return None
+
+    # TODO DEPRECATED June 2019
+    # # Randomly shuffle the stars within the cluster region.
+    # p = np.random.permutation(len(clust_reg_shuffle))
+    # clust_reg_shuffle, w_cl_shuffle = clust_reg_shuffle[p],\
+    #     w_cl_shuffle[p]
+    # # Remove n_fl random stars from the cluster region and
+    # # obtain the likelihoods for each star in this "cleaned"
+    # # cluster region.
+    # cl_lkl = likelihood(
+    #     bayesda_weights, clust_reg_shuffle[n_fl:],
+    #     w_cl_shuffle[n_fl:], cl_reg_prep, w_cl)
+
+    # Select stars from the cluster region according to their
+    # associated probabilities.
+    n_memb = N_cl - n_fl
+    if n_memb > 0:
+        # Identify first run.
+        if N_total > 0:
+            # Select stars according to their probabilities so far.
+            p = np.random.choice(
+                N_cl, n_memb, replace=False,
+                p=runs_fields_probs / runs_fields_probs.sum())
+        else:
+            p = np.random.choice(N_cl, n_memb, replace=False)
+    else:
+        p = np.arange(N_cl)
+
+    return p
+
+
+def bayesProb(N_cl, fl_lkl, cl_lkl):
+    """
+    Bayesian probability for each star within the cluster region.
+    """
+    if cl_lkl is None:
+        # If there are *more* field region stars than the total of
+        # stars within the cluster region (highly contaminated
+        # cluster), assign zero likelihood of being a true member to
+        # all stars within the cluster region.
+        cl_lkl = np.ones(N_cl) * 1e-7
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        bayes_prob = 1. / (1. + (fl_lkl / cl_lkl))
+    # Replace possible nan values with 0.
+    bayes_prob[np.isnan(bayes_prob)] = 0.
+
+    return bayes_prob
+
+
+def workersPool(nprocs, cl_reg_prep, w_cl, fl_regs_prep, max_mb, tol):
+    """
+    Start the pool of processes used to evaluate the likelihoods. The data
+    of the cluster and field regions is stored (once) in two read-only
+    arrays shared with the workers (see 'tracks_store.shareTracks()').
+    """
+    data = np.concatenate([cl_reg_prep] + [_[0] for _ in fl_regs_prep])
+    weights = np.concatenate([w_cl] + [_[1] for _ in fl_regs_prep])
+    # Limits of each region in the shared arrays. The cluster region is the
+    # first one.
+    edges = np.cumsum([0, len(cl_reg_prep)] + [
+        len(_[0]) for _ in fl_regs_prep])
+
+    descrs, shm = [], []
+    for arr in (data, weights):
+        descr, shm_arr = tracks_store.shareTracks(arr)
+        descrs.append(descr)
+        shm.append(shm_arr)
+
+    pool = mp.Pool(
+        nprocs, initializer=initWorker,
+        initargs=(descrs, edges, max_mb, tol))
+
+    return pool, shm
+
+
+# Shared arrays (and the shared memory blocks they belong to) stored in each
+# worker process.
+_worker_data, _worker_shm = {}, []
+
+
+def initWorker(descrs, edges, max_mb, tol):
+    """
+    Initialize a worker process. Ctrl-C is handled by the main process,
+    which stops the workers.
+    """
+    global _worker_shm
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    (data, shm_d), (weights, shm_w) = [
+        tracks_store.loadTracks(_) for _ in descrs]
+    _worker_shm = [shm_d, shm_w]
+    _worker_data.update({
+        'data': data, 'weights': weights, 'edges': edges, 'max_mb': max_mb,
+        'tol': tol})
+
+
+def workerLkl(task):
+    """
+    Evaluate a likelihood inside a worker process: ('field', i) for the
+    field region 'i', or ('cluster', p) for the stars 'p' of the cluster
+    region.
+    """
+    kind, val = task
+    data, weights, edges = _worker_data['data'], _worker_data['weights'],\
+        _worker_data['edges']
+    cl_reg_prep, w_cl = data[:edges[1]], weights[:edges[1]]
+
+    if kind == 'field':
+        region = slice(edges[val + 1], edges[val + 2])
+    else:
+        region = val
+
+    return likelihood(
+        data[region], weights[region], cl_reg_prep, w_cl,
+        _worker_data['max_mb'], _worker_data['tol'])
 
 
 def rmDimensions(
@@ -140,30 +315,28 @@ def rmDimensions(
     """
     Remove data dimensions turned off by the user.
     """
-    region_z = list(zip(*region))
-
     # Put each magnitude, color, and kinematic parameter into a separate list.
     # Remove dimensions according to input flags.
     mags, cols, kinem = [], [], []
     if bayesda_dflag[0] == 'y':
-        mags = list(zip(*region_z[3]))
+        mags = list(region.mags.T)
     for i, flag in enumerate(bayesda_dflag[1:len(colors) + 1]):
         if flag == 'y':
-            cols.append(list(zip(*region_z[5]))[i])
+            cols.append(region.cols[:, i])
     for i, k_d in enumerate((plx_col, pmx_col, pmy_col, rv_col)):
         if k_d is not False and bayesda_dflag[1 + len(colors) + i] == 'y':
-            kinem.append(list(zip(*region_z[7]))[i])
+            kinem.append(region.kine[:, i])
 
     # Uncertainties.
     e_mags, e_cols, e_kinem = [], [], []
     if bayesda_dflag[0] == 'y':
-        e_mags = list(zip(*region_z[4]))
+        e_mags = list(region.em.T)
     for i, flag in enumerate(bayesda_dflag[1:len(colors) + 1]):
         if flag == 'y':
-            e_cols.append(list(zip(*region_z[6]))[i])
+            e_cols.append(region.ec[:, i])
     for i, k_d in enumerate((plx_col, pmx_col, pmy_col, rv_col)):
         if k_d is not False and bayesda_dflag[1 + len(colors) + i] == 'y':
-            e_kinem.append(list(zip(*region_z[8]))[i])
+            e_kinem.append(region.ek[:, i])
 
     # Remove kinematic dimensions where *all* the elements are 'nan'.
     e_kinem = [
@@ -246,7 +419,7 @@ def dataNorm(data_arr, sigma_max=4.):
     return data_norm, N_msk
 
 
-def likelihood(region, w_j, cl_reg_prep, w_i):
+def likelihood(region, w_j, cl_reg_prep, w_i, max_mb=256., tol=None):
     """
     Obtain the likelihood, for each star in the cluster region ('cl_reg_prep'),
     of being a member of the region passed ('region').
@@ -272,6 +445,247 @@ def likelihood(region, w_j, cl_reg_prep, w_i):
     w_i: data dimensions weight for star i
     w_j: data dimensions weight for star j
 
+    If 'tol' is None the sum is exact (see 'denseSum()'). Otherwise only
+    the field stars close to each cluster star are used (see 'treeSum()'),
+    with a relative error smaller than 'tol'.
+
+    Returns the likelihoods and the maximum relative error bound (0. for the
+    exact sum).
+    """
+    if tol is None:
+        sum_M, err = denseSum(region, w_j, cl_reg_prep, max_mb), 0.
+    else:
+        sum_M, err = treeSum(region, w_j, cl_reg_prep, max_mb, tol)
+
+    # Sum for all stars in this 'region'.
+    sum_M = w_i * sum_M
+    # np.clip(sum_M, a_min=1e-7, a_max=None, out=sum_M)
+
+    return sum_M, err
+
+
+def denseSum(region, w_j, cl_reg_prep, max_mb):
+    """
+    Sum over all the field stars, for each cluster star (without the 'w_i'
+    weight).
+
+    The (N_i, N_j, d) arrays are processed in blocks of cluster (and, if
+    required, field) stars that fit in 'max_mb' Mb. If all the field stars
+    fit in a block the result does not depend on 'max_mb'.
+    """
+    N_i, N_j, d = cl_reg_prep.shape[0], region.shape[0], region.shape[1]
+    b_i, b_j = blockSize(N_i, N_j, d, max_mb)
+
+    sum_M = np.zeros(N_i)
+    for i0 in range(0, N_i, b_i):
+        sum_i = sum_M[i0:i0 + b_i]
+        for j0 in range(0, N_j, b_j):
+            sum_i += kernelSum(
+                cl_reg_prep[i0:i0 + b_i], region[j0:j0 + b_j],
+                w_j[j0:j0 + b_j])
+
+    return sum_M
+
+
+def treeSum(region, w_j, cl_reg_prep, max_mb, tol):
+    """
+    Sum over the field stars close to each cluster star (without the 'w_i'
+    weight), found with a KD-tree.
+
+    Since 'Dsum' is clipped at 50, the kernel of a pair (i, j) is
+
+    K_ij = c_ij * exp(-min(Dsum_ij, 50) / 2), c_ij = w_j / sqrt(prod(s_ij))
+
+    and the sum for the cluster star i can be written as
+
+    S_i = e^-25 * sum_j(c_ij) + sum_j(c_ij * (exp(-Dsum_ij / 2) - e^-25))
+
+    where the second sum only contains the pairs with Dsum_ij < R2 = 50. The
+    first term (the 'floor') depends only on the uncertainties, and is
+    estimated grouping the field stars (see 'errBounds()'). For the second
+    term only the field stars within a (Euclidean) radius r_i of the cluster
+    star are used. Since s_ijk <= e_ik + max_j(e_jk), all the field stars
+    with Dsum <= R2 are within r_i in the space of the data scaled by
+    1 / sqrt(a_k), where
+
+    r_i^2 = R2 / min_k(a_k / (e_ik + max_j(e_jk)))
+
+    A first pass uses R2 = 2 * ln(M / tol) (as the 'tolstoy' likelihood, see
+    'best_fit.likelihood.tolstoyPruned()'). The stars left out add up to
+    less than (exp(-R2 / 2) - e^-25) * U_i, with U_i >= sum_j(c_ij). If
+    this error plus the error in the floor is larger than 'tol * S_i', the
+    floor is obtained summing over all the field stars (if its error is
+    larger than 'tol * S_i / 2'), and the star is re-processed with a
+    larger R2. This guarantees a relative error smaller than 'tol'.
+
+    Stars with 'nan' data or uncertainties in any dimension can not be
+    placed in the tree, and are always processed with 'denseSum()'.
+
+    Returns the sums and the maximum relative error bound.
+    """
+    N_i, d = cl_reg_prep.shape[0], cl_reg_prep.shape[1]
+    max_pairs = max(1, int(max_mb * 1024.**2 / (17 * d + 16)))
+
+    cl_ok = ~np.isnan(cl_reg_prep).any(axis=(1, 2))
+    fl_ok = ~np.isnan(region).any(axis=(1, 2))
+
+    sum_M = np.zeros(N_i)
+    if (~cl_ok).any():
+        sum_M[~cl_ok] = denseSum(region, w_j, cl_reg_prep[~cl_ok], max_mb)
+    if not cl_ok.any():
+        return sum_M, 0.
+    if not fl_ok.any():
+        sum_M[cl_ok] = denseSum(region, w_j, cl_reg_prep[cl_ok], max_mb)
+        return sum_M, 0.
+
+    cl, fl, w_fl = cl_reg_prep[cl_ok], region[fl_ok], w_j[fl_ok]
+    # Exact sum for the field stars that are not in the tree.
+    S_ex = np.zeros(cl.shape[0])
+    if (~fl_ok).any():
+        S_ex = denseSum(region[~fl_ok], w_j[~fl_ok], cl, max_mb)
+
+    cl_d, cl_e, fl_d, fl_e = [np.ascontiguousarray(_) for _ in (
+        cl[:, :, 0], cl[:, :, 1], fl[:, :, 0], fl[:, :, 1])]
+    phot = (cl_d, cl_e, fl_d, fl_e, w_fl)
+
+    # Floor of the kernels, and its uncertainty.
+    floor = np.exp(-25.)
+    L, U = errBounds(cl_e, fl_e, w_fl)
+    F, F_err = floor * .5 * (U + L), floor * .5 * (U - L)
+
+    # Scaled data.
+    e_max = fl_e.max(0)
+    a_k = np.median(cl_e, 0) + e_max
+    tree = spatial.cKDTree(fl_d / np.sqrt(a_k))
+    u_cl = cl_d / np.sqrt(a_k)
+    m_i = np.min(a_k / (cl_e + e_max), axis=1)
+
+    def relErr(idx):
+        S = S_near[idx] + F[idx] + S_ex[idx]
+        return ((np.exp(-.5 * R2[idx]) - floor) * U[idx] + F_err[idx]) / S
+
+    R2 = np.full(cl.shape[0], min(50., 2. * np.log(fl.shape[0] / tol)))
+    todo = np.arange(cl.shape[0])
+    S_near = ballSum(tree, u_cl, np.sqrt(R2 / m_i), todo, phot, max_pairs)
+
+    todo = todo[relErr(todo) > tol]
+    if todo.size > 0:
+        S = S_near[todo] + F[todo] + S_ex[todo]
+        # Exact floor.
+        msk = F_err[todo] > .5 * tol * S
+        idx = todo[msk]
+        F[idx] = floor * floorSum(cl_e[idx], fl_e, w_fl, max_pairs)
+        F_err[idx] = 0.
+        S[msk] = S_near[idx] + F[idx] + S_ex[idx]
+        # Larger radius.
+        R2[todo] = np.minimum(50., -2. * np.log(
+            (tol * S - F_err[todo]) / U[todo] + floor))
+        S_near[todo] = ballSum(
+            tree, u_cl, np.sqrt(R2[todo] / m_i[todo]), todo, phot, max_pairs)
+
+    S = S_near + F + S_ex
+    err = relErr(np.arange(cl.shape[0]))
+    sum_M[cl_ok] = S
+
+    return sum_M, err.max()
+
+
+def errBounds(cl_e, fl_e, w_fl, N_groups=16):
+    """
+    Lower and upper bounds of sum_j(w_j / sqrt(prod_k(e_ik + e_jk))) for each
+    cluster star i. The field stars are grouped by the size of their
+    uncertainties and, within each group, the largest (smallest) uncertainty
+    in each dimension is used for the lower (upper) bound. The upper bound
+    obtained exchanging the cluster and field stars is used if it is smaller.
+    """
+    groups = np.array_split(
+        np.argsort(np.log(fl_e).sum(1), kind='mergesort'),
+        min(N_groups, fl_e.shape[0]))
+    L, U = np.zeros(cl_e.shape[0]), np.zeros(cl_e.shape[0])
+    for g in groups:
+        w_g = w_fl[g].sum()
+        L += w_g / np.sqrt(np.prod(cl_e + fl_e[g].max(0), axis=1))
+        U += w_g / np.sqrt(np.prod(cl_e + fl_e[g].min(0), axis=1))
+
+    U = np.minimum(
+        U, (w_fl / np.sqrt(np.prod(fl_e + cl_e.min(0), axis=1))).sum())
+
+    return L, U
+
+
+def floorSum(cl_e, fl_e, w_fl, max_pairs):
+    """
+    sum_j(w_j / sqrt(prod_k(e_ik + e_jk))) for each cluster star i.
+    """
+    step = max(1, max_pairs // fl_e.shape[0])
+    F = np.zeros(cl_e.shape[0])
+    for i0 in range(0, cl_e.shape[0], step):
+        F[i0:i0 + step] = (w_fl / np.sqrt(np.prod(
+            cl_e[i0:i0 + step, None, :] + fl_e[None, :, :], axis=-1))).sum(1)
+
+    return F
+
+
+def ballSum(tree, u_cl, r, idx, phot, max_pairs, N_query=1024):
+    """
+    Sum of the kernels minus their floor (exp(-25) * c_ij), over the field
+    stars within a radius 'r' of each of the 'idx' cluster stars. The data
+    and uncertainties in 'phot' contain no 'nan' values.
+    """
+    cl_d, cl_e, fl_d, fl_e, w_fl = phot
+    floor = np.exp(-25.)
+    sum_M = np.zeros(idx.size)
+    # Process the stars in chunks of similar radius.
+    r_sort = np.argsort(r, kind='mergesort')
+    for i0 in range(0, idx.size, N_query):
+        chunk = r_sort[i0:i0 + N_query]
+        # Indexes of the (cluster, field) pairs.
+        pairs = spatial.cKDTree(u_cl[idx[chunk]]).sparse_distance_matrix(
+            tree, r[chunk].max(), output_type='ndarray')
+        pairs = pairs[pairs['v'] <= r[chunk][pairs['i']]]
+        if pairs.size == 0:
+            continue
+        cl_i, fl_j = chunk[pairs['i']], pairs['j']
+
+        for k in range(0, cl_i.size, max_pairs):
+            i, j = cl_i[k:k + max_pairs], fl_j[k:k + max_pairs]
+            rows = idx[i]
+            sigma_sum = cl_e[rows] + fl_e[j]
+            data_dif = cl_d[rows] - fl_d[j]
+            np.square(data_dif, out=data_dif)
+            data_dif /= sigma_sum
+            Dsum = data_dif.sum(axis=-1)
+            np.clip(Dsum, a_min=None, a_max=50., out=Dsum)
+            Dsum *= -0.5
+            np.exp(Dsum, out=Dsum)
+            Dsum -= floor
+            Dsum *= w_fl[j]
+            Dsum /= np.sqrt(np.prod(sigma_sum, axis=-1))
+            sum_M += np.bincount(i, weights=Dsum, minlength=idx.size)
+
+    return sum_M
+
+
+def blockSize(N_i, N_j, d, max_mb):
+    """
+    Number of cluster and field stars processed in each block, so that the
+    arrays used by 'kernelSum()' fit in 'max_mb' Mb. All the field stars are
+    used in each block if possible.
+    """
+    # Bytes per (i, j) pair: the data difference and sum of squared errors
+    # (d floats each), their 'nan' masks, and the summed values.
+    pair_b = 17 * d + 16
+    N_pairs = max(1, int(max_mb * 1024.**2 / pair_b))
+
+    if N_j <= N_pairs:
+        return max(1, min(N_i, N_pairs // max(1, N_j))), max(1, N_j)
+    return 1, N_pairs
+
+
+def kernelSum(cl_reg_prep, region, w_j):
+    """
+    Sum of the kernels in the likelihood, for each star in the cluster region
+    block (without the 'w_i' weight).
     """
     # Data difference (cluster_region - region), for all dimensions.
     data_dif = cl_reg_prep[:, None, :, 0] - region[None, :, :, 0]
@@ -283,7 +697,9 @@ def likelihood(region, w_j, cl_reg_prep, w_i):
     sigma_sum[np.isnan(sigma_sum)] = 1.
 
     # Sum for all dimensions.
-    Dsum = (np.square(data_dif) / sigma_sum).sum(axis=-1)
+    np.square(data_dif, out=data_dif)
+    data_dif /= sigma_sum
+    Dsum = data_dif.sum(axis=-1)
     # This makes the code substantially faster.
     np.clip(Dsum, a_min=None, a_max=50., out=Dsum)
 
@@ -291,13 +707,12 @@ def likelihood(region, w_j, cl_reg_prep, w_i):
     sigma_prod = np.prod(sigma_sum, axis=-1)
 
     # All elements inside summatory.
-    sum_M_j = w_j * np.exp(-0.5 * Dsum) / np.sqrt(sigma_prod)
-
-    # Sum for all stars in this 'region'.
-    sum_M = w_i * np.sum(sum_M_j, axis=-1)
-    # np.clip(sum_M, a_min=1e-7, a_max=None, out=sum_M)
+    Dsum *= -0.5
+    np.exp(Dsum, out=Dsum)
+    np.multiply(w_j, Dsum, out=Dsum)
+    Dsum /= np.sqrt(sigma_prod, out=sigma_prod)
 
-    return sum_M
+    return np.sum(Dsum, axis=-1)
 
 
 def break_check(prob_avrg_old, runs_fields_probs, runs, run_num, N_total):
@@ -13,7 +13,7 @@ def main(clp, fld_clean_mode, fld_clean_bin, fld_clean_prob, **kwargs):
 
     # Default assignment.
     cl_reg_fit, cl_reg_no_fit, local_rm_edges = clp['memb_prob_avrg_sort'],\
-        [], None
+        clp['memb_prob_avrg_sort'][:0], None
 
     if fld_clean_mode == 'all':
         # Skip reduction process.
@@ -76,7 +76,7 @@ def nmemb_sel(n_memb, memb_prob_avrg_sort):
     '''
     Algorithm to select which stars to use by the best fit function.
     '''
-    cl_reg_fit, cl_reg_no_fit = memb_prob_avrg_sort, []
+    cl_reg_fit, cl_reg_no_fit = memb_prob_avrg_sort, memb_prob_avrg_sort[:0]
 
     # Check approximate number of true members obtained by the structural
     # analysis.
@@ -114,7 +114,7 @@ def top_h(memb_prob_avrg_sort):
     Reject stars in the lower half of the membership probabilities list.
     '''
 
-    cl_reg_fit, cl_reg_no_fit = memb_prob_avrg_sort, []
+    cl_reg_fit, cl_reg_no_fit = memb_prob_avrg_sort, memb_prob_avrg_sort[:0]
 
     middle_indx = int(len(memb_prob_avrg_sort) / 2.)
     rem_fit = memb_prob_avrg_sort[:middle_indx]
@@ -132,7 +132,7 @@ def manual(memb_prob_avrg_sort, fld_clean_prob, min_prob_i=None):
     '''
     Find index of star with membership probability < min_prob_i.
     '''
-    cl_reg_fit, cl_reg_no_fit = memb_prob_avrg_sort, [],
+    cl_reg_fit, cl_reg_no_fit = memb_prob_avrg_sort, memb_prob_avrg_sort[:0]
 
     if min_prob_i is None:
         # Manual mode.
@@ -141,12 +141,9 @@ def manual(memb_prob_avrg_sort, fld_clean_prob, min_prob_i=None):
         # MP>=0.5 mode.
         min_prob_man = min_prob_i
 
-    indx = 0
-    for star in memb_prob_avrg_sort:
-        if star[-1] < min_prob_man:
-            break
-        else:
-            indx += 1
+    # Index of the first star with a MP below the limit.
+    below = memb_prob_avrg_sort.mps < min_prob_man
+    indx = np.argmax(below) if below.any() else len(memb_prob_avrg_sort)
 
     if len(memb_prob_avrg_sort[:indx]) > 10:
         cl_reg_fit, cl_reg_no_fit = \
@@ -169,33 +166,26 @@ def rmColorOutliers(cl_reg_fit, cl_reg_no_fit):
     either color outside the (.5, 99.5) percentile.
     """
 
+    mag, cols = cl_reg_fit.mags[:, 0], cl_reg_fit.cols
+
     # Limits for the colors.
-    col_lims = np.percentile(list(zip(*cl_reg_fit))[5], (.5, 99.5), axis=0)
+    col_lims = np.percentile(cols, (.5, 99.5), axis=0)
     # Median, std for colors
-    col_med = np.median(list(zip(*cl_reg_fit))[5])
-    col_std = np.std(list(zip(*cl_reg_fit))[5])
+    col_med = np.median(cols)
+    col_std = np.std(cols)
     # Median, std for magnitude.
-    mag_med = np.median(list(zip(*cl_reg_fit))[3])
-    mag_std = np.std(list(zip(*cl_reg_fit))[3])
-
-    cl_reg_fit2, cl_reg_no_fit2 = [], []
-    for i, st in enumerate(cl_reg_fit):
-        if st[3] > mag_med:
-            # Color of star is outside of range.
-            if np.any(st[5] < col_lims[0]) or np.any(st[5] > col_lims[1]):
-                cl_reg_no_fit2.append(st)
-            else:
-                cl_reg_fit2.append(st)
-        else:
-            # For bright stars, relax the condition a bit.
-            if np.any(st[5] < col_med - 4 * col_std) and\
-                    st[3] < mag_med - 4 * mag_std:
-                cl_reg_no_fit2.append(st)
-            elif np.any(st[5] > col_med - 4 * col_std) and\
-                    st[3] < mag_med - 4 * mag_std:
-                cl_reg_no_fit2.append(st)
-            else:
-                cl_reg_fit2.append(st)
+    mag_med = np.median(cl_reg_fit.mags)
+    mag_std = np.std(cl_reg_fit.mags)
+
+    # Color of star is outside of range.
+    rjct_faint = np.any(cols < col_lims[0], 1) | np.any(cols > col_lims[1], 1)
+    # For bright stars, relax the condition a bit.
+    bright = mag < mag_med - 4 * mag_std
+    rjct_bright = (np.any(cols < col_med - 4 * col_std, 1) & bright) |\
+        (np.any(cols > col_med - 4 * col_std, 1) & bright)
+    rjct = np.where(mag > mag_med, rjct_faint, rjct_bright)
+
+    cl_reg_fit2, cl_reg_no_fit2 = cl_reg_fit[~rjct], cl_reg_fit[rjct]
 
     # Add rejected stars to the old list.
     cl_reg_no_fit2 = cl_reg_no_fit + cl_reg_no_fit2
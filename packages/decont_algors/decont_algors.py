@@ -6,7 +6,8 @@ from . import read_da
 
 def main(
     clp, npd, colors, plx_col, pmx_col, pmy_col, rv_col, da_algor,
-        bayesda_runs, bayesda_dflag, **kwargs):
+        bayesda_runs, bayesda_dflag, bayesda_mb, bayesda_nprocs, bayesda_tol,
+        **kwargs):
     """
     Apply selected decontamination algorithm.
     """
@@ -24,9 +25,12 @@ def main(
         flag_decont_skip = True
 
     elif da_algor == 'bayes':
+        bayesda_tol = None if bayesda_tol in ('n', 'none', 'None') else\
+            float(bayesda_tol)
         memb_probs_cl_region = bayesian_da.main(
             colors, plx_col, pmx_col, pmy_col, rv_col, bayesda_runs,
-            bayesda_dflag, clp['cl_region_i'], clp['field_regions_i'])
+            bayesda_dflag, clp['cl_region_i'], clp['field_regions_i'],
+            bayesda_mb, bayesda_nprocs, bayesda_tol)
 
     elif da_algor == 'read':
         memb_probs_cl_region = read_da.main(
@@ -55,15 +59,16 @@ def filterMPs(memb_probs_cl_region, cl_region_i, cl_region_c):
     """
     Pass along MPs only for stars in the *complete* dataset.
     """
+    # Position of each star of the complete dataset in the incomplete one.
+    # All the stars in the complete dataset are also in the incomplete one.
+    sort_i = np.argsort(cl_region_i.ids, kind='mergesort')
+    pos = np.searchsorted(cl_region_i.ids[sort_i], cl_region_c.ids)
+    pos = np.clip(pos, 0, max(0, sort_i.size - 1))
+    found = cl_region_i.ids[sort_i][pos] == cl_region_c.ids
 
-    ids_c, ids_i = list(zip(*cl_region_c))[0], list(zip(*cl_region_i))[0]
-    memb_probs_cl_region_c = np.zeros(len(ids_c))
-    dict_ids_c = {_: i for i, _ in enumerate(ids_c)}
-    for i, id_i in enumerate(ids_i):
-        try:
-            memb_probs_cl_region_c[dict_ids_c[id_i]] = memb_probs_cl_region[i]
-        except KeyError:
-            pass
+    memb_probs_cl_region_c = np.zeros(len(cl_region_c))
+    memb_probs_cl_region_c[found] = np.asarray(memb_probs_cl_region)[
+        sort_i[pos[found]]]
 
     return memb_probs_cl_region_c
 
@@ -73,21 +78,9 @@ def mpas(cl_region, memb_probs_cl_region):
     Append probabilities to each star inside the cluster radius and
     sort by their values.
     """
-
-    # cl_region = [star1, star2, star3, ...]
-    # starX = [id, x, y, mags, em, cols, ec, kine, ek]
-    # mags = [mag1, mag2, mag3, ...]
-
-    # Create new list appending the membership probability to each star inside
-    # the cluster radius.
-    temp_prob_members = []
-    for st_indx, star in enumerate(cl_region):
-        temp_prob_members.append(
-            star + [round(memb_probs_cl_region[st_indx], 3)])
-
-    # Stars inside the cluster's radius are now saved in the list
-    # 'temp_prob_members' where each item contains the data for each star:
-    # starX = [id, x, y, mags, em, cols, ec, kine, ek, memb_prob].
+    # Add the (rounded) membership probabilities to the cluster region.
+    temp_prob_members = cl_region.withMPs(
+        np.round(memb_probs_cl_region, 3))
 
     # Sort members list.
     membership_prob_sort = sort_members(temp_prob_members)
@@ -97,12 +90,9 @@ def mpas(cl_region, memb_probs_cl_region):
 
 def sort_members(memb_lst):
     '''
-    Sort this list first by the membership probability from max
+    Sort the table of stars first by the membership probability from max
     value (1) to min (0) and then by its main magnitude.
-
-    shape(memb_lst) = (N_stars, 10)
     '''
-    membership_prob_avrg_sort = sorted(
-        memb_lst, key=lambda item: (-item[9], item[3][0]))
+    idx = np.lexsort((memb_lst.mags[:, 0], -memb_lst.mps))
 
-    return membership_prob_avrg_sort
+    return memb_lst[idx]
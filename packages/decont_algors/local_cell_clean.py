@@ -2,9 +2,7 @@
 import numpy as np
 import random
 from astropy.stats import bayesian_blocks, knuth_bin_width
-import operator
 import warnings
-from functools import reduce
 
 
 def main(
@@ -19,12 +17,9 @@ def main(
     Parameters
     ----------
     field_regions_c : list
-        List of arrays, one for each field region defined. Each array
-        contains a unique number of stars, and all their attributes with
-        shape: (N_stars, Features)
-    memb_prob_avrg_sort: list
-        Stars within the cluster region with their MPS added to the last
-        column, shape: (Nstars, Features + 1)
+        List of tables (see 'StarTable'), one for each field region defined.
+    memb_prob_avrg_sort: StarTable
+        Stars within the cluster region with their MPS assigned.
     flag_decont_skip: bool
         Whether the DA was applied or not.
     fld_clean_bin : str
@@ -33,77 +28,67 @@ def main(
     """
 
     # Prepare photometric data for cluster and field regions.
-    mags_cols_cl, mags_cols_all_fl = dataComb(
+    mags_cols_cl, mags_cols_cl_arr, mags_cols_fl_arr = dataComb(
         memb_prob_avrg_sort, field_regions_c)
 
     def regSelect(nbins):
         # Obtain bin edges.
         bin_edges = bin_edges_f(fld_clean_bin, mags_cols_cl, nbins=nbins)
 
-        # Convert into single N dimensional array.
-        mags_cols_cl_arr = np.array(mags_cols_cl[0] + mags_cols_cl[1])
-        # Obtain N-dimensional cluster region histogram.
-        cl_hist_p, cl_hist = get_clust_histo(
-            memb_prob_avrg_sort, mags_cols_cl_arr, bin_edges)
+        # Position the cluster region stars in the N-dimensional cells.
+        cl_cells, cl_st_cell = get_clust_histo(mags_cols_cl_arr, bin_edges)
 
         # Obtain field regions histogram (only number of stars in each cell).
         f_hist = get_fl_reg_hist(
-            field_regions_c, mags_cols_all_fl, bin_edges, cl_hist)
+            len(field_regions_c), mags_cols_fl_arr, bin_edges, cl_cells)
 
-        # Obtain stars separated in list to be used by the best fit function,
-        # and the list of the rejected stars not to be used.
-        cl_reg_fit, cl_reg_no_fit = get_fit_stars(
-            cl_hist_p, f_hist, flag_decont_skip)
-
-        return cl_reg_fit, cl_reg_no_fit, bin_edges
+        return cl_st_cell, f_hist, bin_edges
 
     # This method requires processing the block several times to keep the
-    # best run.
+    # best run. Only the number of stars that would be kept is obtained for
+    # each run, the stars are selected for the best one.
     if fld_clean_bin == 'optm':
-        diff_memb, data = [], []
+        diff_min = np.inf
         for nbins in range(24, 2, -1):
-            cl_reg_fit, cl_reg_no_fit, bin_edges = regSelect(nbins)
-            data.append([cl_reg_fit, cl_reg_no_fit, bin_edges])
-            diff_memb.append(abs(n_memb - len(cl_reg_fit)))
-        i = np.argmin(diff_memb)
-        cl_reg_fit, cl_reg_no_fit, bin_edges = data[i]
+            data = regSelect(nbins)
+            N_cell = np.bincount(data[0], minlength=data[1].size)
+            diff_memb = abs(n_memb - np.maximum(N_cell - data[1], 0.).sum())
+            if diff_memb < diff_min:
+                diff_min, (cl_st_cell, f_hist, bin_edges) = diff_memb, data
     else:
-        cl_reg_fit, cl_reg_no_fit, bin_edges = regSelect(None)
+        cl_st_cell, f_hist, bin_edges = regSelect(None)
+
+    # Obtain stars separated in list to be used by the best fit function,
+    # and the list of the rejected stars not to be used.
+    fit_idx, no_fit_idx = get_fit_stars(cl_st_cell, f_hist, flag_decont_skip)
+    cl_reg_fit = memb_prob_avrg_sort[fit_idx]
+    cl_reg_no_fit = memb_prob_avrg_sort[no_fit_idx]
 
     # Check the number of stars selected.
     if len(cl_reg_fit) < 10:
         print("  WARNING: less than 10 stars left after reducing\n"
               "  by 'local' method. Using full list.")
         cl_reg_fit, cl_reg_no_fit, bin_edges = memb_prob_avrg_sort,\
-            [], None
+            memb_prob_avrg_sort[:0], None
 
     return cl_reg_fit, cl_reg_no_fit, bin_edges
 
 
 def dataComb(memb_prob_avrg_sort, field_regions_c):
     """
-    Combine photometric data into a single array.
+    Combine photometric data into arrays of shape (N_dims, N_stars), with
+    the stars in all the field regions stored in a single array.
     """
     # Cluster region data
-    mags_cols_cl = [[], []]
-    for mag in list(zip(*list(zip(*memb_prob_avrg_sort))[1:][2])):
-        mags_cols_cl[0].append(mag)
-    for col in list(zip(*list(zip(*memb_prob_avrg_sort))[1:][4])):
-        mags_cols_cl[1].append(col)
+    mags_cols_cl = [
+        list(memb_prob_avrg_sort.mags.T), list(memb_prob_avrg_sort.cols.T)]
+    mags_cols_cl_arr = np.array(mags_cols_cl[0] + mags_cols_cl[1])
 
-    # Field regions data
-    mags_cols_all_fl = []
-    for freg in field_regions_c:
-        # Create list with all magnitudes and colors defined.
-        mags_cols_fl = []
-        for mag in list(zip(*list(zip(*freg))[1:][2])):
-            mags_cols_fl.append(mag)
-        for col in list(zip(*list(zip(*freg))[1:][4])):
-            mags_cols_fl.append(col)
+    # Field regions data. All magnitudes and colors defined.
+    mags_cols_fl_arr = np.concatenate([np.concatenate(
+        (freg.mags, freg.cols), axis=1) for freg in field_regions_c]).T
 
-        mags_cols_all_fl.append(mags_cols_fl)
-
-    return mags_cols_cl, mags_cols_all_fl
+    return mags_cols_cl, mags_cols_cl_arr, mags_cols_fl_arr
 
 
 def bin_edges_f(
@@ -221,17 +206,14 @@ def slpitArr(data, step=3.):
     return np.cumsum(d.repeat(m))
 
 
-def get_clust_histo(memb_prob_avrg_sort, mags_cols_cl, bin_edges):
-    """
-    Generate the N-dimensional cluster region histogram, with each star
-    positioned in its corresponding cell.
+def get_clust_histo(mags_cols_cl, bin_edges):
     """
+    Position each cluster region star in its corresponding cell of the
+    N-dimensional histogram.
 
-    # Cluster region N-dimensional histogram.
-    cl_hist = np.histogramdd(np.array(list(
-        zip(*mags_cols_cl))), bins=bin_edges)[0]
-    # np.shape(cl_hist) gives the tuple containing one element per dimension,
-    # indicating how many cells that dimension was divided into.
+    Returns the (sorted) flat indexes of the cells that contain cluster
+    stars, and the position in that array of the cell of each star.
+    """
 
     # Add a very small amount to each outer-most edge so the 'np.digitize'
     # function will position the stars on the edges correctly.
@@ -239,101 +221,71 @@ def get_clust_histo(memb_prob_avrg_sort, mags_cols_cl, bin_edges):
         bin_edges[i][0] = b_e[0] - (abs(b_e[0]) / 100.)
         bin_edges[i][-1] = b_e[-1] + (b_e[-1] / 100.)
 
-    # Position each cluster region star in its corresponding N-dimensional
-    # cell/bin.
-    cl_st_indx = []
-    # Store indexes for each dimension.
-    for i, mag_col in enumerate(mags_cols_cl):
-        # Set correct indexes for array subtracting 1, since 'np.digitize'
-        # counts one more bin to the right by default.
-        cl_st_indx.append(np.digitize(mag_col, bin_edges[i]) - 1)
-
-    # Create empty list with the same dimension as the photometric N-histogram.
-    cl_hist_p = np.empty(shape=cl_hist.shape + (0,)).tolist()
-    # Position stars in their corresponding N-histogram cells. Since the stars
-    # are already sorted by their MPs, they will be correctly sorted in the
-    # final list here too.
-    for i, h_indx in enumerate(list(zip(*cl_st_indx))):
-        # Store stars.
-        reduce(operator.getitem, list(h_indx), cl_hist_p).append(
-            memb_prob_avrg_sort[i])
-
-    return cl_hist_p, cl_hist
-
-
-def get_fl_reg_hist(field_regions_c, mags_cols_all_fl, bin_edges, cl_hist):
+    # Set correct indexes for each dimension subtracting 1, since
+    # 'np.digitize' counts one more bin to the right by default.
+    cl_st_indx = [
+        np.digitize(mag_col, bin_edges[i]) - 1 for i, mag_col in
+        enumerate(mags_cols_cl)]
+    # Flat index of the N-dimensional cell of each star.
+    cl_st_cell = np.ravel_multi_index(
+        cl_st_indx, [len(_) - 1 for _ in bin_edges], mode='clip')
+
+    return np.unique(cl_st_cell, return_inverse=True)
+
+
+def get_fl_reg_hist(N_fl_regs, mags_cols_fl, bin_edges, cl_cells):
     """
-    Obtain the average number of field region stars in each cell defined for
-    the N-dimensional cluster region photometric diagram.
+    Obtain the average number of field region stars in each of the cells
+    that contain cluster region stars (same binning as 'np.histogramdd').
     """
-
-    # Empty field region array shaped like the cluster region array.
-    f_hist = np.zeros(shape=np.shape(cl_hist))
-    # Add stars in all the defined field regions.
-    for mags_cols_fl in mags_cols_all_fl:
-        # N-dimension histogram for each field region.
-        f_hist = f_hist + np.histogramdd(
-            np.array(list(zip(*mags_cols_fl))), bins=bin_edges)[0]
+    N_bins = [len(_) - 1 for _ in bin_edges]
+    fl_st_indx, in_hist = [], np.ones(mags_cols_fl.shape[1], dtype=bool)
+    for i, mag_col in enumerate(mags_cols_fl):
+        indx = np.searchsorted(bin_edges[i], mag_col, side='right') - 1
+        # The right-most edge is included in the last bin.
+        indx[mag_col == bin_edges[i][-1]] -= 1
+        in_hist &= (indx >= 0) & (indx < N_bins[i])
+        fl_st_indx.append(indx)
+    fl_st_cell = np.ravel_multi_index(
+        [_[in_hist] for _ in fl_st_indx], N_bins)
+
+    # Count the field stars in cells with cluster stars.
+    j = np.searchsorted(cl_cells, fl_st_cell).clip(max=cl_cells.size - 1)
+    f_hist = np.bincount(
+        j[cl_cells[j] == fl_st_cell], minlength=cl_cells.size)
 
     # Average number of stars in each cell/bin and round to integer.
-    f_hist = np.around(f_hist / len(field_regions_c), 0)
+    f_hist = np.around(f_hist / N_fl_regs, 0)
 
     return f_hist
 
 
-def get_fit_stars(cl_hist_p, f_hist, flag_decont_skip):
+def get_fit_stars(cl_st_cell, f_hist, flag_decont_skip):
     """
-    Iterate through each N-dimensional cell of the cluster region array and
-    remove the excess of field stars in each one, selecting those with the
-    lowest assigned MPs if the DA was applied. Otherwise select random stars.
+    Remove the excess of field stars in each N-dimensional cell of the
+    cluster region, selecting those with the lowest assigned MPs if the DA
+    was applied. Otherwise select random stars.
+
+    The stars are grouped by cell, and ranked within each one: by their
+    index (they are sorted by their MPs) or randomly. In a cell with
+    'N_fl_reg' field stars the last 'N_fl_reg' ranked stars are discarded.
+
+    Returns the indexes of the stars kept and removed.
     """
+    N_st = cl_st_cell.size
+    if flag_decont_skip:
+        # If the DA was not applied, discard *random* stars in each cell.
+        rand_key = np.array([random.random() for _ in range(N_st)])
+        order = np.lexsort((rand_key, cl_st_cell))
+    else:
+        order = np.argsort(cl_st_cell, kind='stable')
+
+    # Number of stars in each cell, and position of each star in its cell.
+    N_cell = np.bincount(cl_st_cell, minlength=f_hist.size)
+    cell_start = np.cumsum(N_cell) - N_cell
+    cell_s = cl_st_cell[order]
+    rank = np.arange(N_st) - cell_start[cell_s]
+
+    keep = rank < (N_cell - f_hist.astype(int))[cell_s]
 
-    # DEPRECATED by the minimum of two cells per dimension imposed in
-    # bin_edges_f()
-    # Only flatten list if more than 1 cell was defined.
-    # if len(cl_hist_p) > 1:
-    #     cl_hist_p_flat = np.asarray(cl_hist_p).flatten()
-    # else:
-    #     cl_hist_p_flat = cl_hist_p[0]
-
-    # Flatten arrays to access all of its elements.
-    cl_hist_p_flat = np.asarray(cl_hist_p).flatten()
-    f_hist_flat = f_hist.flatten()
-
-    cl_reg_fit, cl_reg_no_fit = [], []
-    # For each cell defined.
-    for i, cl_cell in enumerate(cl_hist_p_flat):
-
-        # Get average number of field regions in this cell.
-        N_fl_reg = f_hist_flat[i]
-
-        if N_fl_reg > 0.:
-            # Discard the excess of N_reg_fl stars from this cluster region.
-
-            # If the DA was not applied, discard N_fl_reg *random* stars in
-            # the cell.
-            if flag_decont_skip:
-
-                if int(N_fl_reg) < len(cl_cell):
-                    # Generate list with randomized cell indexes.
-                    ran_indx = random.sample(
-                        range(len(cl_cell)), len(cl_cell))
-
-                    # Store len(cl_cell) - N_fl_reg stars
-                    cl_reg_fit +=\
-                        [cl_cell[i] for i in ran_indx[:-int(N_fl_reg)]]
-                    # Discard N_fl_reg stars.
-                    cl_reg_no_fit +=\
-                        [cl_cell[i] for i in ran_indx[-int(N_fl_reg):]]
-                else:
-                    # Discard *all* stars in the cell.
-                    cl_reg_no_fit += cl_cell
-            else:
-                # Discard those N_fl_reg with the smallest MPs, keep the rest.
-                cl_reg_fit += cl_cell[:-int(N_fl_reg)]
-                cl_reg_no_fit += cl_cell[-int(N_fl_reg):]
-        else:
-            # No field region stars in this cell, keep all stars.
-            cl_reg_fit += cl_cell
-
-    return cl_reg_fit, cl_reg_no_fit
+    return order[keep], order[~keep]
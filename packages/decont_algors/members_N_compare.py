@@ -14,11 +14,8 @@ def main(clp):
     # Obtain parameter if the DA was applied.
     if not clp['flag_decont_skip'] and clp['n_memb'] > 0:
 
-        n_memb_da = 0
         # Number of stars assigned a MP>=0.5.
-        for star in clp['memb_prob_avrg_sort']:
-            if star[9] >= 0.5:
-                n_memb_da += 1
+        n_memb_da = int((clp['memb_prob_avrg_sort'].mps >= 0.5).sum())
 
         # Obtain parameter.
         memb_par = (float(clp['n_memb']) - float(n_memb_da)) / \
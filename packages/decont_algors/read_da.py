@@ -21,18 +21,17 @@ def main(cl_region, memb_file, readda_idcol=0, readda_mpcol=-2):
         print("  WARNING: MPs column not found. Assigned MP=1. to all stars")
         memb_probs = np.ones(len(data))
 
-    N_not, memb_probs_cl_region = 0, []
+    # Index of each star in file (the first one, if repeated)
+    id_dict = {}
+    for i, id_st in enumerate(id_list):
+        id_dict.setdefault(id_st, i)
+
     # Assign probabilities read from file according to the star's IDs.
-    for star in cl_region:
-        if star[0] in id_list:
-            # Index of star in file.
-            i = id_list.index(star[0])
-            # Assign the probability stored in file for this star.
-            memb_probs_cl_region.append(memb_probs[i])
-        else:
-            # Stars not present in the list are assigned a fixed value.
-            memb_probs_cl_region.append(0.5)
-            N_not += 1
+    # Stars not present in the list are assigned a fixed value.
+    idx = np.array([id_dict.get(_, -1) for _ in cl_region.ids], dtype=int)
+    memb_probs_cl_region = np.where(
+        idx >= 0, np.asarray(memb_probs, dtype=float)[idx], 0.5)
+    N_not = (idx < 0).sum()
 
     if N_not > 0:
         print(("  WARNING: {} stars where not present in the membership\n" +
@@ -1,6 +1,7 @@
 
 import numpy as np
 import warnings
+from ..inp.star_table import StarTable
 
 
 def main(i_c, cld, clp, err_max, **kwargs):
@@ -11,25 +12,15 @@ def main(i_c, cld, clp, err_max, **kwargs):
 
     # Call function to reject stars with errors > e_max.
     acpt_indx, rjct_indx, em_float, N_st_err_rjct = max_err_cut(cld, err_max)
-    if not acpt_indx:
+    if acpt_indx.size == 0:
         raise ValueError(
             "ERROR: No stars left after error rejection.\n"
             "Try increasing the maximum accepted error value.")
 
-    # Filter elements.
-    acpt = {k: v[..., acpt_indx] for k, v in cld.items()}
-    rjct = {k: v[..., rjct_indx] for k, v in cld.items()}
-
-    # Store each star separately. This part is important since it is here
-    # where we define the position of the data.
-    acpt_stars = [
-        list(_) for _ in zip(*[
-            acpt['ids'], acpt['x'], acpt['y'], acpt['mags'].T, acpt['em'].T,
-            acpt['cols'].T, acpt['ec'].T, acpt['kine'].T, acpt['ek'].T])]
-    rjct_stars = [
-        list(_) for _ in zip(*[
-            rjct['ids'], rjct['x'], rjct['y'], rjct['mags'].T, rjct['em'].T,
-            rjct['cols'].T, rjct['ec'].T, rjct['kine'].T, rjct['ek'].T])]
+    # Store the accepted and rejected stars as tables. This part is important
+    # since it is here where we define the position of the data.
+    acpt_stars = StarTable.fromDict(cld, acpt_indx)
+    rjct_stars = StarTable.fromDict(cld, rjct_indx)
 
     print("  Stars rejected based on their errors ({})".format(
         len(rjct_stars)))
@@ -92,10 +83,8 @@ def max_err_cut(cld, err_max):
             m_msk.sum(), np.sum(c_msk, 1), np.array([
                 plx_msk.sum(), pmx_msk.sum(), pmy_msk.sum(), rv_msk.sum()])])
 
-    acpt_indx = np.flatnonzero(
-        (m_msk.all(0) & np.array(c_msk).all(0) & plx_msk & pmx_msk & pmy_msk &
-         rv_msk)).tolist()
-    rjct_indx = np.setdiff1d(
-        np.arange(len(cld['em'][0])), acpt_indx).tolist()
+    acpt_msk = m_msk.all(0) & np.array(c_msk).all(0) & plx_msk & pmx_msk &\
+        pmy_msk & rv_msk
+    acpt_indx, rjct_indx = np.flatnonzero(acpt_msk), np.flatnonzero(~acpt_msk)
 
     return acpt_indx, rjct_indx, em_float, N_st_err_rjct
@@ -13,13 +13,13 @@ def main(clp):
     generate the synthetic clusters in the best match module.
     '''
     # Use the main magnitude after max error rejection.
-    mmag = np.array(list(zip(*(list(zip(*clp['acpt_stars_c']))[3])))[0])
+    mmag = clp['acpt_stars_c'].mags[:, 0]
     be_m, interv_mag, n_interv, mmag_interv_pts = errorData(mmag)
 
     # Obtain the median points for photometric errors. Append magnitude
     # values first, and colors after.
-    e_mags = list(zip(*(list(zip(*clp['acpt_stars_c']))[4])))
-    e_cols = list(zip(*(list(zip(*clp['acpt_stars_c']))[6])))
+    e_mags = list(clp['acpt_stars_c'].em.T)
+    e_cols = list(clp['acpt_stars_c'].ec.T)
     e_mc_medians = []
     for e_mc in e_mags + e_cols:
         e_mc_medians.append(err_medians.main(
@@ -15,6 +15,17 @@ def main(pars_f_path):
     with open(pars_f_path, "r") as f_dat:
 
         manual_struct, trim_frame_range = [], []
+        # Default values for optional lines.
+        N_interp, interp_mode, grid_cache_mb = 'auto', 'uniform', 2048.
+        N_IMF = 1
+        noise_rot = False
+        bayesda_mb, bayesda_nprocs, bayesda_tol = 256., 1, 'n'
+        lkl_tol, lkl_max_pairs = 'n', 1000000
+        cache_mb, cache_steps = 0., [0., 0., 0., 0.]
+        pt_storage, pt_cold_only = 'memory', False
+        pt_checkpoint, pt_resume = 0., False
+        pt_ess_min, pt_tau_stable = 0., .05
+        pt_batch = 0
         # Iterate through each line in the file.
         for ln, line in enumerate(f_dat):
 
@@ -76,6 +87,11 @@ def main(pars_f_path):
                     da_algor = reader[1]
                     bayesda_runs = int(reader[2])
                     bayesda_dflag = reader[3:]
+                elif reader[0] == 'D1':
+                    bayesda_mb = float(reader[1])
+                    bayesda_nprocs = int(float(reader[2])) if len(reader) > 2\
+                        else 1
+                    bayesda_tol = str(reader[3]) if len(reader) > 3 else 'n'
 
                 # Cluster region field stars removal.
                 elif reader[0] == 'F0':
@@ -106,6 +122,16 @@ def main(pars_f_path):
                     except ValueError:
                         max_mag = str(reader[5])
 
+                elif reader[0] == 'R1':
+                    N_interp = str(reader[1])
+                    interp_mode = str(reader[2])
+                    if len(reader) > 3:
+                        grid_cache_mb = float(reader[3])
+                elif reader[0] == 'R2':
+                    N_IMF = int(reader[1])
+                elif reader[0] == 'R3':
+                    noise_rot = True if reader[1] in true_lst else False
+
                 # Ranges for the fundamental parameters
                 elif reader[0] == 'RZ':
                     z_range = reader[1:]
@@ -131,6 +157,8 @@ def main(pars_f_path):
                     best_fit_algor = str(reader[1])
                     mins_max = float(reader[2])
                     full_trace_flag = True if reader[3] in true_lst else False
+                    save_state_flag = True if len(reader) > 4 and\
+                        reader[4] in true_lst else False
 
                 # Shared ptemcee parameters.
                 elif reader[0] == 'B1':
@@ -140,6 +168,8 @@ def main(pars_f_path):
                     pt_ntemps = reader[4]
                     pt_tmax = reader[5]
                     pt_adapt = True if reader[6] in true_lst else False
+                    pt_nprocs = int(float(reader[7])) if len(reader) > 7\
+                        else 1
 
                 # Priors
                 elif reader[0] == 'BZ':
@@ -166,6 +196,23 @@ def main(pars_f_path):
                     lkl_method = str(reader[1])
                     lkl_binning = str(reader[2])
                     lkl_manual_bins = reader[3:]
+                elif reader[0] == 'B3':
+                    lkl_tol = str(reader[1])
+                    lkl_max_pairs = int(float(reader[2]))
+                elif reader[0] == 'B4':
+                    cache_mb = float(reader[1])
+                    cache_steps = list(map(float, reader[2:6]))
+                elif reader[0] == 'B5':
+                    pt_storage = str(reader[1])
+                    pt_cold_only = True if reader[2] in true_lst else False
+                elif reader[0] == 'B6':
+                    pt_checkpoint = float(reader[1])
+                    pt_resume = True if reader[2] in true_lst else False
+                elif reader[0] == 'B7':
+                    pt_ess_min = float(reader[1])
+                    pt_tau_stable = float(reader[2])
+                elif reader[0] == 'B8':
+                    pt_batch = int(float(reader[1]))
 
                 # Output parameters.
                 elif reader[0] == 'O0':
@@ -262,7 +309,8 @@ def main(pars_f_path):
 
         # Decontamination algorithm parameters.
         'da_algor': da_algor, 'bayesda_runs': bayesda_runs,
-        'bayesda_dflag': bayesda_dflag,
+        'bayesda_dflag': bayesda_dflag, 'bayesda_mb': bayesda_mb,
+        'bayesda_nprocs': bayesda_nprocs, 'bayesda_tol': bayesda_tol,
 
         # Plx & PMs parameters.
         'plx_bayes_flag': plx_bayes_flag, 'plx_offset': plx_offset,
@@ -277,17 +325,26 @@ def main(pars_f_path):
         # Synthetic cluster parameters
         'synth_rand_seed': synth_rand_seed, 'par_ranges': par_ranges,
         'evol_track': evol_track, 'IMF_name': IMF_name, 'bin_mr': bin_mr,
-        'R_V': R_V, 'max_mag': max_mag,
+        'R_V': R_V, 'max_mag': max_mag, 'N_interp': N_interp,
+        'interp_mode': interp_mode, 'grid_cache_mb': grid_cache_mb,
+        'N_IMF': N_IMF, 'noise_rot': noise_rot,
 
         # Best fit parameters.
         'best_fit_algor': best_fit_algor, 'mins_max': mins_max,
         'full_trace_flag': full_trace_flag,
+        'save_state_flag': save_state_flag,
         # ptemcee algorithm parameters.
         'nsteps_mcee': nsteps_mcee, 'nwalkers_mcee': nwalkers_mcee,
         'nburn_mcee': nburn_mcee, 'priors_mcee': priors_mcee,
         'pt_ntemps': pt_ntemps, "pt_adapt": pt_adapt, 'pt_tmax': pt_tmax,
+        'pt_nprocs': pt_nprocs,
         'lkl_method': lkl_method, 'lkl_binning': lkl_binning,
-        'lkl_manual_bins': lkl_manual_bins,
+        'lkl_manual_bins': lkl_manual_bins, 'lkl_tol': lkl_tol,
+        'lkl_max_pairs': lkl_max_pairs, 'cache_mb': cache_mb,
+        'cache_steps': cache_steps, 'pt_storage': pt_storage,
+        'pt_cold_only': pt_cold_only, 'pt_checkpoint': pt_checkpoint,
+        'pt_resume': pt_resume, 'pt_ess_min': pt_ess_min,
+        'pt_tau_stable': pt_tau_stable, 'pt_batch': pt_batch,
 
         # Fixed accepted parameter values and photometric systems.
         'read_mode_accpt': read_mode_accpt, 'coord_accpt': coord_accpt,
@@ -6,7 +6,8 @@ from .. import update_progress
 
 def main(
     mags_theor, cols_theor, mags_cols_theor, extra_pars, all_met_vals,
-        all_age_vals, binar_fracs, bin_mr, synth_rand_seed):
+    all_age_vals, binar_fracs, bin_mr, synth_rand_seed, N_interp='auto',
+        interp_mode='uniform'):
     """
     Interpolate extra points into all the filters, colors, filters of colors,
     and extra parameters (masses, etc). This allows the later IMF sampled
@@ -35,11 +36,12 @@ def main(
 
     """
 
-    N_mass_interp = interpPoints(mags_theor)
-    print("Interpolating extra points ({}) into the isochrones".format(
-        N_mass_interp))
+    N_mass_interp = interpPoints(mags_theor, N_interp)
+    print("Interpolating extra points ({}, {}) into the isochrones".format(
+        N_mass_interp, interp_mode))
     mags_intp, cols_intp, mags_cols_intp, extra_pars_intp = interp_isoch_data(
-        (mags_theor, cols_theor, mags_cols_theor, extra_pars), N_mass_interp)
+        (mags_theor, cols_theor, mags_cols_theor, extra_pars), N_mass_interp,
+        interp_mode)
 
     # The magnitudes for each defined color ('mags_cols_intp') are used here
     # and discarded after the colors (and magnitudes) with binarity assignment
@@ -68,6 +70,16 @@ def main(
         m_ini_idx = 2 * (np.shape(mags_intp)[2] + np.shape(cols_intp)[2]) + 2
         binar_flag = True
 
+    # Sort the stars in each isochrone by their initial masses, so that the
+    # synthetic clusters can be generated without sorting them (see
+    # 'cut_max_mag' and 'mass_interp'). The interpolated isochrones are
+    # usually already sorted this way.
+    m_ini = theor_tracks[:, :, m_ini_idx]
+    if (np.diff(m_ini, axis=-1) < 0.).any():
+        m_order = np.argsort(m_ini, axis=-1, kind='mergesort')
+        theor_tracks = np.take_along_axis(
+            theor_tracks, m_order[:, :, None, :], axis=-1)
+
     # DEPRECATED 02-10-2019
     #
     # This block is not needed anymore since there is no sorting anymore,
@@ -111,11 +123,16 @@ def main(
     return theor_tracks, m_ini_idx, binar_flag
 
 
-def interpPoints(mags_theor):
+def interpPoints(mags_theor, N_interp='auto'):
     """
     Find the maximum number of points in all the read ages for all the
     metallicities.
+
+    If 'N_interp' is an integer, use that number of points.
     """
+    if N_interp != 'auto':
+        return int(N_interp)
+
     N_pts_max = 0
     for z in mags_theor:
         for a in z:
@@ -129,28 +146,114 @@ def interpPoints(mags_theor):
     return N_mass_interp
 
 
-def interp_isoch_data(data_all, N):
+def interp_isoch_data(data_all, N, interp_mode='uniform'):
     """
     Interpolate extra values for all the parameters in the theoretic
     isochrones.
+
+    The isochrones are grouped by their number of points, and all the
+    filters/colors/extra parameters in each group are resampled at once.
+    The new points are located (in the [0, 1] range of the original points'
+    indexes) using either:
+
+    * uniform: N equally spaced points. Equivalent to calling 'np.interp()'
+      on each array.
+    * mass: N points equally spaced along the (m_ini, main magnitude) curve
+      of each isochrone. This places more points where the magnitude changes
+      faster with the mass, so a smaller N can be used.
+
+    Returns a list of arrays (one per element in 'data_all') with shape
+    (Nz, Na, N_cols, N)
+    """
+    Nz, Na = len(data_all[0]), len(data_all[0][0])
+    # Number of arrays (filters/colors/extra parameters) in each element
+    N_cols = [len(data[0][0]) for data in data_all]
+
+    # Group the isochrones by their number of points.
+    groups = {}
+    for z in range(Nz):
+        for a in range(Na):
+            L = len(data_all[0][z][a][0])
+            groups.setdefault(L, []).append((z, a))
+
+    all_interp_data = np.empty((Nz, Na, sum(N_cols), N))
+    for gi, (L, za_idx) in enumerate(groups.items()):
+        # shape: (N_isochs, N_cols, L)
+        fp = np.array([
+            np.concatenate([
+                np.asarray(data[z][a], dtype=float).reshape(n_c, L)
+                for data, n_c in zip(data_all, N_cols)]) for z, a in za_idx])
+
+        xp = np.linspace(0., 1., L)
+        if interp_mode == 'mass':
+            # Main magnitude and initial mass
+            t = massSpacing(xp, fp[:, 0], fp[:, N_cols[0] + N_cols[1] +
+                            N_cols[2]], N)
+        else:
+            t = np.linspace(0., 1., N)
+
+        z_i, a_i = np.array(za_idx).T
+        all_interp_data[z_i, a_i] = interpRows(t, xp, fp)
+
+        update_progress.updt(len(groups), gi + 1)
+
+    return np.split(all_interp_data, np.cumsum(N_cols)[:-1], axis=2)
+
+
+def massSpacing(xp, mag, mass, N):
+    """
+    Locate N points equally spaced along the normalized (mass, mag) curve of
+    each isochrone. Returns their positions in the 'xp' scale.
+    """
+    def norm(x):
+        rng = np.ptp(x, axis=1)[:, None]
+        rng[rng == 0.] = 1.
+        return np.diff(x, axis=1) / rng
+
+    ds = np.sqrt(norm(mass)**2 + norm(mag)**2)
+    s = np.concatenate((np.zeros((len(ds), 1)), np.cumsum(ds, axis=1)), 1)
+
+    t = np.empty((len(s), N))
+    for i, si in enumerate(s):
+        if si[-1] > 0.:
+            t[i] = np.interp(np.linspace(0., si[-1], N), si, xp)
+        else:
+            t[i] = np.linspace(0., 1., N)
+    return t
+
+
+def interpRows(t, xp, fp):
     """
-    all_interp_data = []
-    for i, data in enumerate(data_all):
-        interp_data = []
-        # For each metallicity value list.
-        for met in data:
-            m = []
-            # For each age value list.
-            for age in met:
-                a = []
-                # For each filter/color/extra parameter in list.
-                for fce in age:
-                    t, xp = np.linspace(0., 1., N), np.linspace(0, 1, len(fce))
-                    a.append(np.interp(t, xp, fce))
-                m.append(a)
-            interp_data.append(m)
-
-        all_interp_data.append(interp_data)
-        update_progress.updt(len(data_all), i + 1)
-
-    return all_interp_data
+    Vectorized version of 'np.interp()' for all the arrays in 'fp' (shape:
+    (N_isochs, N_cols, L)), sharing the same 'xp' values. The positions 't'
+    are either shared by all the isochrones (shape: (N,)) or given for each
+    one (shape: (N_isochs, N)).
+
+    The operations are the same as in 'np.interp()', so the results are
+    identical.
+    """
+    L = len(xp)
+    if L == 1:
+        return np.broadcast_to(fp, fp.shape[:2] + (t.shape[-1],)).copy()
+
+    j = np.clip(np.searchsorted(xp, t, side='right') - 1, 0, L - 1)
+    j1 = np.minimum(j + 1, L - 1)
+
+    if t.ndim == 1:
+        fp_j, fp_j1 = np.take(fp, j, axis=2), np.take(fp, j1, axis=2)
+        t, xp_j, xp_j1 = t, xp[j], xp[j1]
+    else:
+        fp_j = np.take_along_axis(fp, j[:, None, :], axis=2)
+        fp_j1 = np.take_along_axis(fp, j1[:, None, :], axis=2)
+        t, xp_j, xp_j1 = t[:, None, :], xp[j][:, None, :], xp[j1][:, None, :]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        res = fp_j1 - fp_j
+        res /= xp_j1 - xp_j
+        res *= t - xp_j
+        res += fp_j
+    # Points that match an 'xp' value (including the last one)
+    exact = np.broadcast_to(t == xp_j, res.shape)
+    res[exact] = fp_j[exact]
+
+    return res
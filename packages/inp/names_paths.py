@@ -32,6 +32,10 @@ def main(cl_file, **kwargs):
 
     memb_file_out = join(output_subdir, clust_name + '_memb.dat')
     mcmc_file_out = join(output_subdir, clust_name + '_mcmc.pickle')
+    state_file_out = join(output_subdir, clust_name + '_state.pickle')
+    # Prefix for the files that store the sampler's chain.
+    chain_file_out = join(output_subdir, clust_name)
+    checkpoint_file_out = join(output_subdir, clust_name + '_chkp.pickle')
     synth_file_out = join(output_subdir, clust_name + '_synth.dat')
     write_name = join(cl_file[2], clust_name)
     out_file_name = join(output_dir, 'asteca_output.dat')
@@ -45,7 +49,8 @@ def main(cl_file, **kwargs):
         'out_file_name': out_file_name, 'output_subdir': output_subdir,
         'memb_file_out': memb_file_out, 'synth_file_out': synth_file_out,
         'write_name': write_name, 'mcmc_file_out': mcmc_file_out,
-        'params_out': params_out}
+        'state_file_out': state_file_out, 'chain_file_out': chain_file_out,
+        'checkpoint_file_out': checkpoint_file_out, 'params_out': params_out}
     return npd
 
 
@@ -0,0 +1,88 @@
+
+import numpy as np
+
+
+class StarTable(object):
+    """
+    Columnar storage for a set of stars. Each attribute is a single array
+    with one element (or row) per star:
+
+    ids  : (N,)       IDs (strings)
+    x, y : (N,)       coordinates
+    mags : (N, N_m)   magnitudes, and 'em' their uncertainties
+    cols : (N, N_c)   colors, and 'ec' their uncertainties
+    kine : (N, 4)     parallax, PMs, RV, and 'ek' their uncertainties
+    mps  : (N,)       membership probabilities (None if not assigned)
+
+    Sub-sets of stars are obtained indexing the table with a slice, an array
+    of indexes or a boolean mask, which returns a new table. The table is
+    not iterable, the stars are processed through the columns.
+    """
+    names = ('ids', 'x', 'y', 'mags', 'em', 'cols', 'ec', 'kine', 'ek')
+
+    def __init__(self, ids, x, y, mags, em, cols, ec, kine, ek, mps=None):
+        self.ids = np.asarray(ids)
+        self.x, self.y = np.asarray(x, dtype=float), np.asarray(
+            y, dtype=float)
+        self.mags, self.em, self.cols, self.ec, self.kine, self.ek = [
+            np.asarray(_, dtype=float) for _ in (
+                mags, em, cols, ec, kine, ek)]
+        self.mps = None if mps is None else np.asarray(mps, dtype=float)
+
+    @classmethod
+    def fromDict(cls, cld, idx=None):
+        """
+        Table with the stars in the 'cld' dictionary (see 'get_data'), where
+        the multi-dimensional columns have shape (N_dims, N). If 'idx' is
+        given, only those stars are stored.
+        """
+        if idx is None:
+            idx = slice(None)
+        return cls(*[
+            cld[k][idx] if cld[k].ndim == 1 else cld[k][:, idx].T
+            for k in cls.names])
+
+    @staticmethod
+    def concat(tables):
+        """
+        Single table with the stars in all the 'tables'.
+        """
+        mps = None
+        if all(_.mps is not None for _ in tables):
+            mps = np.concatenate([_.mps for _ in tables])
+        return StarTable(*[
+            np.concatenate([getattr(_, k) for _ in tables])
+            for k in StarTable.names], mps=mps)
+
+    def columns(self):
+        """
+        The arrays stored, in the order of the 'names' attribute followed by
+        the MPs (if assigned).
+        """
+        cols = [getattr(self, k) for k in self.names]
+        if self.mps is not None:
+            cols.append(self.mps)
+        return cols
+
+    def withMPs(self, mps):
+        """
+        Table with the same stars (sharing the arrays) and the membership
+        probabilities 'mps'.
+        """
+        return StarTable(*self.columns()[:9], mps=mps)
+
+    def __len__(self):
+        return self.ids.size
+
+    # Prevent the fallback iteration through '__getitem__'.
+    __iter__ = None
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            raise TypeError(
+                "a table of stars can not be indexed by a single star")
+        return StarTable(*[_[key] for _ in self.columns()[:9]], mps=(
+            None if self.mps is None else self.mps[key]))
+
+    def __add__(self, other):
+        return StarTable.concat([self, other])
@@ -0,0 +1,191 @@
+
+import os
+import hashlib
+import pickle
+import numpy as np
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    # Python < 3.8
+    shared_memory = None
+
+
+# Version of the cached data format. Change it to invalidate old caches.
+CACHE_VERSION = 2
+
+
+def fileRemove(file_path):
+    """
+    Remove a file, ignoring errors (e.g.: the file is still mapped
+    in a Windows system)
+    """
+    try:
+        os.remove(file_path)
+    except OSError:
+        pass
+
+
+def shareTracks(theor_tracks):
+    """
+    Prepare the 'theor_tracks' array to be shared with other processes.
+
+    Memory-mapped arrays are shared through their file. Otherwise the data is
+    copied (once) into a 'multiprocessing.shared_memory' block, if available.
+
+    Returns
+    -------
+    descr : tuple
+      Descriptor used by 'loadTracks()' to access the array.
+    shm : SharedMemory / None
+      Shared memory block. Must be kept alive by the parent process while
+      the workers use it, and released afterwards with 'shareRelease()'.
+
+    """
+    if isinstance(theor_tracks, np.memmap) and theor_tracks.filename:
+        return ('mmap', theor_tracks.filename), None
+
+    if shared_memory is None:
+        # Can not share, the workers will receive a copy of the array.
+        return ('array', theor_tracks), None
+
+    theor_tracks = np.asarray(theor_tracks)
+    shm = shared_memory.SharedMemory(
+        create=True, size=max(1, theor_tracks.nbytes))
+    shm_arr = np.ndarray(
+        theor_tracks.shape, dtype=theor_tracks.dtype, buffer=shm.buf)
+    shm_arr[:] = theor_tracks[:]
+    descr = ('shm', shm.name, theor_tracks.shape, theor_tracks.dtype.str)
+
+    return descr, shm
+
+
+def loadTracks(descr):
+    """
+    Access the 'theor_tracks' array described by 'descr' (see
+    'shareTracks()'). Returns the array and the shared memory block it
+    belongs to (if any), which must be kept referenced while the array is
+    in use.
+    """
+    if descr[0] == 'mmap':
+        return np.load(descr[1], mmap_mode='r'), None
+    elif descr[0] == 'shm':
+        _, name, shape, dtype = descr
+        shm = shared_memory.SharedMemory(name=name)
+        theor_tracks = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+        return theor_tracks, shm
+
+    return descr[1], None
+
+
+def shareRelease(shm):
+    """
+    Free the shared memory block created by 'shareTracks()'.
+    """
+    if shm is not None:
+        shm.close()
+        shm.unlink()
+
+
+def cacheKey(met_files, *args):
+    """
+    Key that identifies a processed isochrones grid. Generated from the
+    contents of all the metallicity files and the rest of the input
+    parameters that affect the grid (passed in 'args').
+    """
+    h = hashlib.sha1(str(CACHE_VERSION).encode())
+    for syst in met_files:
+        for met_f in syst:
+            h.update(os.path.basename(met_f).encode())
+            with open(met_f, 'rb') as f:
+                for block in iter(lambda: f.read(2**20), b''):
+                    h.update(block)
+    h.update(repr(args).encode())
+
+    return h.hexdigest()
+
+
+def cacheLoad(cache_dir, key):
+    """
+    Load a cached grid. Returns None if it does not exist (or can not be
+    read). Else returns the memory-mapped 'theor_tracks' array, and the
+    'm_ini_idx', 'binar_flag' and random state values stored with it.
+    """
+    tracks_f, pars_f = cacheFiles(cache_dir, key)
+    try:
+        with open(pars_f, 'rb') as f:
+            m_ini_idx, binar_flag, rand_state = pickle.load(f)
+        theor_tracks = np.load(tracks_f, mmap_mode='r')
+    except (OSError, EOFError, ValueError, pickle.UnpicklingError):
+        return None
+
+    # Mark as recently used.
+    os.utime(tracks_f)
+
+    return theor_tracks, m_ini_idx, binar_flag, rand_state
+
+
+def cacheSave(
+    cache_dir, key, theor_tracks, m_ini_idx, binar_flag, rand_state,
+        max_mb):
+    """
+    Store a processed grid in the cache folder and return it as a
+    memory-mapped array. The least recently used entries are removed if the
+    size of the folder exceeds 'max_mb'. If the cache can not be written,
+    the in-memory array is returned unchanged.
+    """
+    tracks_f, pars_f = cacheFiles(cache_dir, key)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # Write to temporary files first so that other runs never read a
+        # partially written entry.
+        tmp = '.{}.tmp'.format(os.getpid())
+        np.save(tracks_f[:-4] + tmp + '.npy', theor_tracks)
+        with open(pars_f + tmp, 'wb') as f:
+            pickle.dump([m_ini_idx, binar_flag, rand_state], f)
+        os.replace(tracks_f[:-4] + tmp + '.npy', tracks_f)
+        os.replace(pars_f + tmp, pars_f)
+    except OSError as err:
+        print("  WARNING: could not write isochrones cache ({})".format(err))
+        return theor_tracks
+
+    cacheEvict(cache_dir, key, max_mb)
+
+    return np.load(tracks_f, mmap_mode='r')
+
+
+def cacheEvict(cache_dir, keep_key, max_mb):
+    """
+    Remove the least recently used entries in the cache until its size is
+    below 'max_mb'. The 'keep_key' entry is never removed.
+    """
+    entries = []
+    for fname in os.listdir(cache_dir):
+        if fname.endswith('.npy') and '.tmp' not in fname:
+            key = fname[:-4]
+            tracks_f, pars_f = cacheFiles(cache_dir, key)
+            try:
+                size = os.path.getsize(tracks_f)
+                if os.path.isfile(pars_f):
+                    size += os.path.getsize(pars_f)
+                entries.append((os.path.getmtime(tracks_f), size, key))
+            except OSError:
+                pass
+
+    total = sum(_[1] for _ in entries)
+    # Oldest first.
+    for _, size, key in sorted(entries):
+        if total <= max_mb * 1024.**2:
+            break
+        if key == keep_key:
+            continue
+        for fname in cacheFiles(cache_dir, key):
+            fileRemove(fname)
+        total -= size
+
+
+def cacheFiles(cache_dir, key):
+    """
+    Files that store a cache entry.
+    """
+    return os.path.join(cache_dir, key + '.npy'),\
+        os.path.join(cache_dir, key + '.pickle')
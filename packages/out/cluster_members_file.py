@@ -1,4 +1,5 @@
 
+import numpy as np
 from astropy.io import ascii
 from astropy.table import Table
 
@@ -11,22 +12,23 @@ def main(clp, npd, **kwargs):
 
     # Add ID associated to the use of the each star in the fundamental
     # parameters estimation process (ie: after cleaning the cluster region).
-    data, idx = [], ['1', '0']
-    for i, reg in enumerate([clp['cl_reg_fit'], clp['cl_reg_no_fit']]):
-        for st in reg:
-            # Identify stars selected by the removal function.
-            data.append([st[0], st[9], idx[i]])
+    ids, mps, sel = [], [], []
+    for reg, idx in ((clp['cl_reg_fit'], '1'), (clp['cl_reg_no_fit'], '0')):
+        # Identify stars selected by the removal function.
+        ids.append(reg.ids)
+        mps.append(reg.mps)
+        sel.append(np.full(len(reg), idx))
 
-    # TODO: this block gets really slow for large clusters
     # Add "incomplete" data in cluster region to file.
-    ids_data = list(zip(*data))[0]
-    for i, st in enumerate(clp['cl_region_i']):
-        if st[0] not in ids_data:
-            # Identify stars selected by the removal function.
-            data.append([
-                st[0], round(clp['memb_probs_cl_region_i'][i], 2), '-1'])
+    cl_region_i = clp['cl_region_i']
+    msk = ~np.isin(cl_region_i.ids, np.concatenate(ids))
+    ids.append(cl_region_i.ids[msk])
+    mps.append(np.round(np.asarray(clp['memb_probs_cl_region_i'])[msk], 2))
+    sel.append(np.full(msk.sum(), '-1'))
 
-    t = Table(list(zip(*data)), names=['ID', 'MP', 'sel'])
+    t = Table(
+        [np.concatenate(_) for _ in (ids, mps, sel)],
+        names=['ID', 'MP', 'sel'])
     ascii.write(
         t, npd['memb_file_out'], overwrite=True, format='csv',
         fast_writer=False  # <-- TODO remove when the bug is fixed
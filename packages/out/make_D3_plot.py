@@ -81,8 +81,10 @@ def main(
             for n, args in enumerate(arglist):
                 mp_bestfit_CMD.plot(n, *args)
 
-            v_min_mp, v_max_mp = prep_plots.da_colorbar_range(cl_max_mag, [])
-            diag_fit_inv, dummy = prep_plots.da_phot_diag(cl_max_mag, [])
+            v_min_mp, v_max_mp = prep_plots.da_colorbar_range(
+                cl_max_mag, cl_max_mag[:0])
+            diag_fit_inv, dummy = prep_plots.da_phot_diag(
+                cl_max_mag, cl_max_mag[:0])
             cl_sz_pt = prep_plots.phot_diag_st_size(diag_fit_inv)
             # Main photometric diagram of observed cluster.
             i_y = 0 if yaxis == 'mag' else 1
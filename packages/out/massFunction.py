@@ -22,10 +22,8 @@ def main(clp):  # m_ini_obs
     m_act = np.array(clp['synth_clst'][1][3])
 
     # Observed photometric data
-    phot_obs = []
-    for st in clp['cl_max_mag']:
-        phot_obs.append(list(st[3]) + list(st[5]))
-    phot_obs = np.array(phot_obs)
+    phot_obs = np.concatenate(
+        (clp['cl_max_mag'].mags, clp['cl_max_mag'].cols), axis=1)
 
     # Find synthetic stars closest to all the observed stars.
     tree = spatial.cKDTree(phot_synth)
@@ -31,17 +31,16 @@ def pl_cl_fl_regions(
     # Plot cluster region.
     if len(cl_region_rjct_c) > 0:
         plt.scatter(
-            list(zip(*cl_region_rjct_c))[1], list(zip(*cl_region_rjct_c))[2],
+            cl_region_rjct_c.x, cl_region_rjct_c.y,
             marker='x', c='teal', s=15, lw=.5, edgecolors='none')
 
     N_flrg = 0
     if not flag_no_fl_regs_c:
         # Stars inside the field regions with rejected errors.
         for i, reg in enumerate(field_regions_rjct_c):
-            if reg:
-                fl_reg = list(zip(*reg))
-                N_flrg += len(fl_reg[0])
-                plt.scatter(fl_reg[1], fl_reg[2], marker='x',
+            if len(reg) > 0:
+                N_flrg += len(reg)
+                plt.scatter(reg.x, reg.y, marker='x',
                             c='teal', s=15, lw=.5, edgecolors='none')
 
     ax.set_title(r"$N_{{rjct}}$={} (phot compl)".format(
@@ -161,7 +160,7 @@ def clCMD(
     ob.patch.set(alpha=0.7)
     ax.add_artist(ob)
     # Plot stars in CMD.
-    if yr:
+    if len(yr) > 0:
         # Only attempt to plot if any star is stored in the list.
         plt.scatter(xr, yr, marker='x', c='teal', s=12, lw=.5, zorder=2)
     plt.scatter(
@@ -187,12 +186,8 @@ def pl_cl_diag(
         r"$N_{{accpt}}={}$ , $N_{{rjct}}={}$"
         r" ($r \leq r_{{cl}}$ compl)".format(
             len(cl_region_c), len(cl_region_rjct_c)))
-    xr, yr = [], []
-    if len(cl_region_rjct_c) > 0:
-        xr = list(zip(*list(zip(*cl_region_rjct_c))[5]))[0]
-        yr = list(zip(*list(zip(*cl_region_rjct_c))[3]))[0]
-    xa = list(zip(*list(zip(*cl_region_c))[5]))[0]
-    ya = list(zip(*list(zip(*cl_region_c))[3]))[0]
+    xr, yr = cl_region_rjct_c.cols[:, 0], cl_region_rjct_c.mags[:, 0]
+    xa, ya = cl_region_c.cols[:, 0], cl_region_c.mags[:, 0]
     # CMD for first color
     col_idx = 1
     clCMD(
@@ -201,10 +196,7 @@ def pl_cl_diag(
 
     if x_ax1 != '':
         ax = plt.subplot(gs[4:6, 0:2])
-        xr = []
-        if len(cl_region_rjct_c) > 0:
-            xr = list(zip(*list(zip(*cl_region_rjct_c))[5]))[1]
-        xa = list(zip(*list(zip(*cl_region_c))[5]))[1]
+        xr, xa = cl_region_rjct_c.cols[:, 1], cl_region_c.cols[:, 1]
         # CMD for second color
         col_idx = 2
         clCMD(
@@ -285,8 +277,7 @@ def pl_hess_cmd(
     """
     if stars_f_acpt[0]:
         ax = plt.subplot(gs[2:4, 2:4])
-        cl_col = list(zip(*list(zip(*cl_region_c))[5]))[0]
-        cl_mag = list(zip(*list(zip(*cl_region_c))[3]))[0]
+        cl_col, cl_mag = cl_region_c.cols[:, 0], cl_region_c.mags[:, 0]
         fr_col, fr_mag = stars_f_acpt[1], stars_f_acpt[0]
 
         hessKDE(
@@ -294,7 +285,7 @@ def pl_hess_cmd(
             y_max_cmd0, cl_col, cl_mag, fr_col, fr_mag)
 
         if stars_f_acpt[2]:
-            cl_col = list(zip(*list(zip(*cl_region_c))[5]))[1]
+            cl_col = cl_region_c.cols[:, 1]
             fr_col = stars_f_acpt[2]
             ax = plt.subplot(gs[4:6, 2:4])
             hessKDE(
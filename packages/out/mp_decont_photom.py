@@ -20,7 +20,7 @@ def pl_mp_histo(
         plt.ylabel('N')
         if plot_style == 'asteca':
             ax.grid()
-        prob_data = [star[9] for star in memb_prob_avrg_sort]
+        prob_data = memb_prob_avrg_sort.mps
         # Histogram of the data.
         n_bins = int((max(prob_data) - min(prob_data)) / 0.025)
         if n_bins > 0:
@@ -40,7 +40,7 @@ def pl_mp_histo(
             print("  WARNING: all MPs are equal valued. "
                   "Can not plot MPs histogram.")
         # Plot minimum probability line.
-        min_prob = cl_reg_fit[-1][-1]
+        min_prob = cl_reg_fit.mps[-1]
         plt.axvline(x=min_prob, linestyle='--', color='green', lw=2.5,
                     zorder=3)
 
@@ -1,5 +1,4 @@
 
-import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.offsetbox as offsetbox
 from . import prep_plots
@@ -35,39 +34,31 @@ def pl_phot_err(
     """
 
     # Main magnitude (x) data for accepted/rejected stars.
-    mmag_out_acpt, mmag_out_rjct, mmag_in_acpt, mmag_in_rjct =\
-        np.array([]), np.array([]), np.array([]), np.array([])
-    if stars_out_c:
-        mmag_out_acpt = np.array(list(zip(*list(zip(*stars_out_c))[3]))[0])
-    if stars_out_rjct_c:
-        mmag_out_rjct = np.array(list(zip(*list(zip(
-            *stars_out_rjct_c))[3]))[0])
-    if cl_region_c:
-        mmag_in_acpt = np.array(list(zip(*list(zip(*cl_region_c))[3]))[0])
-    if cl_region_rjct_c:
-        mmag_in_rjct = np.array(list(zip(*list(zip(*cl_region_rjct_c))[3]))[0])
+    mmag_out_acpt, mmag_out_rjct, mmag_in_acpt, mmag_in_rjct = [
+        _.mags[:, 0] for _ in (
+            stars_out_c, stars_out_rjct_c, cl_region_c, cl_region_rjct_c)]
 
     # Define parameters for main magnitude error plot.
     y_ax, x_ax = prep_plots.ax_names(filters[0], filters[0], 'mag')
     # Remove parenthesis
     y_ax = y_ax.replace('(', '').replace(')', '')
-    err_plot = [[x_ax, y_ax, 4, 0]]
+    err_plot = [[x_ax, y_ax, 'em', 0]]
     # For all defined colors.
     for i, _ in enumerate(colors):
         y_ax, _ = prep_plots.ax_names(colors[i], filters[0], 'mag')
-        err_plot.append([x_ax, y_ax, 6, i])
+        err_plot.append([x_ax, y_ax, 'ec', i])
 
     pd_Plx, pd_PMRA, pd_PMDE, pd_RV = id_kinem[0], id_kinem[2], id_kinem[4],\
         id_kinem[6]
     # For the kinematic data
     if pd_Plx != 'n':
-        err_plot.append([x_ax, "Plx", 8, 0])
+        err_plot.append([x_ax, "Plx", 'ek', 0])
     if pd_PMRA != 'n':
-        err_plot.append([x_ax, "PMra", 8, 1])
+        err_plot.append([x_ax, "PMra", 'ek', 1])
     if pd_PMDE != 'n':
-        err_plot.append([x_ax, "PMde", 8, 2])
+        err_plot.append([x_ax, "PMde", 'ek', 2])
     if pd_RV != 'n':
-        err_plot.append([x_ax, "RV", 8, 3])
+        err_plot.append([x_ax, "RV", 'ek', 3])
 
     # Set plot limits
     x_min, x_max = min(mags[0]) - 0.5, max(mags[0]) + 0.5
@@ -83,23 +74,15 @@ def pl_phot_err(
         ax.set_facecolor('#EFF0F1')
 
         # Rejected stars outside the cluster region
-        if any(mmag_out_rjct) and any(stars_out_rjct_c):
-            starsPlot('rjct', mmag_out_rjct,
-                      list(zip(*list(zip(*stars_out_rjct_c))[j]))[k])
-        if any(mmag_in_rjct) and any(cl_region_rjct_c):
-            # Rejected stars inside the cluster region
-            starsPlot('rjct', mmag_in_rjct,
-                      list(zip(*list(zip(*cl_region_rjct_c))[j]))[k])
-        if any(mmag_in_acpt) and any(cl_region_c):
-            # Accepted stars inside the cluster region.
-            starsPlot('accpt_in', mmag_in_acpt,
-                      list(zip(*list(zip(*cl_region_c))[j]))[k])
-        if any(mmag_out_acpt) and any(stars_out_c):
-            # Accepted stars outside the cluster region.
-            starsPlot('accpt_out', mmag_out_acpt,
-                      list(zip(*list(zip(*stars_out_c))[j]))[k])
-
-        if j == 4:
+        starsPlot('rjct', mmag_out_rjct, getattr(stars_out_rjct_c, j)[:, k])
+        # Rejected stars inside the cluster region
+        starsPlot('rjct', mmag_in_rjct, getattr(cl_region_rjct_c, j)[:, k])
+        # Accepted stars inside the cluster region.
+        starsPlot('accpt_in', mmag_in_acpt, getattr(cl_region_c, j)[:, k])
+        # Accepted stars outside the cluster region.
+        starsPlot('accpt_out', mmag_out_acpt, getattr(stars_out_c, j)[:, k])
+
+        if j == 'em':
             # Plot legend in the main magnitude plot.
             leg = plt.legend(
                 fancybox=True, loc='upper left', scatterpoints=1,
@@ -119,7 +102,7 @@ def pl_phot_err(
             plt.plot(err_bar_all[1], err_bar_all[2][0], color='yellow',
                      ls='--', lw=2, zorder=5)
 
-        elif j == 6:
+        elif j == 'ec':
             max_cut_y = em_float[1 + k]
             ax.hlines(y=max_cut_y, xmin=x_min, xmax=x_max, color='k',
                       linestyles='dashed', zorder=4)
@@ -71,10 +71,8 @@ def plx_chart(gs, plot_style, x_name, y_name, coord, cl_reg_fit, plx_Bys):
     plt.ylabel('{} ({})'.format(y_name, coord))
 
     # Prepare data.
-    x = np.array(list(zip(*cl_reg_fit))[1])
-    y = np.array(list(zip(*cl_reg_fit))[2])
-    mp = np.array(list(zip(*cl_reg_fit))[9])
-    plx = np.array(list(zip(*list(zip(*cl_reg_fit))[7]))[0])
+    x, y, mp, plx = cl_reg_fit.x, cl_reg_fit.y, cl_reg_fit.mps,\
+        cl_reg_fit.kine[:, 0]
     msk = (~np.isnan(x)) & (~np.isnan(y)) & (~np.isnan(mp)) &\
         (~np.isnan(plx))
     x, y, mp, plx = x[msk], y[msk], mp[msk], plx[msk]
@@ -382,9 +382,9 @@ def pl_cl_fl_regions(
     # Plot cluster region.
     if len(cl_region_rjct_i) > 0:
         plt.scatter(
-            list(zip(*cl_region_rjct_i))[1], list(zip(*cl_region_rjct_i))[2],
+            cl_region_rjct_i.x, cl_region_rjct_i.y,
             marker='o', c='red', s=8, edgecolors='w', lw=.2)
-    plt.scatter(list(zip(*cl_region_i))[1], list(zip(*cl_region_i))[2],
+    plt.scatter(cl_region_i.x, cl_region_i.y,
                 marker='o', c='red', s=8, edgecolors='w', lw=.2)
 
     N_flrg = 0
@@ -393,16 +393,14 @@ def pl_cl_fl_regions(
         col1 = cycle(['DimGray', 'ForestGreen', 'maroon', 'RoyalBlue'])
         # Stars inside the field regions with accepted errors.
         for i, reg in enumerate(field_regions_i):
-            fl_reg = list(zip(*reg))
-            N_flrg += len(fl_reg[0])
-            plt.scatter(fl_reg[1], fl_reg[2], marker='o',
+            N_flrg += len(reg)
+            plt.scatter(reg.x, reg.y, marker='o',
                         c=next(col0), s=8, edgecolors='w', lw=.2)
         # Stars inside the field regions with rejected errors.
         for i, reg in enumerate(field_regions_rjct_i):
-            if reg:
-                fl_reg = list(zip(*reg))
-                N_flrg += len(fl_reg[0])
-                plt.scatter(fl_reg[1], fl_reg[2], marker='o',
+            if len(reg) > 0:
+                N_flrg += len(reg)
+                plt.scatter(reg.x, reg.y, marker='o',
                             c=next(col1), s=8, edgecolors='w', lw=.2)
 
     ax.set_title(r"$N_{{stars}}$={} (phot incomp); $N_{{fregs}}$={}".format(
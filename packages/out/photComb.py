@@ -1,5 +1,6 @@
 
 from random import shuffle
+from ..inp.star_table import StarTable
 
 
 def main(pd, clp):
@@ -10,22 +11,20 @@ def main(pd, clp):
     """
 
     # Stars in complete photometry, error accepted, cluster region.
-    cl_ac_col_0 = list(list(zip(*list(zip(*clp['cl_region_c']))[5]))[0])
-    cl_ac_mag_0 = list(list(zip(*list(zip(*clp['cl_region_c']))[3]))[0])
+    cl_region_c = clp['cl_region_c']
+    cl_ac_col_0 = list(cl_region_c.cols[:, 0])
+    cl_ac_mag_0 = list(cl_region_c.mags[:, 0])
     cl_ac_col_1 = []
     if len(pd['colors']) > 1:
-        cl_ac_col_1 = list(list(zip(*list(zip(*clp['cl_region_c']))[5]))[1])
+        cl_ac_col_1 = list(cl_region_c.cols[:, 1])
 
     # Stars in complete photometry, error rejected, cluster region.
-    cl_rj_col_0, cl_rj_mag_0, cl_rj_col_1 = [], [], []
-    if len(clp['cl_region_rjct_c']) > 0:
-        cl_rj_col_0 = list(list(zip(*list(zip(
-            *clp['cl_region_rjct_c']))[5]))[0])
-        cl_rj_mag_0 = list(list(zip(*list(zip(
-            *clp['cl_region_rjct_c']))[3]))[0])
-        if len(pd['colors']) > 1:
-            cl_rj_col_1 = list(list(zip(*list(zip(
-                *clp['cl_region_rjct_c']))[5]))[1])
+    cl_region_rjct_c = clp['cl_region_rjct_c']
+    cl_rj_col_0 = list(cl_region_rjct_c.cols[:, 0])
+    cl_rj_mag_0 = list(cl_region_rjct_c.mags[:, 0])
+    cl_rj_col_1 = []
+    if len(pd['colors']) > 1:
+        cl_rj_col_1 = list(cl_region_rjct_c.cols[:, 1])
 
     # Only use 25$ of the rejected stars. This way they have a lesser impact
     # on the CMD limits.
@@ -54,26 +53,15 @@ def field_region_stars(field_regions, field_regions_rjct, colors):
     Generate list with accepted/rejected stars within all the defined field
     regions.
     """
-    stars_f_acpt = [[], [], []]
-    if field_regions:
-        # Extract color(s) and main magnitude defined.
-        stars_f_acpt[0] = [
-            star[3][0] for flrg in field_regions for star in flrg]
-        stars_f_acpt[1] = [
-            star[5][0] for flrg in field_regions for star in flrg]
-        if len(colors) > 1:
-            stars_f_acpt[2] = [
-                star[5][1] for flrg in field_regions for star in flrg]
-
-    stars_f_rjct = [[], [], []]
-    if field_regions_rjct:
-        # Extract color(s) and main magnitude defined.
-        stars_f_rjct[0] = [
-            star[3][0] for flrg in field_regions_rjct for star in flrg]
-        stars_f_rjct[1] = [
-            star[5][0] for flrg in field_regions_rjct for star in flrg]
-        if len(colors) > 1:
-            stars_f_rjct[2] = [
-                star[5][1] for flrg in field_regions_rjct for star in flrg]
+    def magCols(regions):
+        stars = [[], [], []]
+        if regions:
+            # Extract color(s) and main magnitude defined.
+            fl_regs = StarTable.concat(regions)
+            stars[0] = list(fl_regs.mags[:, 0])
+            stars[1] = list(fl_regs.cols[:, 0])
+            if len(colors) > 1:
+                stars[2] = list(fl_regs.cols[:, 1])
+        return stars
 
-    return stars_f_rjct, stars_f_acpt
+    return magCols(field_regions_rjct), magCols(field_regions)
@@ -3,6 +3,7 @@ from ..math_f import exp_function
 from ..best_fit.obs_clust_prepare import dataProcess
 from ..decont_algors.local_cell_clean import bin_edges_f
 from ..aux_funcs import circFrac
+from ..inp.star_table import StarTable
 import numpy as np
 import warnings
 from astropy.visualization import ZScaleInterval
@@ -186,9 +187,8 @@ def da_colorbar_range(cl_reg_fit, cl_reg_no_fit):
     """
     Extreme values for colorbar.
     """
-    lst_comb = cl_reg_fit + cl_reg_no_fit
-    v_min_mp, v_max_mp = round(min(list(zip(*lst_comb))[-1]), 2), \
-        round(max(list(zip(*lst_comb))[-1]), 2)
+    mps_comb = np.concatenate((cl_reg_fit.mps, cl_reg_no_fit.mps))
+    v_min_mp, v_max_mp = round(min(mps_comb), 2), round(max(mps_comb), 2)
 
     return v_min_mp, v_max_mp
 
@@ -199,32 +199,23 @@ def da_find_chart(
     """
     Finding chart with MPs assigned by the DA.
     """
-    # Arrange stars used in the best fit process.
-    cl_reg_fit = list(zip(*cl_reg_fit))
-    # Finding chart data. Invert values so higher prob stars are on top.
-    chart_fit_inv = [i[::-1] for i in
-                     [cl_reg_fit[1], cl_reg_fit[2], cl_reg_fit[9]]]
-
-    # Arrange stars *not* used in the best fit process.
-    if cl_reg_no_fit:
-        cl_reg_no_fit = list(zip(*cl_reg_no_fit))
-        # Finding chart data.
-        chart_no_fit_inv = [
-            i[::-1] for i in [cl_reg_no_fit[1], cl_reg_no_fit[2],
-                              cl_reg_no_fit[9]]]
-    else:
-        chart_no_fit_inv = [[], [], []]
+    # Finding chart data of the stars used in the best fit process. Invert
+    # values so higher prob stars are on top.
+    chart_fit_inv = [
+        i[::-1] for i in [cl_reg_fit.x, cl_reg_fit.y, cl_reg_fit.mps]]
+
+    # Stars *not* used in the best fit process.
+    chart_no_fit_inv = [
+        i[::-1] for i in [cl_reg_no_fit.x, cl_reg_no_fit.y,
+                          cl_reg_no_fit.mps]]
 
     # Separate stars outside the cluster's radius.
-    out_clust_rad = [[], []]
-    for star in stars_out:
-        if x_zmin <= star[1] <= x_zmax and y_zmin <= star[2] <= y_zmax:
-            dist = np.sqrt((kde_cent[0] - star[1]) ** 2 +
-                           (kde_cent[1] - star[2]) ** 2)
-            # Only plot stars outside the cluster's radius.
-            if dist >= clust_rad:
-                out_clust_rad[0].append(star[1])
-                out_clust_rad[1].append(star[2])
+    x, y = stars_out.x, stars_out.y
+    dist = np.sqrt((kde_cent[0] - x) ** 2 + (kde_cent[1] - y) ** 2)
+    # Only plot stars outside the cluster's radius.
+    msk = (x_zmin <= x) & (x <= x_zmax) & (y_zmin <= y) & (y <= y_zmax) &\
+        (dist >= clust_rad)
+    out_clust_rad = [x[msk], y[msk]]
 
     return chart_fit_inv, chart_no_fit_inv, out_clust_rad
 
@@ -235,24 +226,18 @@ def da_phot_diag(cl_reg_fit, cl_reg_no_fit):
     assigned by the DA. The stars are inverted according to their MPs, so that
     those with larger probabilities are plotted last.
     """
-    # Arrange stars used in the best fit process.
-    cl_reg_fit = list(zip(*cl_reg_fit))
-    # Magnitudes.
-    diag_fit_inv = [[i[::-1] for i in list(zip(*cl_reg_fit[3]))]]
-    # Colors.
-    diag_fit_inv += [[i[::-1] for i in list(zip(*cl_reg_fit[5]))]]
-    # membership probabilities.
-    diag_fit_inv += [cl_reg_fit[9][::-1]]
-
-    # Arrange stars *not* used in the best fit process.
-    if cl_reg_no_fit:
-        cl_reg_no_fit = list(zip(*cl_reg_no_fit))
-        # Magnitudes.
-        diag_no_fit_inv = [[i[::-1] for i in list(zip(*cl_reg_no_fit[3]))]]
-        # Colors.
-        diag_no_fit_inv += [[i[::-1] for i in list(zip(*cl_reg_no_fit[5]))]]
-        # membership probabilities.
-        diag_no_fit_inv += [cl_reg_no_fit[9][::-1]]
+    def diagInv(stars):
+        # Magnitudes, colors and membership probabilities.
+        return [
+            list(stars.mags.T[:, ::-1]), list(stars.cols.T[:, ::-1]),
+            stars.mps[::-1]]
+
+    # Stars used in the best fit process.
+    diag_fit_inv = diagInv(cl_reg_fit)
+
+    # Stars *not* used in the best fit process.
+    if len(cl_reg_no_fit) > 0:
+        diag_no_fit_inv = diagInv(cl_reg_no_fit)
     else:
         diag_no_fit_inv = [[[]], [[]], []]
 
@@ -267,10 +252,7 @@ def error_bars(stars_phot, x_min_cmd, err_lst, all_flag=None):
     if all_flag == 'all':
         mmag = np.array(stars_phot)
     else:
-        if stars_phot:
-            mmag = np.array(list(zip(*list(zip(*stars_phot))[3]))[0])
-        else:
-            mmag = np.array([])
+        mmag = stars_phot.mags[:, 0]
 
     x_val, mag_y, xy_err = [], [], []
     if mmag.any():
@@ -389,8 +371,7 @@ def packData(
     # CMD of main magnitude and first color defined.
     # Used to defined limits.
     x_phot_all, y_phot_all = col_0_comb, mag_0_comb
-    frst_obs_mag, frst_obs_col = list(zip(*list(zip(*cl_max_mag))[3]))[0],\
-        list(zip(*list(zip(*cl_max_mag))[5]))[0]
+    frst_obs_mag, frst_obs_col = cl_max_mag.mags[:, 0], cl_max_mag.cols[:, 0]
     frst_synth_col, frst_synth_mag = synth_clst_plot.T[1], synth_clst_plot.T[0]
     frst_col_edgs, frst_mag_edgs = bin_edges[1], bin_edges[0]
     # Filters and colors are appended continuously in 'shift_isoch'. If
@@ -416,7 +397,7 @@ def packData(
     # If more than one color was defined, plot an extra CMD (main magnitude
     # versus first color), and an extra CCD (first color versus second color)
     if N_cols > 1:
-        scnd_obs_col = list(zip(*list(zip(*cl_max_mag))[5]))[1]
+        scnd_obs_col = cl_max_mag.cols[:, 1]
         scnd_synth_col = synth_clst_plot.T[2]
         scnd_col_edgs = bin_edges[2]
         scnd_col_isoch = shift_isoch[N_mags + 1]
@@ -490,12 +471,9 @@ def plxPlot(
         mp_clp[mp_i], plx_clp[mp_i], e_plx_clp[mp_i]
 
     if not flag_no_fl_regs_i:
-        plx_flrg, mag_flrg = [], []
         # Extract parallax data.
-        for fl_rg in field_regions_i:
-            plx_flrg += list(zip(*list(zip(*fl_rg))[7]))[0]
-            mag_flrg += list(zip(*list(zip(*fl_rg))[3]))[0]
-        plx_flrg, mag_flrg = np.asarray(plx_flrg), np.asarray(mag_flrg)
+        fl_regs = StarTable.concat(field_regions_i)
+        plx_flrg, mag_flrg = fl_regs.kine[:, 0], fl_regs.mags[:, 0]
         # Mask 'nan' and set range.
         msk0 = ~np.isnan(plx_flrg)
         plx_flrg, mag_flrg = plx_flrg[msk0], mag_flrg[msk0]
@@ -546,33 +524,31 @@ def complSeparate(cl_region_i, membs_i, memb_prob_avrg_sort):
     """
     Separate stars into complete and incomplete arrays.
     """
-    mags_c, mags_i, cols_c, cols_i, colors_c, colors_i = [[] for _ in range(6)]
-    ids_c = list(zip(*memb_prob_avrg_sort))[0]
-    dict_ids_c = {_: i for i, _ in enumerate(ids_c)}
-    for i, star in enumerate(cl_region_i):
-        try:
-            mags_c.append(memb_prob_avrg_sort[dict_ids_c[star[0]]][3][0])
-            cols_c.append(memb_prob_avrg_sort[dict_ids_c[star[0]]][5])
-            colors_c.append(memb_prob_avrg_sort[dict_ids_c[star[0]]][9])
-        except KeyError:
-            mags_i.append(star[3][0])
-            cols_i.append(star[5])
-            colors_i.append(membs_i[i])
-
-    cols_c = np.array(cols_c).T
-    if cols_i:
-        cols_i = np.array(cols_i).T
+    # Position of each cluster region star in the complete table.
+    ids_c, ids_i = memb_prob_avrg_sort.ids, cl_region_i.ids
+    srt = np.argsort(ids_c)
+    j = srt[np.searchsorted(ids_c, ids_i, sorter=srt).clip(
+        max=ids_c.size - 1)]
+    msk_c = ids_c[j] == ids_i
+    j = j[msk_c]
+
+    mags_c, cols_c, colors_c = memb_prob_avrg_sort.mags[j, 0],\
+        memb_prob_avrg_sort.cols[j].T, memb_prob_avrg_sort.mps[j]
+    if (~msk_c).any():
+        mags_i, cols_i, colors_i = cl_region_i.mags[~msk_c, 0],\
+            cl_region_i.cols[~msk_c].T, np.asarray(membs_i)[~msk_c]
         idx_i = np.argsort(colors_i)
-        mags_i = np.array(mags_i)[idx_i].tolist()
+        mags_i = mags_i[idx_i].tolist()
         cols_i = np.array([_[idx_i] for _ in cols_i]).tolist()
-        colors_i = np.array(colors_i)[idx_i].tolist()
+        colors_i = colors_i[idx_i].tolist()
     else:
+        mags_i, colors_i = [], []
         cols_i = [[] for _ in range(cols_c.shape[0])]
 
     idx_c = np.argsort(colors_c)
-    mags_c = np.array(mags_c)[idx_c].tolist()
+    mags_c = mags_c[idx_c].tolist()
     cols_c = np.array([_[idx_c] for _ in cols_c]).tolist()
-    colors_c = np.array(colors_c)[idx_c].tolist()
+    colors_c = colors_c[idx_c].tolist()
 
     return mags_c, mags_i, cols_c, cols_i, colors_c, colors_i
 
@@ -174,9 +174,8 @@ def spiral_index(spiral, sp_indx, histo, cent_bin, num_bins_area):
 def fregsDef(clp, stars_group, f_regions, spiral, sp_indx, num_bins_area):
     """
     """
-    # Obtain filled 2D histogram for the field with star's values attached
-    # to each bin.
-    h_manual = field_manual_histo.main(
+    # Bin of the 2D histogram for the field where each star is located.
+    xbin, ybin = field_manual_histo.main(
         stars_group, clp['xedges'], clp['yedges'])
 
     field_regions = []
@@ -188,34 +187,35 @@ def fregsDef(clp, stars_group, f_regions, spiral, sp_indx, num_bins_area):
             num_bins_area)
         # Fill spiral section for this field region with all the stars
         # that fall inside of it.
-        f_region = spiral_region(h_manual, sp_coords)
+        f_region = spiral_region(
+            stars_group, xbin, ybin, sp_coords,
+            (len(clp['xedges']) - 1, len(clp['yedges']) - 1))
         field_regions.append(f_region)
 
     return field_regions
 
 
-def spiral_region(h_manual, sp_coords):
+def spiral_region(stars_group, xbin, ybin, sp_coords, h_shape):
     """
     At this point we have the list 'sp_coords' composed of two lists, the
     first one containing the x coordinates for every bin that corresponds
     to the region and the second list the y coordinates. We need to
-    obtain the stars located inside each of those bins. To do this
-    we use 'h_manual' which is a list that already contains the stars that
-    fall inside each of the bins in the 2D histogram along with their
-    relevant data (ID, x, y, mag, etc..)
-    """
+    obtain the stars located inside each of those bins, using the bin
+    ('xbin', 'ybin') of each star in the 2D histogram of shape 'h_shape'.
 
-    f_region = []
-    # Iterate through all the bins in the spiral list defined.
-    for xbin, ybin in zip(*sp_coords):
+    The stars are ordered following the bins in the spiral, and by their
+    position in 'stars_group' within each bin.
+    """
+    # Position of each bin in the spiral section, or -1 if it is not part of
+    # it.
+    bin_pos = np.full(h_shape, -1)
+    bin_pos[tuple(sp_coords)] = np.arange(len(sp_coords[0]))
 
-        if h_manual[xbin][ybin][0] > 0:
-            # Add all the stars inside this bin to the region.
-            # We use [1:] to skip the first item which holds the
-            # number of stars in the bin.
-            f_region.extend(h_manual[xbin][ybin][1:])
+    st_pos = np.where(xbin >= 0, bin_pos[xbin, ybin], -1)
+    idx = np.flatnonzero(st_pos >= 0)
+    idx = idx[np.argsort(st_pos[idx], kind='mergesort')]
 
-    return f_region
+    return stars_group[idx]
 
 
 def fregsDel(field_regions):
@@ -9,21 +9,7 @@ def main(i_c, clp):
 
     # cl_region will contain those stars within the radius value and
     # with accepted photometric errors.
-    cl_region, stars_out, cl_region_rjct, stars_out_rjct = [], [], [], []
-
-    # Iterate through all stars with accepted photometric errors.
-    for star in clp['acpt_stars_' + i_c[0]]:
-
-        # Separate in and out of cluster's boundaries.
-        dist = np.sqrt((clp['kde_cent'][0] - star[1]) ** 2 +
-                       (clp['kde_cent'][1] - star[2]) ** 2)
-
-        if dist > clp['clust_rad']:
-            # Star is outside of the cluster's radius limit.
-            stars_out.append(star)
-        else:
-            # Star is inside the cluster's radius limit.
-            cl_region.append(star)
+    cl_region, stars_out = inOut(clp['acpt_stars_' + i_c[0]], clp)
 
     # Catch empty cluster region.
     if len(cl_region) <= 1:
@@ -35,22 +21,23 @@ def main(i_c, clp):
     else:
         print("  Stars separated in/out of cluster's boundaries")
 
-    # Iterate through all stars with rejected photometric errors.
-    for star in clp['rjct_stars_' + i_c[0]]:
-
-        # Separate in and out of cluster's boundaries.
-        dist = np.sqrt((clp['kde_cent'][0] - star[1]) ** 2 +
-                       (clp['kde_cent'][1] - star[2]) ** 2)
-
-        if dist > clp['clust_rad']:
-            # Star is out of the cluster's radius limit.
-            stars_out_rjct.append(star)
-        else:
-            # Star is inside the cluster's radius limit.
-            cl_region_rjct.append(star)
+    # Same for the stars with rejected photometric errors.
+    cl_region_rjct, stars_out_rjct = inOut(clp['rjct_stars_' + i_c[0]], clp)
 
     # Add parameters to dictionary.
     clp['cl_region_' + i_c[0]], clp['stars_out_' + i_c[0]],\
         clp['cl_region_rjct_' + i_c[0]], clp['stars_out_rjct_' + i_c[0]] =\
         cl_region, stars_out, cl_region_rjct, stars_out_rjct
     return clp
+
+
+def inOut(stars, clp):
+    """
+    Split the table of 'stars' in those inside and outside of the cluster's
+    radius.
+    """
+    dist = np.sqrt((clp['kde_cent'][0] - stars.x) ** 2 +
+                   (clp['kde_cent'][1] - stars.y) ** 2)
+    out_msk = dist > clp['clust_rad']
+
+    return stars[~out_msk], stars[out_msk]
@@ -1,40 +1,48 @@
 
 import numpy as np
 from ..math_f import exp_function
+from . import mass_distribution
 
 
-def main(isoch_compl, err_pars, m_ini_idx, binar_flag, extra_pars_flag):
-    """
-    """
-
-    err_lst, err_max, err_rnd = err_pars
-
-    photom, sigma, extra_pars = [], [], []
-    for i, popt_mc in enumerate(err_lst):
-        # isoch_compl[0] is the main magnitude.
-        sigma_mc = np.array(exp_function.exp_3p(isoch_compl[0], *popt_mc))
-
-        # Replace all photometric error values greater than err_max with
-        # err_max.
-        sigma_mc[sigma_mc > err_max[i]] = err_max[i]
-
-        # Randomly move stars around these errors.
-        mc_gauss = gauss_error(err_rnd, isoch_compl[i], sigma_mc)
+# Step (in mag) of the grid where the error curves are tabulated, and its
+# extension below the maximum magnitude of the synthetic clusters.
+ERR_STEP = 0.001
+ERR_SPAN = 30.
+# Intermediate arrays, reused between calls (see 'errIdx()')
+_buffer = {'x': np.empty(0), 'idx': np.empty(0, dtype=np.intp)}
 
-        # Create list with photometric dimensions in first sub-list, and
-        # associated errors in the second.
-        photom.append(mc_gauss)
-
-        # Not being called from 'synth_cluster'
-        if extra_pars_flag:
-            sigma.append(sigma_mc)
-
-    # Transposing is necessary for np.histogramdd() in the likelihood
-    photom = np.array(photom).T
 
+def main(
+    isoch_compl, err_pars, m_ini_idx, binar_flag, extra_pars_flag,
+        model=None):
+    """
+    Add the photometric errors to the synthetic cluster. The errors are
+    obtained from the error curves tabulated by 'errTable()', using the main
+    magnitude of each star, and scaled by the values in the noise pool (see
+    'noisePool()'). The 'model' is used to select the noise when the
+    rotation of the pool is enabled.
+    """
+    err_tab, err_rnd = err_pars
+    sigma_tab = err_tab[2]
+    N = isoch_compl.shape[1]
+
+    # Index of each star in the tabulated error curves.
+    idx = errIdx(isoch_compl[0], err_tab)
+    # Randomly move stars around these errors.
+    i0 = noiseShift(err_rnd, [model], [N])[0] if model is not None else 0
+    rnd = err_rnd[0][:, i0:i0 + N]
+
+    # Transposing (in the return) is necessary for np.histogramdd() in the
+    # likelihood
+    photom = np.empty((sigma_tab.shape[0], N))
+    for i, sigma_mc in enumerate(sigma_tab):
+        np.multiply(sigma_mc[idx], rnd[i], out=photom[i])
+        photom[i] += isoch_compl[i]
+
+    sigma, extra_pars = [], []
     # If this flag is True, define these two arrays.
     if extra_pars_flag:
-        sigma = np.array(sigma)
+        sigma = sigma_tab[:, idx]
         # The '-2' is there to include the binary probabilities and masses.
         if binar_flag:
             # Extra information (binary prob, binary mass, and extra params).
@@ -44,37 +52,105 @@ def main(isoch_compl, err_pars, m_ini_idx, binar_flag, extra_pars_flag):
             binar = np.zeros((2, isoch_compl.shape[1]))
             extra_pars = np.concatenate((binar, isoch_compl[m_ini_idx:]))
 
-    return photom, sigma, extra_pars
+    return photom.T, sigma, extra_pars
 
 
-def gauss_error(rnd, mc, e_mc):
+def errTable(err_lst, err_max, max_mag_syn):
     """
-    Randomly move mag and color through a Gaussian function.
+    Tabulate the exponential error curves fitted for each photometric
+    dimension ('err_lst'), clipped at their 'err_max' values, on a grid of
+    step ERR_STEP that spans the ERR_SPAN magnitudes below 'max_mag_syn' (no
+    synthetic star is fainter). Stars brighter than the start of the grid
+    are assigned the error of its first point.
+
+    Returns the magnitude of the first point in the grid, the inverse of the
+    step, and the tabulated errors with shape (N_dims, N_grid).
+    """
+    # The extra point avoids checking the upper limit of the indexes.
+    N_grid = int(round(ERR_SPAN / ERR_STEP)) + 2
+    mag_0 = max_mag_syn - ERR_SPAN
+    mag_grid = mag_0 + ERR_STEP * np.arange(N_grid)
+
+    sigma_tab = np.empty((len(err_lst), N_grid))
+    for i, popt_mc in enumerate(err_lst):
+        sigma_tab[i] = np.minimum(
+            exp_function.exp_3p(mag_grid, *popt_mc), err_max[i])
 
-    mc  : magnitude or color dimension
-    rnd : random array of floats normally distributed around 0. with stddev 1.
-    e_mc: fitted observational uncertainty value
+    return mag_0, 1. / ERR_STEP, sigma_tab
+
+
+def errIdx(mag, err_tab):
     """
-    mc_gauss = mc + rnd[:len(mc)] * e_mc
+    Index of the closest point in the grid of tabulated errors for each
+    magnitude in 'mag' (which must be smaller than 'max_mag_syn'). The
+    returned array is a view of a buffer that is overwritten by the next
+    call.
+    """
+    global _buffer
+
+    mag_0, inv_step = err_tab[:2]
+    N = mag.size
+    if _buffer['x'].size < N:
+        _buffer = {'x': np.empty(N), 'idx': np.empty(N, dtype=np.intp)}
+    x, idx = _buffer['x'][:N], _buffer['idx'][:N]
 
-    return mc_gauss
+    np.multiply(mag, inv_step, out=x)
+    x += .5 - mag_0 * inv_step
+    np.maximum(x, 0., out=x)
+    # Truncation of the (positive) values rounds to the closest index.
+    idx[:] = x
 
+    return idx
 
-def randIdxs(lkl_method, N_errors=1000000):
+
+def noisePool(lkl_method, N_dims, N_stars, rot_flag=False):
     """
-    Generate random indexes to use in the error function when generating the
-    synthetic clusters.
+    Pool of normally distributed random values (mean 0, stddev 1) used to
+    add the photometric errors to the synthetic clusters.
+
+    Each photometric dimension uses its own row of the pool, so the noise of
+    a star is not the same in all its dimensions. The pool is sized with the
+    number of stars in the IMF samples ('N_stars'), the largest synthetic
+    cluster that can be generated, and its size does not change afterwards.
+
+    By default the synthetic stars use the first values of each row, so the
+    same star position gets the same noise in every model. If 'rot_flag' is
+    True the starting position is rotated for each model (see
+    'noiseShift()').
+
+    The values are drawn from the seeded generator (see 'set_rand_seed'), so
+    they are reproducible.
+
+    Returns
+    -------
+    err_rnd : tuple
+      The (N_dims, N_stars) pool and the 'rot_flag'.
 
-    HARDCODED 'N_errors': this assumes that there will never be more than 1e6
-    stars in a synthetic cluster
     """
     from .set_rand_seed import np
 
     if lkl_method == 'tolstoy':
         # Tolstoy likelihood considers uncertainties, there's no need to
         # add it to the synthetic clusters.
-        err_rand = np.zeros(N_errors)
+        pool = np.zeros((N_dims, N_stars))
     else:
-        err_rand = np.random.normal(0., 1., N_errors)
+        pool = np.random.normal(0., 1., (N_dims, N_stars))
+
+    return pool, rot_flag
+
+
+def noiseShift(err_rnd, models, N_synth):
+    """
+    Position in the noise pool of the first value used by each one of the
+    'models', which generate synthetic clusters with 'N_synth' stars. It is
+    obtained hashing the model (so it is the same in any process) within the
+    range that keeps the 'N_synth' values inside the pool. Always 0 if the
+    rotation is disabled.
+    """
+    pool, rot_flag = err_rnd
+    N_synth = np.asarray(N_synth, dtype=np.uint64)
+    if not rot_flag:
+        return np.zeros(N_synth.size, dtype=int)
 
-    return err_rand
+    N_free = np.uint64(pool.shape[1]) - N_synth + np.uint64(1)
+    return (mass_distribution.modelHash(models) % N_free).astype(int)
@@ -48,7 +48,7 @@ def binarGen(
     0. Assign N unique indexes by dividing the range of stars by their total
        number.
 
-    For each theoretical isochrone defined.
+    For all the theoretical isochrones defined (processed at once):
 
         1. Draw random secondary masses for *all* stars.
         2. Find stars in the isochrone with the closest mass.
@@ -70,89 +70,55 @@ def binarGen(
 
         print("Generating binary data (b_mr={:.2f})".format(bin_mass_ratio))
 
-        met_probs, age_probs, unq_probs, fracs = randVals(
-            N_mass_interp, bin_mass_ratio)
-
-        mags_binar, cols_binar, probs_binar, mass_binar = [], [], [], []
-        # For each metallicity defined.
-        N_mags_theor = len(mags_theor)
-        for mx, _ in enumerate(mags_theor):
-
-            mag_bin, col_bin, prob_bin, mass_bin = [], [], [], []
-            # For each age defined.
-            for ax, isoch in enumerate(_):
-
-                # Extract initial masses for this isochrone. Assumes that
-                # the initial masses are in the '0' index.
-                mass_ini = extra_pars[mx][ax][0]
-
-                # Calculate random secondary masses of these binary stars
-                # between bin_mass_ratio*m1 and m1, where m1 is the primary
-                # mass.
-                # m2 = np.random.uniform(bin_mass_ratio * mass_ini, mass_ini)
-                m2 = fracs * mass_ini
-
-                # If any secondary mass falls outside of the lower isochrone's
-                # mass range, change its value to the min value.
-                m2 = np.maximum(np.min(mass_ini), m2)
-
-                # Obtain indexes for mass values in the 'm2' array pointing to
-                # the closest mass in the theoretical isochrone.
-                bin_m_close = find_closest(mass_ini, m2)
-
-                # Calculate unresolved binary magnitude for each
-                # filter/magnitude defined.
-                temp = []
-                for mag in isoch:
-                    temp.append(mag_combine(mag, mag[bin_m_close]))
-                mag_bin.append(temp)
-
-                # Calculate unresolved color for each color defined.
-                filt_colors = mags_cols_theor[mx][ax]
-
-                # Filters composing the colors, i.e.: C = (f1 - f2).
-                f1, f2 = [], []
-                # The [::2] slice indicates even positions, starting from 0.
-                for m in filt_colors[::2]:
-                    f1.append(mag_combine(m, m[bin_m_close]))
-                # The [1::2] slice indicates odd positions.
-                for m in filt_colors[1::2]:
-                    f2.append(mag_combine(m, m[bin_m_close]))
-
-                # Create the colors affected by binarity.
-                temp = []
-                for f_1, f_2 in zip(*[f1, f2]):
-                    temp.append(f_1 - f_2)
-                col_bin.append(temp)
-
-                # import matplotlib.pyplot as plt
-                # print(mx, ax)
-                # print(min(isoch[0]), max(isoch[0]))
-                # plt.scatter(filt_colors[0] - filt_colors[1], isoch[0], c='g')
-                # plt.scatter(col_bin[0], mag_bin[0], c='r')
-                # plt.gca().invert_yaxis()
-                # plt.show()
-
-                # Add masses to obtain the binary system's mass.
-                mass_bin.append([mass_ini + mass_ini[bin_m_close]])
-
-                # Find closest met & age values
-                iz = np.searchsorted(met_probs, all_met_vals[mx])
-                ia = np.searchsorted(age_probs, all_age_vals[ax])
-                # This ensures that the same (z, a) pair points to the same
-                # 'unq_probs' values (for the same random seed), no matter
-                # the ranges used for these parameters.
-                idx = (iz + ia) % len(unq_probs)
-                probs = unq_probs[idx]
-                prob_bin.append([probs])
-
-            # Store for each metallicity value.
-            mags_binar.append(mag_bin)
-            cols_binar.append(col_bin)
-            probs_binar.append(prob_bin)
-            mass_binar.append(mass_bin)
-
-            update_progress.updt(N_mags_theor, mx + 1)
+        # Shape of the arrays: (N_z, N_a, N_data, N_mass_interp)
+        mags_theor, cols_theor, mags_cols_theor, extra_pars = [
+            np.asarray(_) for _ in (
+                mags_theor, cols_theor, mags_cols_theor, extra_pars)]
+
+        probs_binar, fracs = randVals(
+            N_mass_interp, bin_mass_ratio, all_met_vals, all_age_vals)
+
+        # Extract initial masses for all the isochrones. Assumes that the
+        # initial masses are in the '0' index.
+        mass_ini = extra_pars[:, :, 0]
+
+        # Calculate random secondary masses of these binary stars
+        # between bin_mass_ratio*m1 and m1, where m1 is the primary
+        # mass.
+        # m2 = np.random.uniform(bin_mass_ratio * mass_ini, mass_ini)
+        m2 = fracs * mass_ini
+
+        # If any secondary mass falls outside of the lower isochrone's
+        # mass range, change its value to the min value.
+        m2 = np.maximum(np.min(mass_ini, axis=2)[:, :, None], m2)
+
+        # Obtain indexes for mass values in the 'm2' array pointing to
+        # the closest mass in the theoretical isochrone.
+        bin_m_close = np.empty(mass_ini.shape, dtype=int)
+        for mx in range(mass_ini.shape[0]):
+            for ax in range(mass_ini.shape[1]):
+                bin_m_close[mx, ax] = find_closest(
+                    mass_ini[mx, ax], m2[mx, ax])
+            update_progress.updt(mass_ini.shape[0], mx + 1)
+
+        def closest(arr):
+            return np.take_along_axis(arr, bin_m_close[:, :, None, :], axis=3)
+
+        # Calculate unresolved binary magnitude for each
+        # filter/magnitude defined.
+        mags_binar = mag_combine(mags_theor, closest(mags_theor))
+
+        # Calculate unresolved color for each color defined, using the
+        # filters composing the colors, i.e.: C = (f1 - f2).
+        f12 = mag_combine(mags_cols_theor, closest(mags_cols_theor))
+        # The [::2] slice indicates even positions, starting from 0, and the
+        # [1::2] slice indicates odd positions.
+        cols_binar = f12[:, :, ::2] - f12[:, :, 1::2]
+
+        # Add masses to obtain the binary system's mass.
+        mass_binar = mass_ini + closest(extra_pars[:, :, :1])[:, :, 0]
+        mass_binar = mass_binar[:, :, None, :]
+
     else:
         return None
 
@@ -160,8 +126,9 @@ def binarGen(
 
 
 def randVals(
-    N_mass_interp, bin_mass_ratio, zmin=0., zmax=0.06, amin=6., amax=10.5,
-        N_mets=50000, N_ages=50000, N_unq_probs=10000):
+    N_mass_interp, bin_mass_ratio, all_met_vals, all_age_vals, zmin=0.,
+    zmax=0.06, amin=6., amax=10.5, N_mets=50000, N_ages=50000,
+        N_unq_probs=10000):
     """
     Process the required random values making sure that they are reproducible
     to the maximum possible extent. In the N_mets-->inf, N_ages-->inf limit
@@ -172,9 +139,20 @@ def randVals(
     N_unq_probs-->inf every (z, a) pair has a unique array of probabilities
     assigned.
 
+    All the 'N_unq_probs' shuffles are performed (so that the random numbers
+    drawn do not change) but only those used by the (z, a) grid are stored.
+
     HARDCODED
     zmin, zmax, amin, amax : full range for each parameter
     N_mets, N_ages, N_unq_probs : number of elements in each array
+
+    Returns
+    -------
+    probs_binar : array
+      Shape (N_z, N_a, 1, N_mass_interp), binarity probabilities for each
+      star in each isochrone.
+    fracs : array
+      Fractions for the secondary masses.
     """
 
     # All theoretical isochrones are interpolated with the same length,
@@ -187,16 +165,32 @@ def randVals(
 
     met_probs = np.linspace(zmin, zmax, N_mets)
     age_probs = np.linspace(amin, amax, N_ages)
-    unq_probs = []
-    for _ in range(N_unq_probs):
+
+    # Find closest met & age values
+    iz = np.searchsorted(met_probs, all_met_vals)
+    ia = np.searchsorted(age_probs, all_age_vals)
+    # This ensures that the same (z, a) pair points to the same
+    # 'unq_probs' values (for the same random seed), no matter
+    # the ranges used for these parameters.
+    idx = (iz[:, None] + ia[None, :]) % N_unq_probs
+
+    # Compact table with the shuffled probabilities used by the grid.
+    idx_unq, idx_inv = np.unique(idx, return_inverse=True)
+    unq_probs = np.empty((len(idx_unq), N_mass_interp))
+    j = 0
+    for i in range(N_unq_probs):
         # Shuffle binarity probabilities.
         np.random.shuffle(b_probs)
-        unq_probs.append(list(b_probs))
+        if j < len(idx_unq) and idx_unq[j] == i:
+            unq_probs[j] = b_probs
+            j += 1
+
+    probs_binar = unq_probs[idx_inv].reshape(idx.shape + (1, N_mass_interp))
 
     # Fractions for second mass
     fracs = np.random.uniform(bin_mass_ratio, 1., N_mass_interp)
 
-    return met_probs, age_probs, unq_probs, fracs
+    return probs_binar, fracs
 
 
 def mag_combine(m1, m2):
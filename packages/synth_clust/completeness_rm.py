@@ -33,10 +33,16 @@ def main(isoch_binar, completeness):
         # The stars are already shuffled in 'mass_interp', so this selection
         # of the first 'd' elements is not removing a given type of star over
         # any other.
-        d_i = []
-        for i, d in enumerate(di):
-            d_i.append(np.where(c_indx == i)[0][:d])
-        d_i = np.concatenate(d_i)
+        #
+        # Rank of each star within its bin, in order of appearance. The
+        # stable sort groups the stars by bin keeping their order (a radix
+        # sort for the 'int16' type; there are only a few bins)
+        c_sort = np.argsort(c_indx.astype(np.int16), kind='stable')
+        rank = np.empty(c_indx.size, dtype=int)
+        rank[c_sort] = np.arange(c_indx.size) -\
+            (np.cumsum(count) - count)[c_indx[c_sort]]
+        # Keep the stars beyond the first 'd' of each bin.
+        keep = rank >= di[c_indx]
 
         # # DEPRECATED 03/12/19 #445
         # # The minimum length is that of the 'comp_perc' list plus one,
@@ -51,9 +57,8 @@ def main(isoch_binar, completeness):
         # # should be *removed* from the sub-lists.
         # d_i = indxRem(di, rang_indx, cmpl_rnd)
 
-        # Remove stars pointed to by 'd_i' from *all* the sub-arrays in
-        # 'isoch_binar'.
-        isoch_compl = np.delete(isoch_binar, d_i, axis=1)
+        # Remove the stars from *all* the sub-arrays in 'isoch_binar'.
+        isoch_compl = isoch_binar[:, keep]
         #
         # import matplotlib.pyplot as plt
         # plt.hist(isoch_binar[0], bins=bin_edges, histtype='step', label="orig")
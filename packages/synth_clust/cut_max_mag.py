@@ -7,25 +7,26 @@ def main(isoch_moved, max_mag_syn):
     Remove stars from isochrone with magnitude values larger that the maximum
     value found in the observation (entire field, not just the cluster
     region).
-    """
 
-    # Indexes that order the magnitude min to max.
-    min2max_mag = isoch_moved[0].argsort(kind='mergesort')
-    # Sort isochrone.
-    isoch_sort = isoch_moved[:, min2max_mag]
+    The stars kept are the same as those obtained sorting the isochrone by
+    its main magnitude and cutting it at the index of the value closest to
+    'max_mag_syn', but no sorting is required. The isochrone keeps its
+    original order (ie: sorted by initial mass, see 'interp_isochs').
+    """
+    mag = isoch_moved[0]
 
-    # Get index of closest mag value to max_mag_syn.
-    # max_indx = np.searchsorted(isoch_sort[0], max_mag_syn)
-    # For some reason this search appears to be (very) marginally faster
-    # than the np.searchsorted() implementation.
-    max_indx = np.argmin(np.abs(isoch_sort[0] - max_mag_syn))
+    # Closest magnitude values below and above (or equal to) the maximum.
+    below = mag < max_mag_syn
+    mag_l = mag[below].max() if below.any() else -np.inf
+    mag_h = mag[~below].min() if not below.all() else np.inf
 
-    # # In place for #358?
-    # min_mag_syn = max_mag_syn - 7.  # for a 7 mag long sequence
-    # min_indx = np.argmin(np.abs(isoch_sort[0] - min_mag_syn))
-    # isoch_cut = np.array([d[min_indx:max_indx] for d in isoch_sort])
+    # The stars fainter than the closest value are discarded (if both are
+    # equally close, the value below is chosen, as the first one in the
+    # sorted isochrone)
+    mag_cut = mag_l if max_mag_syn - mag_l <= mag_h - max_mag_syn else\
+        max_mag_syn
 
     # Discard elements beyond max_mag_syn limit.
-    isoch_cut = np.array([d[0:max_indx] for d in isoch_sort])
+    isoch_cut = isoch_moved[:, mag < mag_cut]
 
     return isoch_cut
@@ -1,10 +1,28 @@
 
 import numpy as np
-from scipy.integrate import quad
-from scipy.interpolate import interp1d
 
 
-def main(IMF_name, masses, m_high=150.):
+# Piecewise power-law IMFs: xi(m) = factor[i] * m^alpha[i], for masses in the
+# range (edges[i], edges[i + 1]]
+power_laws = {
+    # Kroupa, Tout & Gilmore. (1993) piecewise IMF.
+    # http://adsabs.harvard.edu/abs/1993MNRAS.262..545K
+    # Eq. (13), p. 572 (28)
+    'kroupa_1993': (
+        [0.08, 0.5, 1., np.inf], [-1.3, -2.2, -2.7], [0.035, 0.019, 0.019]),
+    # Kroupa (2002) Salpeter (1995) piecewise IMF taken from MASSCLEAN
+    # article, Eq. (2) & (3), p. 1725
+    'kroupa_2002': (
+        [0.01, 0.08, 0.5, np.inf], [-0.3, -1.3, -2.3],
+        [(1. / 0.08) ** -0.3, (1. / 0.08) ** -1.3,
+         ((0.5 / 0.08) ** -1.3) * ((1. / 0.5) ** -2.3)]),
+    # Salpeter (1955)  IMF.
+    # https://ui.adsabs.harvard.edu/abs/1955ApJ...121..161S/
+    'salpeter_1955': ([0., np.inf], [-2.35], [1.])
+}
+
+
+def main(IMF_name, masses, N_IMF=1, m_high=150.):
     """
     Returns the number of stars per interval of mass for the selected IMF.
 
@@ -14,18 +32,22 @@ def main(IMF_name, masses, m_high=150.):
       Name of the IMF to be used.
     masses: array
       Array of floats containing the range of masses defined.
+    N_IMF : int
+      Number of independent realizations of the IMF sampled.
     m_high : float
       Maximum mass value to be sampled.
 
     Returns
     -------
-    st_dist_mass : dict
-      Dictionary that contains the N defined masses, one array per mass value.
-      Each array contains a given number of stars sampled from the selected
-      IMF, that (approximately) sum to the associated total mass.
+    st_dist_mass : tuple
+      Two arrays of shape (N_IMF, N_stars). The masses of the stars sampled
+      in each realization of the IMF (whose total mass reaches the maximum
+      mass defined), and their cumulative sums. Realizations with less
+      than 'N_stars' stars are padded with zero masses (and infinite sums).
 
     """
-    print("Sampling selected IMF ({})".format(IMF_name))
+    print("Sampling selected IMF ({}, {} realization{})".format(
+        IMF_name, N_IMF, 's' if N_IMF > 1 else ''))
 
     # Low mass limits for each IMF. Defined slightly larger to avoid sampling
     # issues.
@@ -35,9 +57,16 @@ def main(IMF_name, masses, m_high=150.):
     # IMF low mass limit.
     m_low = imfs_dict[IMF_name]
 
-    sampled_IMF = invTrnsfSmpl(masses, IMF_name, m_low, m_high)
+    sampled_IMF = [
+        invTrnsfSmpl(masses, IMF_name, m_low, m_high) for _ in range(N_IMF)]
 
-    st_dist_mass = (sampled_IMF, np.cumsum(sampled_IMF))
+    N_stars = max(len(_) for _ in sampled_IMF)
+    masses_IMF = np.zeros((N_IMF, N_stars))
+    cumsum_IMF = np.full((N_IMF, N_stars), np.inf)
+    for i, smpl in enumerate(sampled_IMF):
+        masses_IMF[i, :len(smpl)] = smpl
+        cumsum_IMF[i, :len(smpl)] = np.cumsum(smpl)
+    st_dist_mass = (masses_IMF, cumsum_IMF)
 
     return st_dist_mass
 
@@ -50,82 +79,95 @@ def invTrnsfSmpl(masses, IMF_name, m_low, m_high):
     """
     from .set_rand_seed import np
 
-    # Obtain normalization constant (k = \int_{m_low}^{m_up} \xi(m) dm). This
-    # makes the IMF behave like a PDF.
-    norm_const = quad(IMF_func, m_low, m_high, args=(IMF_name))[0]
+    # Inverse CDF. Closed form for the power-law IMFs, tabulated for the rest.
+    if IMF_name in power_laws:
+        inv_cdf = powLawInvCDF(IMF_name, m_low, m_high)
+    else:
+        inv_cdf = tabInvCDF(IMF_name, m_low, m_high)
 
-    # IMF mass interpolation step and grid values.
-    mass_step = 0.05
-    mass_values = np.arange(m_low, m_high, mass_step)
+    # Number of stars required to reach the maximum defined mass, estimated
+    # with the mean mass of the IMF (plus a 5% margin).
+    mean_mass = np.mean(inv_cdf(np.linspace(0., 1., 10001)))
+    N_stars = int(1.05 * masses[-1] / mean_mass) + 100
 
-    # The CDF is defined as: $F(m)= \int_{m_low}^{m} PDF(m) dm$
-    # Sample the CDF
-    CDF_samples = []
-    for m in mass_values:
-        CDF_samples.append(quad(IMF_func, m_low, m, args=(IMF_name))[0])
+    sampled_IMF = inv_cdf(np.random.rand(N_stars))
+    # If the maximum mass was not reached (very unlikely), sample more stars.
+    while sampled_IMF.sum() < masses[-1]:
+        N_miss = int(1.05 * (masses[-1] - sampled_IMF.sum()) / mean_mass)
+        sampled_IMF = np.concatenate((
+            sampled_IMF, inv_cdf(np.random.rand(N_miss + 100))))
 
-    # Normalize values
-    CDF_samples = np.array(CDF_samples) / norm_const
-    CDF_min, CDF_max = CDF_samples.min(), CDF_samples.max()
+    # Discard the stars beyond the maximum mass.
+    N_max = np.searchsorted(np.cumsum(sampled_IMF), masses[-1]) + 1
+    sampled_IMF = sampled_IMF[:N_max]
 
-    # Inverse CDF
-    inv_cdf = interp1d(CDF_samples, mass_values)
+    return sampled_IMF
 
-    def sampled_inv_cdf(N):
-        mr = np.random.rand(N)
-        mr = mr[(mr >= CDF_min) & (mr <= CDF_max)]
-        return inv_cdf(mr)
 
-    # Sample in chunks of 100 stars until the maximum defined mass is reached.
-    mass_samples = []
-    while np.sum(mass_samples) < masses[-1]:
-        mass_samples += sampled_inv_cdf(100).tolist()
-    sampled_IMF = np.array(mass_samples)
+def powLawInvCDF(IMF_name, m_low, m_high):
+    """
+    Inverse CDF for a piecewise power-law IMF, in the range [m_low, m_high]
 
-    return sampled_IMF
+    The integral of xi(m) = f * m^a in the segment [m1, m2] is:
+    f * (m2^p - m1^p) / p, with p = a + 1 (a != -1)
+    """
+    edges, alpha, factor = power_laws[IMF_name]
+    m_lims = np.clip(edges, m_low, m_high)
+    p = np.array(alpha) + 1.
+    factor = np.array(factor)
+
+    # Mass contained in each segment, and normalized CDF at their limits.
+    seg_int = factor * (m_lims[1:]**p - m_lims[:-1]**p) / p
+    norm_const = seg_int.sum()
+    CDF_lims = np.concatenate(([0.], np.cumsum(seg_int))) / norm_const
 
+    def inv_cdf(u):
+        # Segment of each value (segments out of the mass range are empty,
+        # and are never selected)
+        i = np.clip(
+            np.searchsorted(CDF_lims, u, side='right') - 1, 0, len(p) - 1)
+        m_p = m_lims[i]**p[i] + p[i] * (u - CDF_lims[i]) * norm_const /\
+            factor[i]
+        return m_p**(1. / p[i])
 
-def IMF_func(m_star, IMF_name):
-    return imfs(IMF_name, m_star)
+    return inv_cdf
+
+
+def tabInvCDF(IMF_name, m_low, m_high, N_grid=10000):
+    """
+    Inverse CDF for the IMFs without a closed form, in the range
+    [m_low, m_high]. The CDF is obtained integrating the IMF with the
+    cumulative trapezoidal rule, in a logarithmic mass grid.
+    """
+    mass_values = np.geomspace(m_low, m_high, N_grid)
+    imf_vals = imfs(IMF_name, mass_values)
+
+    # The CDF is defined as: $F(m)= \int_{m_low}^{m} PDF(m) dm$
+    CDF_samples = np.concatenate(([0.], np.cumsum(
+        .5 * (imf_vals[1:] + imf_vals[:-1]) * np.diff(mass_values))))
+    # Normalize values
+    CDF_samples /= CDF_samples[-1]
+
+    def inv_cdf(u):
+        return np.interp(u, CDF_samples, mass_values)
+
+    return inv_cdf
 
 
 def imfs(IMF_name, m_star):
     """
-    Define any number of IMFs.
+    Define any number of IMFs. Evaluated for an array of masses.
 
     The package https://github.com/keflavich/imf has some more (I think,
     24-09-2019).
     """
+    m_star = np.asarray(m_star)
 
-    if IMF_name == 'kroupa_1993':
-        # Kroupa, Tout & Gilmore. (1993) piecewise IMF.
-        # http://adsabs.harvard.edu/abs/1993MNRAS.262..545K
-        # Eq. (13), p. 572 (28)
-        alpha = [-1.3, -2.2, -2.7]
-        m0, m1, m2 = [0.08, 0.5, 1.]
-        factor = [0.035, 0.019, 0.019]
-        if m0 < m_star <= m1:
-            i = 0
-        elif m1 < m_star <= m2:
-            i = 1
-        elif m2 < m_star:
-            i = 2
-        imf_val = factor[i] * (m_star ** alpha[i])
-
-    elif IMF_name == 'kroupa_2002':
-        # Kroupa (2002) Salpeter (1995) piecewise IMF taken from MASSCLEAN
-        # article, Eq. (2) & (3), p. 1725
-        alpha = [-0.3, -1.3, -2.3]
-        m0, m1, m2 = [0.01, 0.08, 0.5]
-        factor = [(1. / m1) ** alpha[0], (1. / m1) ** alpha[1],
-                  ((m2 / m1) ** alpha[1]) * ((1. / m2) ** alpha[2])]
-        if m0 < m_star <= m1:
-            i = 0
-        elif m1 < m_star <= m2:
-            i = 1
-        elif m2 < m_star:
-            i = 2
-        imf_val = factor[i] * (m_star ** alpha[i])
+    if IMF_name in power_laws:
+        edges, alpha, factor = power_laws[IMF_name]
+        # Segment of each mass.
+        i = np.searchsorted(edges[1:-1], m_star, side='left')
+        imf_val = np.array(factor)[i] * (m_star ** np.array(alpha)[i])
 
     elif IMF_name == 'chabrier_2001_log':
         # Chabrier (2001) lognormal form of the IMF.
@@ -141,9 +183,4 @@ def imfs(IMF_name, m_star):
         # Eq (8)
         imf_val = 3. * m_star ** (-3.3) * np.exp(-(716.4 / m_star) ** 0.25)
 
-    elif IMF_name == 'salpeter_1955':
-        # Salpeter (1955)  IMF.
-        # https://ui.adsabs.harvard.edu/abs/1955ApJ...121..161S/
-        imf_val = m_star ** -2.35
-
     return imf_val
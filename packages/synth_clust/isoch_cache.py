@@ -0,0 +1,129 @@
+
+import numpy as np
+from collections import OrderedDict
+
+
+# Least recently used cache of the averaged ('zaw') and moved ('move')
+# isochrones, local to each process. The entries are stored from the least
+# to the most recently used.
+_cache = OrderedDict()
+# Configuration and current size (in bytes) of the cache.
+_state = {'max_bytes': 0., 'nbytes': 0, 'steps': [0., 0., 0., 0.]}
+# Hits and misses for each kind of entry, and number of evicted entries.
+_stats = {'zaw': [0, 0], 'move': [0, 0], 'evict': 0}
+
+
+def setup(cache_mb, cache_steps):
+    """
+    Empty the cache, reset its statistics, and set its maximum size (in Mb,
+    0 disables it) and the quantization steps for the (z, a, e, d)
+    parameters.
+    """
+    _cache.clear()
+    _state['max_bytes'] = cache_mb * 1024.**2
+    _state['nbytes'] = 0
+    _state['steps'] = list(cache_steps)
+    _stats['zaw'], _stats['move'], _stats['evict'] = [0, 0], [0, 0], 0
+
+
+def enabled():
+    """
+    True if the cache is in use.
+    """
+    return _state['max_bytes'] > 0.
+
+
+def snapModels(models, varIdxs, fundam_params):
+    """
+    Round the free (z, a, e, d) parameters in 'models' (shape: (N, ndim)) to
+    their quantization steps, within the parameters' ranges. Models that
+    are close enough generate the same isochrones, which can then be
+    recovered from the cache.
+    """
+    if not enabled() or not any(_state['steps']):
+        return models
+
+    models = np.array(models, dtype=float)
+    for i, step in enumerate(_state['steps']):
+        if step > 0. and i in varIdxs:
+            j = varIdxs.index(i)
+            models[:, j] = np.clip(
+                np.round(models[:, j] / step) * step,
+                min(fundam_params[i]), max(fundam_params[i]))
+
+    return models
+
+
+def cacheGet(kind, key):
+    """
+    Return the cached isochrone of the given kind ('zaw' or 'move') for
+    'key', or None if it is not stored.
+    """
+    if not enabled():
+        return None
+
+    try:
+        isoch = _cache[(kind, key)]
+    except KeyError:
+        _stats[kind][1] += 1
+        return None
+
+    _cache.move_to_end((kind, key))
+    _stats[kind][0] += 1
+    return isoch
+
+
+def cachePut(kind, key, isoch):
+    """
+    Store an isochrone, discarding the least recently used entries if the
+    maximum size is exceeded.
+    """
+    if not enabled() or (kind, key) in _cache:
+        return
+
+    _cache[(kind, key)] = isoch
+    _state['nbytes'] += isoch.nbytes
+    while _state['nbytes'] > _state['max_bytes'] and len(_cache) > 1:
+        _, old_isoch = _cache.popitem(last=False)
+        _state['nbytes'] -= old_isoch.nbytes
+        _stats['evict'] += 1
+
+
+def stats():
+    """
+    Statistics for the cache in this process.
+    """
+    return {
+        'zaw': list(_stats['zaw']), 'move': list(_stats['move']),
+        'evict': _stats['evict'], 'N': len(_cache),
+        'size_mb': _state['nbytes'] / 1024.**2}
+
+
+def statsMerge(stats_lst):
+    """
+    Combine the statistics of several processes.
+    """
+    merged = {'zaw': [0, 0], 'move': [0, 0], 'evict': 0, 'N': 0,
+              'size_mb': 0.}
+    for st in stats_lst:
+        for k in ('zaw', 'move'):
+            merged[k] = [merged[k][0] + st[k][0], merged[k][1] + st[k][1]]
+        for k in ('evict', 'N', 'size_mb'):
+            merged[k] += st[k]
+
+    return merged
+
+
+def statsPrint(st):
+    """
+    Print the cache statistics.
+    """
+    def rate(hm):
+        return 100. * hm[0] / max(1, sum(hm))
+
+    print("  Isochrones cache: {:.0f}% hits averaged ({}/{}), {:.0f}% hits "
+          "moved ({}/{})".format(
+              rate(st['zaw']), st['zaw'][0], sum(st['zaw']),
+              rate(st['move']), st['move'][0], sum(st['move'])))
+    print("  {} entries ({:.0f} Mb), {} evicted".format(
+        st['N'], st['size_mb'], st['evict']))
@@ -2,7 +2,7 @@
 import numpy as np
 
 
-def main(st_dist_mass, M_total):
+def main(st_dist_mass, M_total, model=None):
     """
     http://www.astro.ru.nl/~slarsen/teaching/Galaxies/cmd.pdf
     http://python4mpia.github.io/fitting_data/MC-sampling-from-Salpeter.html
@@ -13,6 +13,8 @@ def main(st_dist_mass, M_total):
     Generate N_stars for each interval (m, m+dm) with masses randomly
     distributed within this interval.
 
+    The realization of the IMF used is selected with the 'model' parameters
+    (see 'imfIdx()'), or the first one if no model is given.
     """
 
     # This is not in use since May 2019 (see 'imf.py'), because all the
@@ -24,6 +26,40 @@ def main(st_dist_mass, M_total):
     #     mass_dist = np.random.random(N_stars) * scale + base
     # else:
 
-    mass_dist = st_dist_mass[0][:np.searchsorted(st_dist_mass[1], M_total)]
+    k = 0
+    if model is not None:
+        k = imfIdx(model, st_dist_mass[0].shape[0])[0]
+
+    mass_dist = st_dist_mass[0][k][
+        :np.searchsorted(st_dist_mass[1][k], M_total)]
 
     return mass_dist
+
+
+def imfIdx(models, N_IMF):
+    """
+    Index of the IMF realization used by each one of the 'models' (shape:
+    (N_models, ndim)), obtained hashing the bits of its parameters. The same
+    model always uses the same realization (in any process), while different
+    models use different realizations.
+    """
+    models = np.atleast_2d(np.asarray(models, dtype=float))
+    if N_IMF == 1:
+        return np.zeros(models.shape[0], dtype=int)
+
+    return (modelHash(models) % np.uint64(N_IMF)).astype(int)
+
+
+def modelHash(models):
+    """
+    FNV-1a style hash of the 64 bits words of each model (shape:
+    (N_models, ndim)). Returns an array of 'np.uint64' values.
+    """
+    models = np.atleast_2d(np.asarray(models, dtype=float))
+    bits = np.ascontiguousarray(models).view(np.uint64)
+    h = np.full(models.shape[0], 0xcbf29ce484222325, dtype=np.uint64)
+    for col in bits.T:
+        h = (h ^ col) * np.uint64(0x100000001b3)
+    h ^= h >> np.uint64(32)
+
+    return h
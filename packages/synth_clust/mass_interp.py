@@ -9,13 +9,11 @@ def main(isoch_cut, mass_dist, m_ini_idx):
     Masses that fall outside of the isochrone's mass range are rejected.
     """
 
-    # Returns the indices that would sort the isochrone with
-    # the minimum mass. This is why we use the 'm_ini_idx' index.
-    order = isoch_cut[m_ini_idx, :].argsort()
-
-    # Returns an array with the mass values in the theoretical isochrone
-    # ordered from min to max.
-    key = isoch_cut[m_ini_idx, order]
+    # Mass values in the theoretical isochrone ordered from min to max. The
+    # isochrones are stored sorted by their initial masses (see
+    # 'interp_isochs'), and this order is not changed by the averaging,
+    # moving, or magnitude cut, so no sorting is needed.
+    key = isoch_cut[m_ini_idx]
 
     ##########################################################################
     # # Uncomment this block to see how many stars are being discarded
@@ -59,7 +57,7 @@ def main(isoch_cut, mass_dist, m_ini_idx):
     # finally these "closest" stars in the isochrone are stored and passed.
     # The "interpolated" isochrone contains as many stars as masses in the
     # IMF distribution were located between the isochrone's mass range.
-    isoch_interp = isoch_cut[:, order[closest]]
+    isoch_interp = isoch_cut[:, closest]
 
     return isoch_interp
 
@@ -2,11 +2,44 @@
 import numpy as np
 
 
-def main(isochrone, e, d, R_V, ext_coefs, N_fc, binar_flag, m_ini_idx):
+# Output buffer, reused between calls (see 'main()')
+_buffer = np.empty(0)
+
+
+def main(isochrone, e, d, R_V, ext_coefs, reuse=False):
     """
     Receives an isochrone of a given age and metallicity and modifies
     its color and magnitude values according to given values for the extinction
     E(B-V) (e) and distance modulus (d).
+
+    'ext_coefs' holds the distance and extinction coefficients for each row
+    of the isochrone, obtained once with 'extinVecs()'. The shift is applied
+    with a single addition.
+
+    If 'reuse' is True the moved isochrone is written into a buffer that is
+    overwritten by the next call with the same flag, so the caller must not
+    keep a reference to it.
+    """
+    global _buffer
+
+    out = None
+    if reuse:
+        if _buffer.shape != isochrone.shape:
+            _buffer = np.empty(isochrone.shape)
+        out = _buffer
+
+    d_vec, e_vec = ext_coefs
+    shift = d * d_vec + (R_V * e) * e_vec
+    isoch_moved = np.add(isochrone, shift[:, None], out=out)
+
+    return isoch_moved
+
+
+def extinVecs(ext_coefs, R_V, N_fc, binar_flag, N_data):
+    """
+    Distance and extinction coefficients for each one of the 'N_data' rows of
+    the isochrones. The values stored are used by 'main()' to shift each row
+    by: d * d_vec + Av * e_vec
     N_fc is the number of filters (N_fc[0]), and colors defined (N_fc[1]).
                  |------Nf-----|  |------Nc-----|
     isochrone = [f1, f2, .., fNf, c1, c2, .., cNc,
@@ -33,44 +66,22 @@ def main(isochrone, e, d, R_V, ext_coefs, N_fc, binar_flag, m_ini_idx):
                = (a12 + b12/Rv) * R_V * E(B-V)
     (m1 - m2)_obs = (m1 - m2)_int + E(m1 - m2)
     (m1 - m2)_obs = (m1 - m2)_int + (a12 + b12/Rv) * R_V * E(B-V)
-    """
 
-    Av = R_V * e
+    The rest of the rows (binary probabilities, masses, and the extra
+    parameters) are not affected by distance/reddening.
+    """
     Nf, Nc = N_fc
-
-    def magmove(fi, mag):
-        Ax = (ext_coefs[fi][0] + ext_coefs[fi][1] / R_V) * Av
-        return np.array(mag) + d + Ax
-
-    def colmove(ci, col):
-        Ex = ((ext_coefs[Nf + ci][0][0] + ext_coefs[Nf + ci][0][1] / R_V) -
-              (ext_coefs[Nf + ci][1][0] + ext_coefs[Nf + ci][1][1] / R_V)) * Av
-        return np.array(col) + Ex
-
-    iso_moved = []
-
-    # Move filters.
-    for fi, mag in enumerate(isochrone[:Nf]):
-        iso_moved.append(magmove(fi, mag))
-
-    # Move colors.
-    for ci, col in enumerate(isochrone[Nf:(Nf + Nc)]):
-        iso_moved.append(colmove(ci, col))
-
-    binar_idx = 0
-    if binar_flag:
-        # Move filters with binary data.
-        for fi, mag in enumerate(isochrone[(Nf + Nc):(Nf + Nc + Nf)]):
-            iso_moved.append(magmove(fi, mag))
-
-        # Move colors with binary data.
-        for ci, col in enumerate(
-                isochrone[(Nf + Nc + Nf):(Nf + Nc + Nf + Nc)]):
-            iso_moved.append(colmove(ci, col))
-
-        binar_idx = 2
-
-    # Append the extra parameters, not affected by distance/reddening.
-    iso_moved = np.array(iso_moved + list(isochrone[m_ini_idx - binar_idx:]))
-
-    return iso_moved
+    d_vec, e_vec = np.zeros(N_data), np.zeros(N_data)
+
+    # Rows that contain filters and colors; and their binary versions.
+    offsets = (0, Nf + Nc) if binar_flag else (0,)
+    for i0 in offsets:
+        for fi in range(Nf):
+            d_vec[i0 + fi] = 1.
+            e_vec[i0 + fi] = ext_coefs[fi][0] + ext_coefs[fi][1] / R_V
+        for ci in range(Nc):
+            ec = ext_coefs[Nf + ci]
+            e_vec[i0 + Nf + ci] = (ec[0][0] + ec[0][1] / R_V) -\
+                (ec[1][0] + ec[1][1] / R_V)
+
+    return np.array([d_vec, e_vec])
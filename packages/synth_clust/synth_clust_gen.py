@@ -40,10 +40,8 @@ def main(
     cx, cy = xmax * .5, ymax * .5
 
     # TODO handle cases where no field region is defined
-    mags_fl = []
-    for fl in clp['field_regions_c']:
-        mags_fl += np.ravel(list(zip(*fl))[3]).tolist()
-    mags_fl = np.array(mags_fl)
+    mags_fl = np.concatenate(
+        [fl.mags.ravel() for fl in clp['field_regions_c']])
     # Generate mags KDE
     x_grid_fr = np.linspace(min(mags_fl), max(mags_fl), 1000)
     kde = gaussian_kde(mags_fl)
@@ -1,4 +1,5 @@
 
+import time as t
 import numpy as np
 from . import zaWAverage
 from . import move_isochrone
@@ -8,12 +9,20 @@ from . import mass_interp
 from . import binarity
 from . import completeness_rm
 from . import add_errors
+from . import isoch_cache
+
+
+# Stages of the generation of a synthetic cluster, timed by 'main()'.
+stages = (
+    'properModel', 'zaWAverage', 'move_isochrone', 'cut_max_mag',
+    'mass_distribution', 'mass_interp', 'binarity', 'completeness_rm',
+    'add_errors')
 
 
 def main(
     fundam_params, varIdxs, model, theor_tracks, completeness, max_mag_syn,
     st_dist_mass, R_V, ext_coefs, N_fc, err_pars, m_ini_idx, binar_flag,
-        extra_pars_flag=False):
+        extra_pars_flag=False, timings=None):
     """
     Takes an isochrone and returns a synthetic cluster created according to
     a certain mass distribution.
@@ -34,32 +43,56 @@ def main(
 
     Lists containing the theoretical tracks extra parameters.
     extra_pars = [l1, l2, ..., l6]
+
+    If a 'timings' dictionary is given, the time (in seconds) used by each
+    one of the 'stages' is added to it. The look-ups in the isochrones cache
+    are included in the stages they replace.
     """
+    lap = stageTimer(timings)
 
     # If 'extra_pars_flag' is True and synth_clust = np.array([])
     sigma, extra_pars, isoch_moved, mass_dist, isoch_binar, isoch_compl =\
         [[] for _ in range(6)]
 
+    # Round the model's parameters if the isochrones cache is quantized.
+    model = isoch_cache.snapModels([model], varIdxs, fundam_params)[0]
+
     # Return proper values for fixed parameters and parameters required
     # for the (z, log(age)) isochrone averaging.
     model_proper, z_model, a_model, ml, mh, al, ah = properModel(
         fundam_params, model, varIdxs)
 
-    # Generate a weighted average isochrone from the (z, log(age)) values in
-    # the 'model'.
-    isochrone = zaWAverage.main(
-        theor_tracks, m_ini_idx, fundam_params, z_model, a_model, ml, mh, al,
-        ah)
-
     # Extract parameters
     e, d, M_total, bin_frac = model_proper
-
-    # Move theoretical isochrone using the values 'e' and 'd'.
-    isoch_moved = move_isochrone.main(
-        isochrone, e, d, R_V, ext_coefs, N_fc, binar_flag, m_ini_idx)
+    lap('properModel')
+
+    # The moved isochrone (and the averaged one) are stored in the cache,
+    # if it is enabled.
+    key = (float(z_model), float(a_model), float(e), float(d))
+    isoch_moved = isoch_cache.cacheGet('move', key)
+    if isoch_moved is None:
+        isochrone = isoch_cache.cacheGet('zaw', key[:2])
+        if isochrone is None:
+            # Generate a weighted average isochrone from the (z, log(age))
+            # values in the 'model'.
+            isochrone = zaWAverage.main(
+                theor_tracks, m_ini_idx, fundam_params, z_model, a_model, ml,
+                mh, al, ah)
+            isoch_cache.cachePut('zaw', key[:2], isochrone)
+        lap('zaWAverage')
+
+        # Move theoretical isochrone using the values 'e' and 'd'. The
+        # output buffer is reused, unless the moved isochrone is stored in
+        # the cache or returned.
+        isoch_moved = move_isochrone.main(
+            isochrone, e, d, R_V, ext_coefs,
+            not (isoch_cache.enabled() or extra_pars_flag))
+        isoch_cache.cachePut('move', key, isoch_moved)
+    lap('move_isochrone')
 
     # Get isochrone minus those stars beyond the magnitude cut.
     isoch_cut = cut_max_mag.main(isoch_moved, max_mag_syn)
+    lap('cut_max_mag')
 
     # # In place for #358
     # return isoch_cut.T[:, :3]
@@ -69,26 +102,31 @@ def main(
     # Check for an empty array.
     if isoch_cut.any():
         # Mass distribution to produce a synthetic cluster based on
-        # a given IMF and total mass.
-        mass_dist = mass_distribution.main(st_dist_mass, M_total)
+        # a given IMF (realization) and total mass.
+        mass_dist = mass_distribution.main(st_dist_mass, M_total, model)
+        lap('mass_distribution')
 
         # Interpolate masses in mass_dist into the isochrone rejecting those
         # masses that fall outside of the isochrone's mass range.
         # This destroys the order by magnitude.
         isoch_mass = mass_interp.main(isoch_cut, mass_dist, m_ini_idx)
+        lap('mass_interp')
 
         if isoch_mass.any():
             # Assignment of binarity.
             isoch_binar = binarity.main(isoch_mass, bin_frac, m_ini_idx, N_fc)
+            lap('binarity')
 
             # Completeness limit removal of stars.
             isoch_compl = completeness_rm.main(isoch_binar, completeness)
+            lap('completeness_rm')
 
             if isoch_compl.any():
                 # Get errors according to errors distribution.
                 synth_clust, sigma, extra_pars = add_errors.main(
                     isoch_compl, err_pars, m_ini_idx, binar_flag,
-                    extra_pars_flag)
+                    extra_pars_flag, model)
+                lap('add_errors')
 
     if extra_pars_flag is False:
         # Only pass the photometry, used by the likelihood function
@@ -97,6 +135,24 @@ def main(
         isoch_binar, isoch_compl
 
 
+def stageTimer(timings):
+    """
+    Function that adds to 'timings[stage]' the time elapsed since its
+    previous call (or its creation). Does nothing if 'timings' is None.
+    """
+    if timings is None:
+        return lambda stage: None
+
+    last = [t.perf_counter()]
+
+    def lap(stage):
+        now = t.perf_counter()
+        timings[stage] = timings.get(stage, 0.) + now - last[0]
+        last[0] = now
+
+    return lap
+
+
 def properModel(fundam_params, model, varIdxs):
     """
     Define the 'proper' model with values for (z, a) taken from its grid,